@@ -0,0 +1,109 @@
+"""
+Startup-time regression check for the model scripts.
+
+Each script is loaded as a module in a fresh interpreter running
+`python -X importtime`, without calling main(), and the cumulative time of
+every import it triggers is summed. The check fails when a script pulls in
+one of its heavy modules at import time (plotting, scikit-learn, solver
+backends that should only load on demand) or when `--max-ms` is given and a
+script's median import time exceeds it.
+
+Usage:
+    python import_time.py
+    python import_time.py --repeat 5 --max-ms 1500 --output import_time.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+# script -> modules it must not import before main() runs
+SCRIPTS = {
+    "model-scripts/gravity-model/gravity-model.py": ["matplotlib"],
+    "model-scripts/multi-objective-model.py": ["matplotlib", "sklearn", "pulp", "pyomo"],
+    "model-scripts/moo.py": ["matplotlib", "pulp", "pyomo"],
+    "model-scripts/moo-model/nsga_aggregator.py": ["matplotlib"],
+}
+
+_MARKER = "-- script imports --"
+
+_LOADER = """
+import importlib.util, os, sys
+path = {path!r}
+sys.path.insert(0, os.path.dirname(path))
+sys.stderr.write({marker!r} + "\\n")
+spec = importlib.util.spec_from_file_location("script_under_test", path)
+spec.loader.exec_module(importlib.util.module_from_spec(spec))
+"""
+
+
+def parse_importtime(stderr):
+    """(total cumulative microseconds, imported top-level packages) after the marker line."""
+    lines = stderr.splitlines()
+    if _MARKER in lines:
+        lines = lines[lines.index(_MARKER) + 1:]
+    total, packages = 0, set()
+    for line in lines:
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue
+        packages.add(name.strip().split(".")[0])
+        # Only imports made by the script itself; nested ones are in their cumulative time
+        if not name.startswith("  "):
+            total += int(cumulative)
+    return total, packages
+
+
+def measure(script, repeat=3):
+    path = os.path.join(REPO_DIR, script)
+    code = _LOADER.format(path=path, marker=_MARKER)
+    env = {**os.environ, "MPLBACKEND": "Agg"}
+    timings, packages = [], set()
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                              capture_output=True, text=True, env=env, cwd=os.path.dirname(path))
+        if proc.returncode != 0:
+            raise RuntimeError(f"{script} failed to import:\n{proc.stderr[-2000:]}")
+        total, packages = parse_importtime(proc.stderr)
+        timings.append(total / 1000)
+    return {"script": script, "median_ms": statistics.median(timings), "min_ms": min(timings),
+            "repeat": repeat, "heavy_imports": sorted(packages & set(SCRIPTS[script]))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time regression check for the model scripts")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-ms", type=float, help="Fail when a script's median import time exceeds this")
+    parser.add_argument("--output", help="Optional JSON file for the measurements")
+    args = parser.parse_args()
+
+    results, failures = [], []
+    for script in SCRIPTS:
+        r = measure(script, args.repeat)
+        results.append(r)
+        print(f"{script:<48} {r['median_ms']:9.1f} ms"
+              + (f"   heavy imports: {', '.join(r['heavy_imports'])}" if r["heavy_imports"] else ""))
+        if r["heavy_imports"]:
+            failures.append(f"{script} imports {', '.join(r['heavy_imports'])} at startup")
+        if args.max_ms is not None and r["median_ms"] > args.max_ms:
+            failures.append(f"{script} takes {r['median_ms']:.1f} ms to import (limit {args.max_ms:g} ms)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "results": results}, f, indent=2)
+        print(f"Saved results to: {args.output}")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
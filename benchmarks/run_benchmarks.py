@@ -0,0 +1,231 @@
+"""
+Timing and scaling harness for the models and the scraper's parsing path.
+
+Every suite runs against synthetic tables of each requested size (see
+synthetic.py) and records the median and minimum wall time of `--repeat`
+runs per step:
+
+  nsga       FitnessEngine build, batch evaluation of a population,
+             NumPy non-dominated sort of the resulting fitnesses
+  milp       SiteSelectionProblem + PuLP model build, and CBC solve
+  gravity    GravityModel build, single scoring, batch of weight sets
+  predictor  ClusterPredictor batch prediction with rf_model.pkl
+  spec       spec-page extraction from scraping-scripts/fixtures (needs a
+             Playwright Chromium; skipped otherwise) and flatten_specs rows
+
+Results are written as JSON. With --baseline, steps that got slower than
+`--tolerance` times the baseline median are listed and the exit code is 1.
+
+Usage:
+    python run_benchmarks.py --sizes 100 1000 10000 --output results.json
+    python run_benchmarks.py --suites nsga gravity --baseline results.json
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+for sub in ["clean-data", "model-scripts", os.path.join("model-scripts", "moo-model"),
+            os.path.join("model-scripts", "gravity-model"), "streamlit-files",
+            "scraping-scripts", "snowflake-data-transformation"]:
+    sys.path.insert(0, os.path.join(REPO_DIR, sub))
+
+from synthetic import synthetic_cities, synthetic_sites
+
+FIXTURES_DIR = os.path.join(REPO_DIR, "scraping-scripts", "fixtures")
+SPEC_WORKBOOK = os.path.join(REPO_DIR, "scraping-scripts", "california_datacenters_specs.xlsx")
+
+
+def timed(fn, repeat):
+    """Run fn `repeat` times; returns (last result, timing summary)."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return result, {"median_s": statistics.median(timings), "min_s": min(timings), "repeat": repeat}
+
+
+# ------------------------------
+# Suites: each yields (step, timing summary, extra info)
+# ------------------------------
+def bench_nsga(df, repeat, pop_size=100, density=0.1, seed=0):
+    from fitness import FitnessEngine
+    from pareto import nondominated_rank
+
+    engine, timing = timed(lambda: FitnessEngine(df), repeat)
+    yield "engine_build", timing, {}
+    bits = np.random.default_rng(seed).random((pop_size, len(df))) < density
+    F, timing = timed(lambda: engine.evaluate_batch(bits), repeat)
+    yield "evaluate_population", timing, {"population": pop_size}
+    _, timing = timed(lambda: nondominated_rank(F), repeat)
+    yield "nondominated_sort", timing, {"population": pop_size}
+
+
+def bench_milp(df, repeat, time_limit=60):
+    from site_selection import PulpSiteModel, SiteSelectionProblem
+
+    table = df.assign(Site=df["LOCATION"].astype(str))
+    power = table["IT EQUIPMENT POWER"].to_numpy(dtype=float)
+
+    def build():
+        problem = SiteSelectionProblem(
+            table,
+            objectives={"State_Aggregated_PUE": "min", "State_Aggregated_IXP_Count": "max"},
+            capacity={"column": "IT EQUIPMENT POWER", "required": 0.05 * np.nansum(power)},
+            sites={"max": max(1, len(table) // 10)},
+            eligibility={"AREA": {"min": 10000}},
+        )
+        return PulpSiteModel(problem, {"name": "cbc", "time_limit": time_limit, "msg": False})
+
+    model, timing = timed(build, repeat)
+    yield "build", timing, {}
+    weights = {"State_Aggregated_PUE": 1.0, "State_Aggregated_IXP_Count": 0.1}
+    result, timing = timed(lambda: model.solve(weights), repeat)
+    yield "solve", timing, {"status": result["status"], "selected": len(result["selected"])}
+
+
+def bench_gravity(n_rows, repeat, n_weight_sets=1000):
+    from gravity_engine import GravityModel, load_config
+
+    config = load_config()
+    cities = synthetic_cities(n_rows)
+    model, timing = timed(lambda: GravityModel(cities, config["weights"], config["cost_params"],
+                                               config["benefit_params"]), repeat)
+    yield "build", timing, {}
+    _, timing = timed(model.score, repeat)
+    yield "score", timing, {}
+    W = model.sample_weight_sets(n_weight_sets, seed=0)
+    _, timing = timed(lambda: model.ranks(model.score_weight_sets(W)), repeat)
+    yield "weight_sets_ranked", timing, {"weight_sets": n_weight_sets}
+
+
+def bench_predictor(df, repeat):
+    from predictor import ClusterPredictor
+
+    predictor = ClusterPredictor()
+    _, timing = timed(lambda: predictor.predict(df), repeat)
+    yield "predict_batch", timing, {}
+
+
+def bench_spec(n_rows, repeat):
+    import flatten_specs
+
+    records = list(flatten_specs.iter_records(SPEC_WORKBOOK))
+    batch = [records[i % len(records)] for i in range(n_rows)]
+    _, timing = timed(lambda: flatten_specs.to_frame([flatten_specs.flatten_row(r) for r in batch]), repeat)
+    yield "flatten_rows", timing, {}
+
+    files = sorted(glob.glob(os.path.join(FIXTURES_DIR, "**", "specs", "index.html"), recursive=True))
+    try:
+        from playwright.sync_api import sync_playwright
+        from spec_extract import extract_specs
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=True)
+            page = browser.new_page()
+            timings = []
+            for path in files:
+                page.goto("file://" + os.path.abspath(path))
+                _, timing = timed(lambda: extract_specs(page), repeat)
+                timings.append(timing["median_s"])
+            browser.close()
+    except Exception as exc:
+        yield "extract_fixtures", None, {"skipped": f"{type(exc).__name__}: {str(exc).splitlines()[0]}"}
+        return
+    # Per page; independent of the table size
+    yield "extract_fixtures", {"median_s": statistics.median(timings), "min_s": min(timings),
+                               "repeat": repeat}, {"pages": len(files)}
+
+
+SUITES = {
+    "nsga": lambda n, df, repeat: bench_nsga(df, repeat),
+    "milp": lambda n, df, repeat: bench_milp(df, repeat),
+    "gravity": lambda n, df, repeat: bench_gravity(n, repeat),
+    "predictor": lambda n, df, repeat: bench_predictor(df, repeat),
+    "spec": lambda n, df, repeat: bench_spec(n, repeat),
+}
+
+
+# ------------------------------
+# Results and regression check
+# ------------------------------
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    import pandas as pd
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Steps whose median is more than `tolerance` x the baseline median."""
+    previous = {(r["suite"], r["step"], r["rows"]): r for r in baseline["results"] if r.get("median_s")}
+    regressions = []
+    for r in results:
+        old = previous.get((r["suite"], r["step"], r["rows"]))
+        if old and r.get("median_s") and r["median_s"] > tolerance * old["median_s"]:
+            regressions.append({**r, "baseline_median_s": old["median_s"],
+                                "ratio": r["median_s"] / old["median_s"]})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the models on synthetic candidate tables")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000],
+                        help="Candidate-site counts to generate")
+    parser.add_argument("--suites", nargs="+", choices=sorted(SUITES), default=sorted(SUITES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=os.path.join(BENCH_DIR, "results.json"))
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="Slowdown factor over the baseline reported as a regression")
+    args = parser.parse_args()
+
+    results = []
+    for n in args.sizes:
+        df = synthetic_sites(n, args.seed)
+        for suite in args.suites:
+            for step, timing, info in SUITES[suite](n, df, args.repeat):
+                row = {"suite": suite, "step": step, "rows": n, **(timing or {}), **info}
+                results.append(row)
+                shown = f"{timing['median_s'] * 1000:10.2f} ms" if timing else f"skipped ({info['skipped']})"
+                print(f"{suite:<10} {step:<22} {n:>9} rows  {shown}")
+
+    report = {"environment": environment(), "sizes": args.sizes, "results": results}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"Saved results to: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['suite']}/{r['step']} @ {r['rows']} rows: "
+                  f"{r['baseline_median_s'] * 1000:.2f} -> {r['median_s'] * 1000:.2f} ms (x{r['ratio']:.2f})")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
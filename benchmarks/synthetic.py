@@ -0,0 +1,72 @@
+"""
+Synthetic candidate tables with the data-final.csv schema.
+
+Rows are resampled from clean-data/data-final.csv, so state-level columns
+(State_Aggregated_PUE, State_Aggregated_IXP_Count), service flags and
+missing values keep realistic joint distributions. ENERGY, AREA and
+IT EQUIPMENT POWER are jittered log-normally and every LOCATION is made
+unique. The result is typed with feature_store, exactly like the real table.
+
+Usage:
+    python synthetic.py 100000 synthetic-100k.csv --seed 0
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(REPO_DIR, "clean-data"))
+import feature_store
+
+CONTINUOUS_COLUMNS = ["ENERGY", "AREA", "IT EQUIPMENT POWER"]
+
+# Gravity-model parameters, scaled from the city table's typical ranges
+CITY_PARAMS = ["Water", "Energy", "Workforce", "Renewable", "LandCost", "LandAvail", "Network", "Climate"]
+
+
+def synthetic_sites(n_rows, seed=0, base=None):
+    """Typed DataFrame of `n_rows` candidate sites with the data-final.csv columns."""
+    rng = np.random.default_rng(seed)
+    base = feature_store.load("data-final.csv") if base is None else base
+    df = base.iloc[rng.integers(0, len(base), n_rows)].reset_index(drop=True)
+    for col in CONTINUOUS_COLUMNS:
+        df[col] = (df[col].to_numpy(dtype=float) * rng.lognormal(0.0, 0.25, n_rows)).round(2)
+    df["LOCATION"] = pd.array([f"{loc} #{i}" for i, loc in enumerate(df["LOCATION"])], dtype="string")
+    return feature_store.derive(feature_store.apply_schema(df))
+
+
+def synthetic_cities(n_rows, seed=0, base=None):
+    """City table for the gravity model, resampled from the configured source."""
+    rng = np.random.default_rng(seed)
+    if base is None:
+        sys.path.insert(0, os.path.join(REPO_DIR, "model-scripts", "gravity-model"))
+        import gravity_engine
+        config = gravity_engine.load_config()
+        base = gravity_engine.load_cities(config["source"], config.get("xlsx_columns"))
+    df = base.iloc[rng.integers(0, len(base), n_rows)].reset_index(drop=True)
+    for col in CITY_PARAMS:
+        df[col] = df[col].to_numpy(dtype=float) * rng.lognormal(0.0, 0.1, n_rows)
+    df["City"] = [f"{city} #{i}" for i, city in enumerate(df["City"])]
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic data-final.csv-style table")
+    parser.add_argument("rows", type=int)
+    parser.add_argument("output")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    df = synthetic_sites(args.rows, args.seed)
+    df = df.drop(columns=["SERVICE_AVAILABILITY_SCORE", "FACILITY_AGE"])
+    for col in feature_store.SERVICE_COLUMNS:
+        df[col] = df[col].map({True: "TRUE", False: "FALSE"})
+    df.to_csv(args.output, index=False, na_rep="N/A")
+    print(f"Wrote {len(df)} rows to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Typed, cached loader for the clean-data CSVs.
+
+Every column the models use has an explicit dtype (nullable boolean service
+flags, categorical STATE/CITY, nullable PUE, IXP counts and years),
+TRUE/FALSE and N/A are parsed the same way everywhere, and the derived
+columns SERVICE_AVAILABILITY_SCORE and FACILITY_AGE are computed once here.
+A missing value stays <NA> instead of becoming True or failing the load.
+
+The typed frame is cached as Parquet in a .cache/ directory next to the
+source file. The cache file name carries a hash of the CSV bytes and of
+the schema, so editing either one invalidates it automatically.
+
+Usage:
+    import sys; sys.path.insert(0, "<repo>/clean-data")
+    from feature_store import load
+    df = load("data-final.csv")          # resolved against clean-data/
+    python feature_store.py data-final.csv DC-CleanedData.csv --rebuild
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import time
+
+import pandas as pd
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SOURCE = "data-final.csv"
+CACHE_DIRNAME = ".cache"
+
+# Facility age is measured against this year
+REFERENCE_YEAR = 2025
+
+SERVICE_COLUMNS = [
+    "FULL_CABINETS", "PARTIAL_CABINETS", "SHARED_RACKSPACE", "CAGES",
+    "SUITES", "BUILD_TO_SUIT", "FOOTPRINTS", "REMOTE_HANDS"
+]
+
+# Explicit dtypes; columns a file does not have are skipped, and columns
+# not listed here keep pandas' inferred dtype. Flags and counts that can be
+# missing use the nullable "boolean"/"Int64" dtypes: "bool" would turn NaN
+# into True and "int64" would refuse the whole file
+SCHEMA = {
+    "STATE": "category",
+    "CITY": "category",
+    "LOCATION": "string",
+    "ENERGY": "float64",
+    "AREA": "float64",
+    "IT EQUIPMENT POWER": "float64",
+    "PUE": "Float64",
+    "State_Aggregated_PUE": "float64",
+    "IXP_Names": "string",
+    "IXP_Count": "Int64",
+    "INTERNET_EXCHANGE_POINTS": "Int64",
+    "State_Aggregated_IXP_Count": "Int64",
+    **{col: "boolean" for col in SERVICE_COLUMNS},
+    "YEAR_OPERATIONAL": "Int64",
+    "LOCATION_ID": "int64",
+    "Cluster": "int64",
+    "PCA1": "float64",
+    "PCA2": "float64",
+}
+
+NA_VALUES = ["N/A", "NA", "n/a", "None", "NULL", ""]
+TRUE_VALUES = ["TRUE", "True", "true"]
+FALSE_VALUES = ["FALSE", "False", "false"]
+
+
+def resolve(source):
+    """Existing paths are used as given; bare file names refer to clean-data/."""
+    if os.path.exists(source):
+        return os.path.abspath(source)
+    return os.path.join(DATA_DIR, source)
+
+
+def apply_schema(df):
+    """Cast the columns present in `df` to their SCHEMA dtype."""
+    dtypes = {col: dtype for col, dtype in SCHEMA.items() if col in df.columns}
+    return df.astype(dtypes)
+
+
+def derive(df):
+    """
+    Add SERVICE_AVAILABILITY_SCORE and FACILITY_AGE when their inputs exist;
+    a site with an unknown service flag or year gets <NA> for the score or age.
+    """
+    if all(col in df.columns for col in SERVICE_COLUMNS):
+        df["SERVICE_AVAILABILITY_SCORE"] = df[SERVICE_COLUMNS].sum(axis=1, skipna=False).astype("Int64")
+    if "YEAR_OPERATIONAL" in df.columns:
+        df["FACILITY_AGE"] = (REFERENCE_YEAR - df["YEAR_OPERATIONAL"]).astype("Int64")
+    return df
+
+
+def parse_csv(path):
+    df = pd.read_csv(path, na_values=NA_VALUES, keep_default_na=False,
+                     true_values=TRUE_VALUES, false_values=FALSE_VALUES)
+    return derive(apply_schema(df))
+
+
+# ------------------------------
+# Parquet cache
+# ------------------------------
+def source_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    # Schema changes must invalidate the cache as well
+    digest.update(json.dumps([SCHEMA, NA_VALUES, REFERENCE_YEAR], sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def cache_path(path, digest):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(os.path.dirname(path), CACHE_DIRNAME, f"{stem}-{digest}.parquet")
+
+
+def _parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def load(source=DEFAULT_SOURCE, cache=True, rebuild=False):
+    """
+    Typed DataFrame for a clean-data CSV, from the Parquet cache when it
+    matches the current file contents, otherwise parsed and re-cached.
+    Caching is skipped when pyarrow is not installed.
+    """
+    path = resolve(source)
+    if not cache or not _parquet_available():
+        return parse_csv(path)
+
+    cached = cache_path(path, source_hash(path))
+    if os.path.exists(cached) and not rebuild:
+        return pd.read_parquet(cached)
+
+    df = parse_csv(path)
+    os.makedirs(os.path.dirname(cached), exist_ok=True)
+    # Drop caches of earlier versions of this file
+    stem = os.path.splitext(os.path.basename(path))[0]
+    for stale in glob.glob(os.path.join(os.path.dirname(cached), f"{stem}-*.parquet")):
+        os.remove(stale)
+    df.to_parquet(cached, index=False)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or inspect the typed clean-data cache")
+    parser.add_argument("sources", nargs="*", default=[DEFAULT_SOURCE])
+    parser.add_argument("--rebuild", action="store_true", help="Re-parse even if the cache is current")
+    args = parser.parse_args()
+
+    for source in args.sources:
+        start = time.perf_counter()
+        df = load(source, rebuild=args.rebuild)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{source}: {len(df)} rows x {df.shape[1]} columns in {elapsed:.1f} ms")
+        print(df.dtypes.to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""
+Scriptable, chunked clustering stage for data center type segmentation.
+
+Reproduces the notebook pipeline (StandardScaler -> KMeans(k=3) -> 2-D PCA)
+with estimators that learn from chunks, so tables of any size are streamed
+instead of loaded whole:
+
+  1. StandardScaler.partial_fit over every chunk,
+  2. MiniBatchKMeans.partial_fit and IncrementalPCA.partial_fit over the
+     scaled chunks (optionally for several epochs).
+
+The fitted state is stored as plain arrays in segmentation.npz next to
+scaler.pkl and rf_model.pkl. New sites are assigned with NumPy only (nearest
+centroid + PCA projection), without refitting or importing scikit-learn.
+Cluster ids can be aligned to an existing labelling (e.g. the Cluster column
+of DC-ClusteredData.csv) so rf_model.pkl keeps predicting the same ids.
+
+Usage:
+    python segmentation.py fit ../../clean-data/DC-ClusteredData.csv --align-to Cluster
+    python segmentation.py assign new_sites.csv clustered.csv --chunksize 100000
+    python segmentation.py bench --rows 1000 10000 100000 1000000 --output bench_segmentation.json
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ARTIFACT_PATH = os.path.join(BASE_DIR, "segmentation.npz")
+DEFAULT_DATA = os.path.join(BASE_DIR, "..", "..", "clean-data", "DC-ClusteredData.csv")
+
+# Same features, in the same order, as scaler.pkl / rf_model.pkl
+FEATURES = [
+    "ENERGY", "AREA", "IT EQUIPMENT POWER", "State_Aggregated_PUE",
+    "FULL_CABINETS", "PARTIAL_CABINETS", "SHARED_RACKSPACE", "CAGES",
+    "SUITES", "BUILD_TO_SUIT", "FOOTPRINTS", "REMOTE_HANDS",
+    "YEAR_OPERATIONAL", "State_Aggregated_IXP_Count",
+]
+
+
+# ------------------------------
+# Chunked input
+# ------------------------------
+def iter_chunks(source, chunksize=100_000):
+    """DataFrame chunks from a CSV/Parquet path, or slices of an in-memory DataFrame."""
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunksize):
+            yield source.iloc[start:start + chunksize]
+    elif source.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(source, chunksize=chunksize)
+
+
+def to_matrix(df):
+    """(n x 14) float matrix in FEATURES order and the mask of complete rows."""
+    missing = [c for c in FEATURES if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing feature columns: {missing}")
+    X = df[FEATURES].astype(float).to_numpy()
+    return X, ~np.isnan(X).any(axis=1)
+
+
+# ------------------------------
+# Fit
+# ------------------------------
+def align_labels(labels, reference, n_clusters):
+    """
+    Permutation of cluster ids that best matches a reference labelling.
+    The permutation reorders the centroids, so reference labels must be
+    cluster ids 0..n_clusters-1 as well.
+    """
+    from scipy.optimize import linear_sum_assignment
+    try:
+        codes = np.asarray(reference, dtype=float)
+    except (TypeError, ValueError):
+        codes = None
+    if codes is None or not np.isin(codes, np.arange(n_clusters)).all():
+        found = sorted(map(str, pd.unique(np.asarray(reference, dtype=object))))
+        raise ValueError(f"Reference labels must be cluster ids 0..{n_clusters - 1} to align "
+                         f"{n_clusters} clusters; found {', '.join(found[:10])}")
+    reference = codes.astype(int)
+    overlap = np.zeros((n_clusters, n_clusters))
+    np.add.at(overlap, (labels, reference), 1)
+    rows, cols = linear_sum_assignment(-overlap)
+    mapping = np.empty(n_clusters, dtype=int)
+    mapping[rows] = cols
+    return mapping
+
+
+def fit(source, n_clusters=3, n_components=2, chunksize=100_000, epochs=1,
+        seed=42, align_to=None):
+    """
+    Fit scaler, MiniBatchKMeans and IncrementalPCA chunk by chunk.
+    With `align_to` (a label column present in the input), cluster ids are
+    permuted to agree as much as possible with that column.
+    """
+    from sklearn.cluster import MiniBatchKMeans
+    from sklearn.decomposition import IncrementalPCA
+    from sklearn.preprocessing import StandardScaler
+
+    scaler = StandardScaler()
+    for chunk in iter_chunks(source, chunksize):
+        X, complete = to_matrix(chunk)
+        if complete.any():
+            scaler.partial_fit(X[complete])
+
+    kmeans = MiniBatchKMeans(n_clusters=n_clusters, random_state=seed, n_init=10,
+                             batch_size=min(chunksize, 4096))
+    pca = IncrementalPCA(n_components=n_components)
+    pending = None  # IncrementalPCA needs at least n_components rows per call
+    for epoch in range(epochs):
+        for chunk in iter_chunks(source, chunksize):
+            X, complete = to_matrix(chunk)
+            Xs = scaler.transform(X[complete])
+            if len(Xs) == 0:
+                continue
+            kmeans.partial_fit(Xs)
+            if epoch == 0:
+                pending = Xs if pending is None else np.vstack([pending, Xs])
+                if len(pending) >= max(n_components, 2):
+                    pca.partial_fit(pending)
+                    pending = None
+    if pending is not None and len(pending) >= n_components:
+        pca.partial_fit(pending)
+
+    centroids = kmeans.cluster_centers_
+    if align_to is not None:
+        labels, reference = [], []
+        for chunk in iter_chunks(source, chunksize):
+            X, complete = to_matrix(chunk)
+            Xs = scaler.transform(X[complete])
+            # Rows without a reference label take no part in the alignment
+            ref = chunk[align_to].to_numpy(dtype=object)[complete]
+            known = ~pd.isna(ref)
+            labels.append(nearest_centroid(Xs, centroids)[known])
+            reference.append(ref[known])
+        mapping = align_labels(np.concatenate(labels), np.concatenate(reference), n_clusters)
+        # Centroid i becomes cluster mapping[i]
+        centroids = centroids[np.argsort(mapping)]
+
+    return {
+        "features": np.array(FEATURES),
+        "scaler_mean": scaler.mean_,
+        "scaler_scale": scaler.scale_,
+        "centroids": centroids,
+        "pca_mean": pca.mean_,
+        "pca_components": pca.components_,
+        "explained_variance_ratio": pca.explained_variance_ratio_,
+    }
+
+
+def save(artifacts, path=ARTIFACT_PATH):
+    np.savez(path, **artifacts)
+    return path
+
+
+def load(path=ARTIFACT_PATH):
+    with np.load(path) as data:
+        artifacts = {name: data[name] for name in data.files}
+    if artifacts["features"].tolist() != FEATURES:
+        raise ValueError(f"{path} was fitted on a different feature order")
+    return artifacts
+
+
+# ------------------------------
+# Assign new sites (NumPy only)
+# ------------------------------
+def nearest_centroid(Xs, centroids):
+    # ||x - c||^2 = ||x||^2 - 2 x.c + ||c||^2; ||x||^2 does not change the argmin
+    return np.argmin((centroids ** 2).sum(axis=1) - 2.0 * Xs @ centroids.T, axis=1)
+
+
+def assign_frame(df, artifacts):
+    """Cluster, PCA1, PCA2 for every row; rows with a missing feature get <NA>."""
+    X, complete = to_matrix(df)
+    Xs = (X[complete] - artifacts["scaler_mean"]) / artifacts["scaler_scale"]
+    clusters = pd.array([pd.NA] * len(df), dtype="Int64")
+    clusters[complete] = nearest_centroid(Xs, artifacts["centroids"])
+    pcs = np.full((len(df), artifacts["pca_components"].shape[0]), np.nan)
+    pcs[complete] = (Xs - artifacts["pca_mean"]) @ artifacts["pca_components"].T
+    out = {"Cluster": clusters}
+    for i in range(pcs.shape[1]):
+        out[f"PCA{i + 1}"] = pcs[:, i]
+    return pd.DataFrame(out, index=df.index)
+
+
+def assign_file(artifacts, input_path, output_path, chunksize=100_000):
+    total = 0
+    for i, chunk in enumerate(iter_chunks(input_path, chunksize)):
+        chunk = chunk.drop(columns=["Cluster", "PCA1", "PCA2"], errors="ignore")
+        chunk = pd.concat([chunk, assign_frame(chunk, artifacts)], axis=1)
+        chunk.to_csv(output_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        total += len(chunk)
+    return total
+
+
+# ------------------------------
+# Benchmark
+# ------------------------------
+def synthetic_sites(base, n_rows, seed=0):
+    """Resample real rows and jitter the continuous columns by 5%."""
+    rng = np.random.default_rng(seed)
+    df = base[FEATURES].iloc[rng.integers(0, len(base), n_rows)].reset_index(drop=True).astype(float)
+    for col in ["ENERGY", "AREA", "IT EQUIPMENT POWER", "State_Aggregated_PUE"]:
+        df[col] *= rng.normal(1.0, 0.05, n_rows)
+    return df
+
+
+def benchmark(rows, data_path=DEFAULT_DATA, chunksize=100_000, seed=42):
+    base = pd.read_csv(data_path)
+    results = []
+    for n in rows:
+        df = synthetic_sites(base, n)
+        start = time.perf_counter()
+        artifacts = fit(df, chunksize=chunksize, seed=seed)
+        fit_s = time.perf_counter() - start
+        start = time.perf_counter()
+        for chunk in iter_chunks(df, chunksize):
+            assign_frame(chunk, artifacts)
+        assign_s = time.perf_counter() - start
+        results.append({"rows": n, "fit_s": fit_s, "assign_s": assign_s,
+                        "assign_rows_per_s": n / assign_s if assign_s else None})
+        print(f"{n:>10} rows   fit {fit_s:8.3f}s   assign {assign_s:8.3f}s")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunked data center type segmentation")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_fit = sub.add_parser("fit", help="Fit scaler, MiniBatchKMeans and IncrementalPCA")
+    p_fit.add_argument("input", nargs="?", default=DEFAULT_DATA)
+    p_fit.add_argument("--clusters", type=int, default=3)
+    p_fit.add_argument("--components", type=int, default=2)
+    p_fit.add_argument("--chunksize", type=int, default=100_000)
+    p_fit.add_argument("--epochs", type=int, default=1, help="Passes of MiniBatchKMeans over the data")
+    p_fit.add_argument("--seed", type=int, default=42)
+    p_fit.add_argument("--align-to", metavar="COLUMN",
+                       help="Permute cluster ids to match an existing label column, e.g. Cluster")
+    p_fit.add_argument("--artifacts", default=ARTIFACT_PATH)
+
+    p_assign = sub.add_parser("assign", help="Assign sites to the saved clusters without refitting")
+    p_assign.add_argument("input")
+    p_assign.add_argument("output")
+    p_assign.add_argument("--chunksize", type=int, default=100_000)
+    p_assign.add_argument("--artifacts", default=ARTIFACT_PATH)
+
+    p_bench = sub.add_parser("bench", help="Time fit and assign against row count")
+    p_bench.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    p_bench.add_argument("--chunksize", type=int, default=100_000)
+    p_bench.add_argument("--output", help="Optional JSON file for the results")
+
+    args = parser.parse_args()
+    if args.command == "fit":
+        start = time.perf_counter()
+        artifacts = fit(args.input, args.clusters, args.components, args.chunksize,
+                        args.epochs, args.seed, args.align_to)
+        print(f"Fitted in {time.perf_counter() - start:.2f}s; saved to: {save(artifacts, args.artifacts)}")
+        if args.align_to:
+            df = pd.read_csv(args.input)
+            agreement = (assign_frame(df, artifacts)["Cluster"] == df[args.align_to]).mean()
+            print(f"Agreement with '{args.align_to}': {agreement:.1%}")
+    elif args.command == "assign":
+        start = time.perf_counter()
+        n = assign_file(load(args.artifacts), args.input, args.output, args.chunksize)
+        print(f"Assigned {n} rows in {time.perf_counter() - start:.2f}s -> {args.output}")
+    else:
+        results = benchmark(args.rows, chunksize=args.chunksize)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump({"chunksize": args.chunksize, "results": results}, f, indent=2)
+            print(f"Saved results to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
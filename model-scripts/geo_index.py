@@ -0,0 +1,228 @@
+"""
+Haversine nearest-neighbour index for candidate sites, IXPs and user centres.
+
+Points are kept in a scikit-learn BallTree with the haversine metric, so
+"k nearest IXPs" and "everything within a radius" are answered for a whole
+batch of query points in O(Q log N) instead of an O(Q x N) pairwise loop.
+Dense distance matrices are built with NumPy broadcasting in row chunks.
+
+Latency is estimated from great-circle distance as a round trip over fiber:
+
+    rtt_ms = overhead_ms + 2 * route_factor * distance_km / FIBER_KM_PER_MS
+
+`site_features` turns these queries into per-site columns (nearest IXP
+distance, IXPs within reach, population-weighted latency_to_users, share of
+users within the latency limit) that site_selection.SiteSelectionProblem and
+the gravity model consume as ordinary columns.
+
+data-final.csv has no coordinates, so sites and IXPs come from CSVs with a
+name column plus `lat`/`lon` in degrees; site rows are joined to the
+dataset on LOCATION. US metro population centres ship in
+clean-data/us_metro_population.csv.
+
+Usage:
+    python geo_index.py sites.csv --ixps ixps.csv --k 3 --max-latency 20 --output site_geo.csv
+    index = GeoIndex.from_csv("ixps.csv", name_column="IXP")
+    dist_km, names = index.nearest(site_lat, site_lon, k=3)
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_USERS = os.path.join(BASE_DIR, "..", "clean-data", "us_metro_population.csv")
+
+EARTH_RADIUS_KM = 6371.0088
+# Light in fiber covers roughly 200 km per millisecond
+FIBER_KM_PER_MS = 200.0
+ROUTE_FACTOR = 1.5   # cable paths are longer than the great circle
+OVERHEAD_MS = 1.0    # switching / last-mile overhead per round trip
+
+# Max elements of one (rows x M) block in distance_matrix
+_CHUNK_ELEMENTS = 1 << 24
+
+
+# ------------------------------
+# Distance and latency
+# ------------------------------
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Element-wise great-circle distance in km; inputs in degrees, broadcastable."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a, dtype=float)) for a in (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def latency_ms(distance_km, route_factor=ROUTE_FACTOR, overhead_ms=OVERHEAD_MS):
+    """Estimated round-trip latency for a great-circle distance."""
+    return overhead_ms + 2 * route_factor * np.asarray(distance_km, dtype=float) / FIBER_KM_PER_MS
+
+
+def latency_radius_km(max_ms, route_factor=ROUTE_FACTOR, overhead_ms=OVERHEAD_MS):
+    """Inverse of latency_ms: the distance reachable within `max_ms`."""
+    return max(0.0, (max_ms - overhead_ms) * FIBER_KM_PER_MS / (2 * route_factor))
+
+
+def distance_matrix(lat1, lon1, lat2, lon2):
+    """(len(1) x len(2)) great-circle distances in km, built in row chunks."""
+    lat1, lon1 = np.asarray(lat1, dtype=float), np.asarray(lon1, dtype=float)
+    lat2, lon2 = np.asarray(lat2, dtype=float), np.asarray(lon2, dtype=float)
+    out = np.empty((len(lat1), len(lat2)))
+    step = max(1, _CHUNK_ELEMENTS // max(1, len(lat2)))
+    for start in range(0, len(lat1), step):
+        rows = slice(start, start + step)
+        out[rows] = haversine_km(lat1[rows, None], lon1[rows, None], lat2[None, :], lon2[None, :])
+    return out
+
+
+# ------------------------------
+# BallTree index
+# ------------------------------
+class GeoIndex:
+    """BallTree over (lat, lon) points, queried in km."""
+
+    def __init__(self, names, lat, lon, weights=None):
+        from sklearn.neighbors import BallTree
+        self.names = np.asarray(names)
+        self.lat = np.asarray(lat, dtype=float)
+        self.lon = np.asarray(lon, dtype=float)
+        if np.isnan(self.lat).any() or np.isnan(self.lon).any():
+            raise ValueError("GeoIndex points must all have coordinates")
+        self.weights = None if weights is None else np.asarray(weights, dtype=float)
+        self.tree = BallTree(np.radians(np.column_stack([self.lat, self.lon])), metric="haversine")
+
+    @classmethod
+    def from_frame(cls, df, name_column, lat="lat", lon="lon", weight_column=None):
+        weights = df[weight_column] if weight_column else None
+        return cls(df[name_column], df[lat], df[lon], weights)
+
+    @classmethod
+    def from_csv(cls, path, name_column, lat="lat", lon="lon", weight_column=None):
+        return cls.from_frame(pd.read_csv(path), name_column, lat, lon, weight_column)
+
+    def __len__(self):
+        return len(self.names)
+
+    @staticmethod
+    def _query_points(lat, lon):
+        return np.radians(np.column_stack([np.atleast_1d(lat), np.atleast_1d(lon)]).astype(float))
+
+    def nearest(self, lat, lon, k=1):
+        """(Q x k) distances in km and indices of the k nearest points, closest first."""
+        k = min(k, len(self))
+        dist, idx = self.tree.query(self._query_points(lat, lon), k=k)
+        return dist * EARTH_RADIUS_KM, idx
+
+    def within(self, lat, lon, radius_km):
+        """Per query point, the indices (and km distances) of points within `radius_km`."""
+        idx, dist = self.tree.query_radius(self._query_points(lat, lon), r=radius_km / EARTH_RADIUS_KM,
+                                           return_distance=True, sort_results=True)
+        return idx, [d * EARTH_RADIUS_KM for d in dist]
+
+    def count_within(self, lat, lon, radius_km):
+        return self.tree.query_radius(self._query_points(lat, lon), r=radius_km / EARTH_RADIUS_KM,
+                                      count_only=True)
+
+    def within_latency(self, lat, lon, max_ms, **latency):
+        """Indices of the points each query can reach within `max_ms` estimated RTT."""
+        return self.within(lat, lon, latency_radius_km(max_ms, **latency))[0]
+
+    def distances_to(self, lat, lon):
+        """Dense (Q x N) distance matrix from the query points to every indexed point."""
+        return distance_matrix(np.atleast_1d(lat), np.atleast_1d(lon), self.lat, self.lon)
+
+
+# ------------------------------
+# Coefficients for the optimizers
+# ------------------------------
+def site_features(sites, ixps=None, users=None, k=3, max_latency_ms=20.0,
+                  lat="lat", lon="lon", **latency):
+    """
+    Per-site connectivity and latency columns, aligned with `sites`' index.
+
+    ixps:  GeoIndex of internet exchange points
+    users: GeoIndex of population centres, weighted by population
+    """
+    site_lat, site_lon = sites[lat].to_numpy(dtype=float), sites[lon].to_numpy(dtype=float)
+    out = pd.DataFrame(index=sites.index)
+    radius = latency_radius_km(max_latency_ms, **latency)
+
+    if ixps is not None:
+        dist, idx = ixps.nearest(site_lat, site_lon, k)
+        out["nearest_ixp"] = ixps.names[idx[:, 0]]
+        out["nearest_ixp_km"] = dist[:, 0]
+        out[f"mean_{k}_ixp_km"] = dist.mean(axis=1)
+        out["ixp_latency_ms"] = latency_ms(dist[:, 0], **latency)
+        out["ixps_within_latency"] = ixps.count_within(site_lat, site_lon, radius)
+
+    if users is not None:
+        # Users are few (metros), so the dense matrix is cheap and exact
+        D = users.distances_to(site_lat, site_lon)
+        weights = np.ones(len(users)) if users.weights is None else users.weights
+        share = weights / weights.sum()
+        out["latency_to_users"] = latency_ms(D, **latency) @ share
+        out["nearest_users_km"] = D.min(axis=1)
+        out["users_within_latency"] = (D <= radius) @ share
+    return out
+
+
+def attach_coordinates(df, coordinates, on="LOCATION", lat="lat", lon="lon"):
+    """Left-join site coordinates onto a dataset; reports rows left without them."""
+    merged = df.merge(coordinates[[on, lat, lon]], on=on, how="left")
+    missing = merged[lat].isna() | merged[lon].isna()
+    if missing.any():
+        print(f"Warning: {missing.sum()} of {len(merged)} sites have no coordinates")
+    return merged
+
+
+def _pairwise_loop(site_lat, site_lon, lat, lon):
+    # Reference O(N*M) loop used by --check
+    best = np.empty(len(site_lat))
+    for i in range(len(site_lat)):
+        best[i] = min(haversine_km(site_lat[i], site_lon[i], lat[j], lon[j]) for j in range(len(lat)))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nearest-IXP and latency coefficients for candidate sites")
+    parser.add_argument("sites", help="CSV with a site name column plus lat/lon")
+    parser.add_argument("--site-column", default="LOCATION")
+    parser.add_argument("--ixps", help="CSV of IXPs with name and lat/lon")
+    parser.add_argument("--ixp-column", default="IXP")
+    parser.add_argument("--users", default=DEFAULT_USERS, help="CSV of population centres")
+    parser.add_argument("--user-column", default="Metro")
+    parser.add_argument("--weight-column", default="Population")
+    parser.add_argument("--k", type=int, default=3, help="Nearest IXPs to average over")
+    parser.add_argument("--max-latency", type=float, default=20.0, help="Latency limit in ms")
+    parser.add_argument("--output", help="CSV to write the site columns to")
+    parser.add_argument("--check", action="store_true",
+                        help="Compare nearest-IXP distances against a pairwise loop")
+    args = parser.parse_args()
+
+    sites = pd.read_csv(args.sites).dropna(subset=["lat", "lon"]).reset_index(drop=True)
+    ixps = GeoIndex.from_csv(args.ixps, args.ixp_column) if args.ixps else None
+    users = GeoIndex.from_csv(args.users, args.user_column, weight_column=args.weight_column) if args.users else None
+
+    start = time.perf_counter()
+    features = site_features(sites, ixps, users, args.k, args.max_latency)
+    print(f"Computed {features.shape[1]} columns for {len(sites)} sites in {time.perf_counter() - start:.3f}s")
+
+    result = pd.concat([sites[[args.site_column]], features], axis=1)
+    print(result.head(10).to_string(index=False))
+    if args.output:
+        result.to_csv(args.output, index=False)
+        print(f"Saved to: {args.output}")
+
+    if args.check and ixps is not None:
+        start = time.perf_counter()
+        reference = _pairwise_loop(sites["lat"].to_numpy(), sites["lon"].to_numpy(), ixps.lat, ixps.lon)
+        elapsed = time.perf_counter() - start
+        error = np.abs(reference - features["nearest_ixp_km"].to_numpy()).max()
+        print(f"Pairwise loop: {elapsed:.3f}s, max abs difference {error:.2e} km")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,69 +1,89 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-
-# Data for each city based on the collected parameters:
-data = {
-    "City": ["Mumbai", "Gurgaon", "Nagpur", "Hyderabad", "Mangalore", 
-             "Bangalore", "Pune", "Ahmedabad", "Noida", "Chandigarh", "Jaipur", "Kolkata", "Bhopal"],
-    "Water": [50, 50, 21.5, 80, 80, 68.5, 21.5, 30, 40, 20, 30, 25, 20],         # ₹ per 1000 L
-    "Energy": [7.5, 6.75, 7.0, 6.3, 7.0, 7.15, 7.0, 7.5, 8.2, 7.0, 7.5, 8.1, 7.0],   # ₹ per kWh
-    "Workforce": [803000, 771000, 550000, 746000, 550000, 891000, 720000, 720000, 771000, 700000, 640000, 643000, 550000],  # Annual salary in ₹
-    "Renewable": [45, 29, 45, 42.9, 70.8, 70.8, 45, 59.5, 18.3, 36.5, 74.6, 13.5, 32],  # % of power from renewable sources
-    "LandCost": [3000, 2500, 475, 1200, 800, 2000, 1500, 1000, 2500, 1200, 800, 1000, 500],  # ₹ per sq ft
-    "LandAvail": [3, 6, 9, 8, 7, 5, 7, 8, 7, 6, 8, 6, 9],  # Index from 1 (scarce) to 10 (abundant)
-    "Network": [10, 8, 5, 8, 6, 9, 7, 6, 9, 6, 6, 6, 5],  # Connectivity index (1-10)
-    "Climate": [5, 7, 8, 8, 6, 7, 8, 7, 7, 7, 8, 6, 9]   # Climate resilience index (1-10)
-}
-
-df = pd.DataFrame(data)
-
-# Define weights for each parameter:
-weights = {
-    "Water": 0.05,      # cost: lower is better
-    "Energy": 0.20,     # cost: lower is better
-    "Workforce": 0.05,  # cost: lower is better
-    "LandCost": 0.15,   # cost: lower is better
-    "Renewable": 0.10,  # benefit: higher is better
-    "LandAvail": 0.05,  # benefit: higher is better
-    "Network": 0.20,    # benefit: higher is better
-    "Climate": 0.10     # benefit: higher is better
-}
-
-# Identify which parameters are cost factors and which are benefit factors:
-cost_params = ["Water", "Energy", "Workforce", "LandCost"]
-benefit_params = ["Renewable", "LandAvail", "Network", "Climate"]
-
-# Normalize each parameter using min-max normalization:
-for param in weights.keys():
-    min_val = df[param].min()
-    max_val = df[param].max()
-    if param in cost_params:
-        # For cost parameters, lower is better: invert the scale.
-        df[param + "_norm"] = (max_val - df[param]) / (max_val - min_val)
+"""
+Gravity model ranking of candidate cities.
+
+Usage:
+    python gravity-model.py                       # print the tables and show the score chart
+    python gravity-model.py --no-plot             # headless: tables only
+    python gravity-model.py --save-plot scores.png
+"""
+import argparse
+import os
+
+from gravity_engine import load_config, GravityModel
+
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gravity_config.json")
+
+
+def score_cities(config):
+    # City data, weights and the cost/benefit split come from gravity_config.json:
+    # cities are loaded from datacenter_city_scores_with_sources.csv (or DC-India.xlsx)
+    model = GravityModel.from_config(config)
+
+    # Normalize every parameter with min-max normalization (cost parameters
+    # inverted), compute the composite gravity model score as N @ w and sort by
+    # score in descending order (higher score = more attractive)
+    return model, model.ranked()
+
+
+def report(model, df, config):
+    # Display the computed scores:
+    print("Composite Attraction Scores for Data Center Site Selection:")
+    print(df[["City", "Score"]])
+
+    # Rank stability over thousands of weight vectors, scored as one (W x P) @ (P x C) product
+    sweep = config["sweep"]
+    W = model.sample_weight_sets(sweep["n_weight_sets"], sweep["concentration"], sweep["seed"])
+    print(f"\nRank stability over {len(W)} weight sets (Dirichlet around the configured weights):")
+    print(model.rank_stability(W, sweep["top_k"]).to_string(index=False))
+
+    # Rank shift of each city when one weight is raised/lowered
+    print("\nRank shift per one-at-a-time weight perturbation:")
+    print(model.sensitivity(sweep["sensitivity_delta"]).to_string())
+
+
+def plot_scores(df, save_path=None):
+    """Bar chart of the scores; shown on screen, or only written to `save_path`."""
+    # matplotlib is only imported when a chart is drawn
+    import matplotlib
+    if save_path:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    # Plot the scores for visualization:
+    plt.figure(figsize=(10, 6))
+    plt.bar(df["City"], df["Score"], color="skyblue")
+    plt.xlabel("City")
+    plt.ylabel("Attraction Score")
+    plt.title("Gravity Model Scores for Data Center Location")
+    plt.xticks(rotation=45)
+    for i, score in enumerate(df["Score"]):
+        plt.text(i, score + 0.005, f"{score:.3f}", ha="center", va="bottom")
+    plt.tight_layout()
+    if save_path:
+        plt.savefig(save_path)
+        plt.close()
+        print(f"Saved plot to: {save_path}")
     else:
-        # For benefit parameters, higher is better.
-        df[param + "_norm"] = (df[param] - min_val) / (max_val - min_val)
-
-# Compute the composite gravity model score:
-df["Score"] = 0
-for param, weight in weights.items():
-    df["Score"] += df[param + "_norm"] * weight
-
-# Sort by score in descending order (higher score = more attractive)
-df = df.sort_values(by="Score", ascending=False).reset_index(drop=True)
-
-# Display the computed scores:
-print("Composite Attraction Scores for Data Center Site Selection:")
-print(df[["City", "Score"]])
-
-# Plot the scores for visualization:
-plt.figure(figsize=(10, 6))
-plt.bar(df["City"], df["Score"], color="skyblue")
-plt.xlabel("City")
-plt.ylabel("Attraction Score")
-plt.title("Gravity Model Scores for Data Center Location")
-plt.xticks(rotation=45)
-for i, score in enumerate(df["Score"]):
-    plt.text(i, score + 0.005, f"{score:.3f}", ha="center", va="bottom")
-plt.tight_layout()
-plt.show()
+        plt.show()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Gravity model scores for data center locations")
+    parser.add_argument("--config", default=DEFAULT_CONFIG, help="Weights, cost/benefit split and city source")
+    plot = parser.add_mutually_exclusive_group()
+    plot.add_argument("--no-plot", action="store_true", help="Skip the score chart (headless runs)")
+    plot.add_argument("--save-plot", metavar="PATH", help="Write the score chart to PATH instead of showing it")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    config = load_config(args.config)
+    model, df = score_cities(config)
+    report(model, df, config)
+    if not args.no_plot:
+        plot_scores(df, args.save_plot)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Vectorized, config-driven gravity scoring engine.
+
+Cities are loaded from datacenter_city_scores_with_sources.csv (or parsed from
+DC-India.xlsx), and weights plus the cost/benefit split come from
+gravity_config.json. With the min-max normalized (C x P) city matrix N and a
+weight vector w (P), the composite attraction score is the single product
+
+    Score = N @ w
+
+and a whole batch of weight vectors W (S x P) is scored at once as
+
+    Scores = W @ N.T        (S x C)
+
+which is what the rank-stability and sensitivity analyses are built on.
+"""
+import json
+import os
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Normalization kernel shared with the other models (model-scripts/scoring.py)
+sys.path.insert(0, os.path.join(BASE_DIR, ".."))
+from scoring import normalize
+DEFAULT_CONFIG = os.path.join(BASE_DIR, "gravity_config.json")
+
+_NUMBER = r"\d[\d,]*(?:\.\d+)?"
+_RANGE = re.compile(rf"({_NUMBER})\s*[–-]\s*({_NUMBER})")
+
+
+def load_config(path=DEFAULT_CONFIG):
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    # Relative source paths are resolved against the config file
+    config["source"] = os.path.join(os.path.dirname(os.path.abspath(path)), config["source"])
+    return config
+
+
+# ------------------------------
+# City data loading
+# ------------------------------
+def parse_xlsx_value(cell):
+    """
+    Turn a DC-India.xlsx cell such as '~₹6.5–7.0/kWh' or '3 – Scarce urban land'
+    into a number: the midpoint of a leading numeric range, else the first number.
+    """
+    if pd.isna(cell):
+        return np.nan
+    if isinstance(cell, (int, float)):
+        return float(cell)
+    text = str(cell)
+    first = re.search(_NUMBER, text)
+    if first is None:
+        return np.nan
+    rng = _RANGE.match(text, first.start())
+    if rng:
+        low, high = (float(x.replace(",", "")) for x in rng.groups())
+        return (low + high) / 2
+    return float(first.group().replace(",", ""))
+
+
+def load_xlsx_cities(path, xlsx_columns):
+    raw = pd.read_excel(path)
+    # Rows without a city hold footnote sources for the row above
+    raw = raw[raw["City"].notna()]
+    data = {"City": raw["City"].str.replace(r"\s*\(.*\)\s*$", "", regex=True).str.strip()}
+    for param, prefix in xlsx_columns.items():
+        matches = [c for c in raw.columns if str(c).startswith(prefix)]
+        if not matches:
+            raise ValueError(f"No column starting with '{prefix}' in {path}")
+        data[param] = raw[matches[0]].map(parse_xlsx_value)
+    return pd.DataFrame(data).reset_index(drop=True)
+
+
+def load_cities(path, xlsx_columns=None):
+    if path.endswith((".xlsx", ".xls")):
+        return load_xlsx_cities(path, xlsx_columns or {})
+    return pd.read_csv(path)
+
+
+# ------------------------------
+# Scoring engine
+# ------------------------------
+class GravityModel:
+    def __init__(self, df, weights, cost_params, benefit_params):
+        self.df = df.reset_index(drop=True)
+        self.params = list(weights)
+        unknown = set(self.params) - set(cost_params) - set(benefit_params)
+        if unknown:
+            raise ValueError(f"Parameters neither cost nor benefit: {sorted(unknown)}")
+        self.weights = np.array([weights[p] for p in self.params], dtype=float)
+        self.is_cost = np.array([p in cost_params for p in self.params])
+
+        # Min-max normalize every column at once; cost columns are inverted and
+        # a parameter with the same value in every city normalizes to 0
+        self.norm = normalize(self.df[self.params].to_numpy(dtype=float), self.is_cost, invert=True)
+
+    @classmethod
+    def from_config(cls, config, df=None):
+        if df is None:
+            df = load_cities(config["source"], config.get("xlsx_columns"))
+        return cls(df, config["weights"], config["cost_params"], config["benefit_params"])
+
+    @property
+    def cities(self):
+        return self.df["City"].to_numpy()
+
+    def normalized(self):
+        return pd.DataFrame(self.norm, columns=[p + "_norm" for p in self.params])
+
+    def score(self, weights=None):
+        w = self.weights if weights is None else np.asarray(weights, dtype=float)
+        return self.norm @ w
+
+    def ranked(self):
+        """City table with normalized columns and Score, best city first."""
+        df = pd.concat([self.df, self.normalized()], axis=1)
+        df["Score"] = self.score()
+        return df.sort_values(by="Score", ascending=False).reset_index(drop=True)
+
+    # ------------------------------
+    # Many weight vectors in one pass
+    # ------------------------------
+    def score_weight_sets(self, W):
+        """(S x P) weight vectors -> (S x C) scores."""
+        return np.asarray(W, dtype=float) @ self.norm.T
+
+    @staticmethod
+    def ranks(scores):
+        """Rank cities (1 = best) in every row of an (S x C) score matrix."""
+        order = np.argsort(-scores, axis=1, kind="stable")
+        ranks = np.empty_like(order)
+        ranks[np.arange(len(scores))[:, None], order] = np.arange(1, scores.shape[1] + 1)
+        return ranks
+
+    def sample_weight_sets(self, n, concentration=200.0, seed=None):
+        """Dirichlet samples centred on the configured weights (each row sums to 1)."""
+        rng = np.random.default_rng(seed)
+        return rng.dirichlet(self.weights / self.weights.sum() * concentration, size=n)
+
+    def rank_stability(self, W, top_k=3):
+        """Per-city rank distribution over the weight sets in W."""
+        ranks = self.ranks(self.score_weight_sets(W))
+        base_rank = self.ranks(self.score()[None, :])[0]
+        return pd.DataFrame({
+            "City": self.cities,
+            "Base Rank": base_rank,
+            "Mean Rank": ranks.mean(axis=0),
+            "Rank Std": ranks.std(axis=0),
+            "Best Rank": ranks.min(axis=0),
+            "Worst Rank": ranks.max(axis=0),
+            "P(Top 1)": (ranks == 1).mean(axis=0),
+            f"P(Top {top_k})": (ranks <= top_k).mean(axis=0),
+        }).sort_values("Base Rank").reset_index(drop=True)
+
+    def sensitivity(self, delta=0.05):
+        """
+        One-at-a-time sensitivity: raise and lower each weight by `delta`
+        (clipped at 0, renormalized to sum to 1) and report every city's rank
+        shift under each perturbation. All 2P weight vectors are scored at once.
+        """
+        P = len(self.params)
+        W = np.repeat(self.weights[None, :], 2 * P, axis=0)
+        W[np.arange(P), np.arange(P)] += delta
+        W[P + np.arange(P), np.arange(P)] -= delta
+        W = np.clip(W, 0, None)
+        W /= W.sum(axis=1, keepdims=True)
+
+        shift = self.ranks(self.score_weight_sets(W)) - self.ranks(self.score()[None, :])
+        labels = [f"{p} +{delta:g}" for p in self.params] + [f"{p} -{delta:g}" for p in self.params]
+        return pd.DataFrame(shift.T, index=self.cities, columns=labels)
@@ -0,0 +1,539 @@
+"""
+Incremental re-scoring of candidate sites and gravity cities from a delta file.
+
+A delta is a CSV of new or changed rows keyed on LOCATION (sites, the
+data-final.csv schema) or City (gravity cities). Applying it to the
+maintained state:
+
+  1. upserts the rows into the typed table (feature_store dtypes, derived
+     SERVICE_AVAILABILITY_SCORE and FACILITY_AGE recomputed for them);
+     rows identical to the stored ones are ignored;
+  2. assigns Cluster to new and changed sites with the existing scaler.pkl
+     and rf_model.pkl (streamlit-files/predictor.py);
+  3. updates the per-column min/max bounds from the delta alone, scanning a
+     full column only when a changed row held its old min or max;
+  4. re-normalizes only the affected rows, except for columns whose min or
+     max moved - those are re-normalized for every row;
+  5. recomputes the weighted score for affected rows and moves them in the
+     sorted ranking with searchsorted (all rows are rescored and re-sorted
+     only when a column was re-normalized).
+
+Row values are kept in preallocated arrays by position, so a delta touches
+only its own rows; the typed table is merged when it is read or saved.
+
+Site scores use the nsga_aggregator weighting
+
+    Weighted Score = -0.4*norm(PUE) + 0.3*norm(IXP) + 0.2*norm(Service) - 0.1*norm(Age)
+
+and city scores the GravityModel one (cost columns inverted, weights from
+gravity_config.json). Columns with a single value normalize to 0.
+
+State is kept as Parquet plus a JSON file of bounds under
+clean-data/.cache/incremental/, one pair per target.
+
+Usage:
+    python incremental.py init --target sites                 # full build from data-final.csv
+    python incremental.py apply new_sites.csv --target sites --output scored.csv
+    python incremental.py init --target gravity
+    python incremental.py check --target sites --rows 100000 --delta 100
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.join(HERE, "..")
+sys.path.insert(0, os.path.join(REPO_DIR, "clean-data"))
+import feature_store
+
+from scoring import bounds, normalize, weighted_score
+
+STATE_DIR = os.path.join(feature_store.DATA_DIR, feature_store.CACHE_DIRNAME, "incremental")
+
+# nsga_aggregator weights for the per-site score; PUE and age are costs
+SITE_WEIGHTS = {
+    "State_Aggregated_PUE": 0.4,
+    "State_Aggregated_IXP_Count": 0.3,
+    "SERVICE_AVAILABILITY_SCORE": 0.2,
+    "FACILITY_AGE": 0.1,
+}
+SITE_COSTS = ["State_Aggregated_PUE", "FACILITY_AGE"]
+
+_MISSING = object()
+
+
+def _concat(frames):
+    # Empty frames are left out: pandas deprecates letting them take part in
+    # the result dtypes
+    frames = [f for f in frames if len(f)] or frames[:1]
+    return frames[0] if len(frames) == 1 else pd.concat(frames)
+
+
+class IncrementalScorer:
+    """
+    Min-max normalized weighted scores over a keyed table, kept current
+    under upserts.
+
+    key:        column identifying a row
+    weights:    {column: weight}
+    costs:      columns where lower is better
+    invert:     cost columns normalize to (high - x) / span (GravityModel);
+                otherwise to (x - low) / span with a negated weight (nsga_aggregator)
+    predictor:  optional ClusterPredictor; sets Cluster for new and changed rows
+    prepare:    callable applied to upserted rows before scoring (typing, derived columns)
+
+    Feature values, normalized values, scores and clusters live in
+    preallocated arrays addressed by row position, and the ranking as a
+    sorted (score, position) order. A delta writes only its rows' positions
+    and moves them in the order with searchsorted; upserted rows are held
+    aside and merged into the table when it is read (`df`, `ranked`, `save`).
+    """
+
+    def __init__(self, key, weights, costs, invert=False, score_column="Score",
+                 predictor=None, prepare=None):
+        self.key = key
+        self.columns = list(weights)
+        self.is_cost = np.array([c in costs for c in self.columns])
+        self.weights = np.array([weights[c] for c in self.columns], dtype=float)
+        self.invert = invert
+        self.score_column = score_column
+        self.norm_columns = [c + "_norm" for c in self.columns]
+        self.predictor = predictor
+        self.prepare = prepare or (lambda df: df)
+        self.low = self.high = None
+        self.n = 0
+        self._base = None       # table as of the last merge, keyed
+        self._patch = None      # prepared rows upserted since, keyed
+        self._table = None      # merged table with score columns, until the next delta
+        self._pos = {}          # key -> row position
+
+    # ------------------------------
+    # Normalization and ranking
+    # ------------------------------
+    def _normalize(self, X, cols=slice(None)):
+        return normalize(X, self.is_cost[cols], self.invert, low=self.low[cols], high=self.high[cols])
+
+    def _score(self, norm):
+        # Row-wise kernel sum, so a row scores the same bits whether it is
+        # rescored alone or with the whole table (ties rank stably)
+        return weighted_score(norm, self.weights, self.is_cost, self.invert)
+
+    def _keyed(self, df):
+        # Rows are addressed by key; the key column stays in the table
+        df = df.set_index(self.key, drop=False)
+        df.index.name = None
+        return df
+
+    @staticmethod
+    def _sort_keys(score):
+        # Best score first; missing scores sort last
+        return np.where(np.isnan(score), np.inf, -score)
+
+    def _full_rank(self):
+        keys = self._sort_keys(self.score[:self.n])
+        # Ties keep table order
+        self._order = np.argsort(keys, kind="stable")
+        self._sorted = keys[self._order]
+
+    def _locate(self, keys, positions):
+        """Indices in the sorted order where (key, position) pairs are, or would go."""
+        left = np.searchsorted(self._sorted, keys, side="left")
+        right = np.searchsorted(self._sorted, keys, side="right")
+        # Within a run of equal scores the order is by position
+        return np.array([lo + np.searchsorted(self._order[lo:hi], p)
+                         for lo, hi, p in zip(left, right, positions)], dtype=np.intp)
+
+    def _rerank(self, old_positions, old_keys, positions):
+        """Move rescored rows to their new place in the sorted order."""
+        if len(old_positions):
+            at = self._locate(old_keys, old_positions)
+            self._sorted = np.delete(self._sorted, at)
+            self._order = np.delete(self._order, at)
+        keys = self._sort_keys(self.score[positions])
+        by = np.lexsort((positions, keys))
+        keys, positions = keys[by], positions[by]
+        at = self._locate(keys, positions)
+        self._sorted = np.insert(self._sorted, at, keys)
+        self._order = np.insert(self._order, at, positions)
+
+    def _ranks(self):
+        ranks = np.empty(self.n, dtype="int64")
+        ranks[self._order] = np.arange(1, self.n + 1)
+        return ranks
+
+    def _predict(self, rows):
+        return pd.array(self.predictor.predict(rows), dtype="Int64").to_numpy(dtype=float, na_value=np.nan)
+
+    def _reserve(self, n):
+        """Grow the row arrays (doubling) to hold n rows."""
+        capacity = len(self.score)
+        if n <= capacity:
+            return
+        capacity = max(n, 2 * capacity)
+        for name in ("X", "norm", "score", "cluster"):
+            a = getattr(self, name)
+            grown = np.full((capacity,) + a.shape[1:], np.nan)
+            grown[:len(a)] = a
+            setattr(self, name, grown)
+
+    def _init_arrays(self, df):
+        self._base = self._keyed(df)
+        self._patch = self._base.iloc[:0]
+        self._table = None
+        self.n = len(df)
+        self._pos = dict(zip(df[self.key].tolist(), range(self.n)))
+        self.X = df[self.columns].to_numpy(dtype=float, na_value=np.nan)
+        self.cluster = df["Cluster"].to_numpy(dtype=float, na_value=np.nan) \
+            if "Cluster" in df.columns else np.full(self.n, np.nan)
+
+    def build(self, df):
+        """Score a whole table from scratch."""
+        df = self.prepare(df.copy())
+        if df[self.key].duplicated().any():
+            raise ValueError(f"Duplicate {self.key} values in the table")
+        self._init_arrays(df)
+        self.low, self.high = bounds(self.X)
+        self.norm = self._normalize(self.X)
+        self.score = self._score(self.norm)
+        if self.predictor is not None:
+            # Keep labels from the clustering notebook, predict the missing ones
+            missing = np.flatnonzero(np.isnan(self.cluster))
+            if len(missing):
+                self.cluster[missing] = self._predict(self._base.iloc[missing])
+        self._full_rank()
+        return self
+
+    # ------------------------------
+    # Delta updates
+    # ------------------------------
+    def _stored(self, keys, positions):
+        """Current rows for existing keys: upserted ones from the patch, the rest from the table."""
+        at = self._patch.index.get_indexer(keys) if len(self._patch) else np.full(len(keys), -1)
+        patched = at >= 0
+        if not patched.any():
+            return self._base.iloc[positions]
+        rows = _concat([self._base.iloc[positions[~patched]], self._patch.iloc[at[patched]]])
+        order = np.concatenate([np.flatnonzero(~patched), np.flatnonzero(patched)])
+        return rows.iloc[np.argsort(order, kind="stable")]
+
+    def _split(self, delta):
+        """Delta rows with new keys, and the stored rows and positions of those whose values differ."""
+        if delta[self.key].duplicated().any():
+            raise ValueError(f"Duplicate {self.key} values in the delta")
+        delta = self._keyed(delta)
+        where = np.array([self._pos.get(k, -1) for k in delta[self.key].tolist()], dtype=np.intp)
+        exists = where >= 0
+        stored = self._stored(delta.index[exists], where[exists])
+        cols = [c for c in delta.columns if c in stored.columns]
+        old = stored[cols].to_numpy(dtype=object)
+        upd = delta[exists][cols].to_numpy(dtype=object)
+        # NaN and <NA> never compare equal, so both sides share one placeholder
+        old[pd.isna(old)] = upd[pd.isna(upd)] = _MISSING
+        differs = ~(old == upd).all(axis=1)
+        return delta[exists][differs], stored[differs], where[exists][differs], delta[~exists]
+
+    def _update_bounds(self, old_X, new_X, X):
+        """New (low, high) from the delta; full-column scans only where an old extreme left."""
+        low, high = self.low.copy(), self.high.copy()
+        if len(new_X):
+            low = np.fmin(low, np.nanmin(new_X, axis=0))
+            high = np.fmax(high, np.nanmax(new_X, axis=0))
+        if len(old_X):
+            left = (old_X == self.low).any(axis=0) | (old_X == self.high).any(axis=0)
+            for j in np.flatnonzero(left):
+                low[j], high[j] = np.nanmin(X[:, j]), np.nanmax(X[:, j])
+        return low, high
+
+    def apply(self, delta):
+        """Upsert `delta` rows and re-score; returns a summary of what was recomputed."""
+        n_delta = len(delta)
+        changed, stored, positions, new = self._split(delta)
+        summary = {"delta_rows": n_delta, "new": len(new), "changed": len(changed),
+                   "renormalized": [], "rescored_rows": 0}
+        if not len(changed) and not len(new):
+            return summary
+
+        # Changed rows keep their stored values for columns the delta does not carry
+        rows = stored.copy()
+        for col in changed.columns.intersection(rows.columns):
+            rows[col] = changed[col].to_numpy()
+        upserted = self._keyed(_concat([self.prepare(rows), self.prepare(new.copy())]))
+        self._patch = _concat([self._patch[~self._patch.index.isin(upserted.index)], upserted])
+        self._table = None
+
+        added = np.arange(self.n, self.n + len(new))
+        self._pos.update(zip(upserted.index[len(rows):].tolist(), added.tolist()))
+        pos = np.concatenate([positions, added])
+        old_X = self.X[positions]
+        old_keys = self._sort_keys(self.score[positions])
+        self._reserve(self.n + len(new))
+        self.n += len(new)
+        self.X[pos] = upserted[self.columns].to_numpy(dtype=float, na_value=np.nan)
+
+        X = self.X[:self.n]
+        low, high = self._update_bounds(old_X, self.X[pos], X)
+        moved = (low != self.low) | (high != self.high)
+        self.low, self.high = low, high
+        cols, keep = np.flatnonzero(moved), np.flatnonzero(~moved)
+        if moved.any():
+            # A moved bound rescales its column for every row
+            self.norm[:self.n, cols] = self._normalize(X[:, cols], cols)
+            self.norm[np.ix_(pos, keep)] = self._normalize(self.X[np.ix_(pos, keep)], keep)
+            self.score[:self.n] = self._score(self.norm[:self.n])
+            self._full_rank()
+            rescored = self.n
+        else:
+            self.norm[pos] = self._normalize(self.X[pos])
+            self.score[pos] = self._score(self.norm[pos])
+            self._rerank(positions, old_keys, pos)
+            rescored = len(pos)
+        if self.predictor is not None:
+            self.cluster[pos] = self._predict(upserted)
+        summary.update(renormalized=[self.columns[j] for j in cols], rescored_rows=rescored)
+        return summary
+
+    # ------------------------------
+    # Scored table
+    # ------------------------------
+    def _merge(self):
+        """Fold the upserted rows into the table: overwrite changed ones, append new ones."""
+        base, patch = self._base, self._patch
+        at = np.array([self._pos[k] for k in patch.index.tolist()], dtype=np.intp)
+        old = at < len(base)
+        base, patch = base.copy(), patch.copy()
+        for col in base.columns.intersection(patch.columns):
+            if isinstance(base[col].dtype, pd.CategoricalDtype):
+                extra = pd.Index(patch[col].dropna().unique()).difference(base[col].cat.categories)
+                if len(extra):
+                    base[col] = base[col].cat.add_categories(extra)
+                patch[col] = patch[col].astype(base[col].dtype)
+        for col in base.columns.intersection(patch.columns):
+            base.iloc[at[old], base.columns.get_loc(col)] = patch[col].to_numpy()[old]
+        self._base = _concat([base, patch.iloc[np.flatnonzero(~old)[np.argsort(at[~old])]]])
+        self._patch = self._base.iloc[:0]
+
+    @property
+    def df(self):
+        """The scored table, in row-position order."""
+        if self._table is None:
+            if len(self._patch):
+                self._merge()
+            table = self._base
+            table[self.norm_columns] = self.norm[:self.n]
+            table[self.score_column] = self.score[:self.n]
+            table["Rank"] = self._ranks()
+            if self.predictor is not None:
+                table["Cluster"] = pd.array(self.cluster[:self.n], dtype="Int64")
+            self._table = table
+        return self._table
+
+    def ranked(self):
+        """Scored table, best row first."""
+        return self.df.iloc[self._order].reset_index(drop=True)
+
+    # ------------------------------
+    # Persistence
+    # ------------------------------
+    def save(self, name, state_dir=STATE_DIR):
+        os.makedirs(state_dir, exist_ok=True)
+        self.df.to_parquet(os.path.join(state_dir, f"{name}.parquet"), index=False)
+        with open(os.path.join(state_dir, f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump({"key": self.key, "columns": self.columns,
+                       "low": self.low.tolist(), "high": self.high.tolist()}, f, indent=2)
+
+    def load(self, name, state_dir=STATE_DIR):
+        with open(os.path.join(state_dir, f"{name}.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["key"] != self.key or meta["columns"] != self.columns:
+            raise ValueError(f"State in {state_dir} was built for other columns; run init again")
+        df = self.prepare(pd.read_parquet(os.path.join(state_dir, f"{name}.parquet")))
+        self._init_arrays(df)
+        self.low, self.high = np.array(meta["low"]), np.array(meta["high"])
+        self.norm = df[self.norm_columns].to_numpy(dtype=float)
+        self.score = df[self.score_column].to_numpy(dtype=float)
+        # The saved ranks give the sorted order back without sorting
+        self._order = np.empty(self.n, dtype=np.intp)
+        self._order[df["Rank"].to_numpy() - 1] = np.arange(self.n)
+        self._sorted = self._sort_keys(self.score)[self._order]
+        return self
+
+
+# ------------------------------
+# Targets
+# ------------------------------
+def _type_sites(df):
+    # Cluster stays nullable: new rows have none until the model has run,
+    # and sites with a missing feature never get one
+    cluster = df.pop("Cluster") if "Cluster" in df.columns else None
+    df = feature_store.derive(feature_store.apply_schema(df))
+    if cluster is not None:
+        df["Cluster"] = pd.array(cluster, dtype="Int64")
+    return df
+
+
+def site_scorer(predict=True):
+    predictor = None
+    if predict:
+        sys.path.insert(0, os.path.join(REPO_DIR, "streamlit-files"))
+        from predictor import ClusterPredictor
+        predictor = ClusterPredictor()
+    return IncrementalScorer("LOCATION", SITE_WEIGHTS, SITE_COSTS, invert=False,
+                             score_column="Weighted Score", predictor=predictor, prepare=_type_sites)
+
+
+def gravity_scorer(config=None):
+    sys.path.insert(0, os.path.join(HERE, "gravity-model"))
+    import gravity_engine
+    config = config or gravity_engine.load_config()
+    return IncrementalScorer("City", config["weights"], config["cost_params"], invert=True)
+
+
+def load_base(target):
+    if target == "sites":
+        return feature_store.load(feature_store.DEFAULT_SOURCE)
+    sys.path.insert(0, os.path.join(HERE, "gravity-model"))
+    import gravity_engine
+    config = gravity_engine.load_config()
+    return gravity_engine.load_cities(config["source"], config.get("xlsx_columns"))
+
+
+def read_delta(path, target):
+    if target == "sites":
+        return feature_store.parse_csv(path)
+    return pd.read_csv(path)
+
+
+def make_scorer(target):
+    return site_scorer() if target == "sites" else gravity_scorer()
+
+
+# ------------------------------
+# Verification against a full rebuild
+# ------------------------------
+def synthetic_case(target, n_rows, n_delta, seed):
+    """Base table plus a delta of jittered existing rows and fresh rows (half each)."""
+    sys.path.insert(0, os.path.join(REPO_DIR, "benchmarks"))
+    from synthetic import synthetic_cities, synthetic_sites
+    make = synthetic_sites if target == "sites" else synthetic_cities
+    key = "LOCATION" if target == "sites" else "City"
+    base = make(n_rows, seed)
+    fresh = make(n_delta - n_delta // 2, seed + 1)
+    fresh[key] = [f"new {k}" for k in fresh[key]]
+
+    rng = np.random.default_rng(seed)
+    changed = base.iloc[rng.choice(n_rows, n_delta // 2, replace=False)].copy()
+    col = "ENERGY" if target == "sites" else "Energy"
+    changed[col] = changed[col].to_numpy(dtype=float) * rng.lognormal(0.0, 0.5, len(changed))
+    delta = pd.concat([changed, fresh], ignore_index=True)
+    if target == "sites":
+        # Clusters of the delta rows come from the model, not the resampled rows
+        delta = delta.drop(columns="Cluster", errors="ignore")
+    return base, delta
+
+
+def check(target, n_rows, n_delta, seed):
+    base, delta = synthetic_case(target, n_rows, n_delta, seed)
+    scorer = make_scorer(target).build(base)
+
+    start = time.perf_counter()
+    summary = scorer.apply(delta)
+    incremental_s = time.perf_counter() - start
+    start = time.perf_counter()
+    scorer.df
+    merge_s = time.perf_counter() - start
+
+    # Full rebuild of the same upserted table, predicting every delta row
+    full = scorer.df.copy()
+    if scorer.predictor is not None:
+        full.loc[delta[scorer.key].to_numpy(), "Cluster"] = pd.NA
+    start = time.perf_counter()
+    reference = make_scorer(target).build(full.drop(columns=scorer.norm_columns + [scorer.score_column, "Rank"]))
+    full_s = time.perf_counter() - start
+
+    a, b = scorer.df, reference.df.loc[scorer.df.index]
+    np.testing.assert_allclose(a[scorer.norm_columns].to_numpy(dtype=float),
+                               b[scorer.norm_columns].to_numpy(dtype=float), rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(a[scorer.score_column].to_numpy(dtype=float),
+                               b[scorer.score_column].to_numpy(dtype=float), rtol=1e-12, atol=1e-12)
+    np.testing.assert_array_equal(a["Rank"].to_numpy(), b["Rank"].to_numpy())
+    if "Cluster" in a.columns:
+        assert a["Cluster"].equals(b["Cluster"]), "Cluster labels differ from a full rebuild"
+    summary.update(rows=scorer.n, incremental_s=incremental_s, merge_s=merge_s, full_s=full_s)
+
+    if scorer.predictor is not None:
+        # What a rerun of the whole chain pays: every site goes through the model again
+        start = time.perf_counter()
+        make_scorer(target).build(full.drop(columns=scorer.norm_columns + [scorer.score_column, "Rank", "Cluster"]))
+        summary["full_recluster_s"] = time.perf_counter() - start
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental re-scoring from a delta of new or changed rows")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("init", help="Full build of the scored state")
+    p.add_argument("--target", choices=["sites", "gravity"], default="sites")
+    p.add_argument("--data", help="Source table (default: data-final.csv or the gravity config source)")
+    p.add_argument("--state-dir", default=STATE_DIR)
+
+    p = sub.add_parser("apply", help="Upsert a delta CSV and re-score the affected rows")
+    p.add_argument("delta")
+    p.add_argument("--target", choices=["sites", "gravity"], default="sites")
+    p.add_argument("--state-dir", default=STATE_DIR)
+    p.add_argument("--output", help="Optional CSV of the ranked table")
+
+    p = sub.add_parser("check", help="Compare an incremental update with a full rebuild")
+    p.add_argument("--target", choices=["sites", "gravity"], default="sites")
+    p.add_argument("--rows", type=int, default=10_000)
+    p.add_argument("--delta", type=int, default=100)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--output", help="Optional JSON file for the summary")
+    args = parser.parse_args()
+
+    if args.command == "init":
+        start = time.perf_counter()
+        if args.data:
+            base = read_delta(feature_store.resolve(args.data) if args.target == "sites" else args.data, args.target)
+        else:
+            base = load_base(args.target)
+        scorer = make_scorer(args.target).build(base)
+        scorer.save(args.target, args.state_dir)
+        print(f"Built {args.target} state: {scorer.n} rows in {time.perf_counter() - start:.2f}s")
+
+    elif args.command == "apply":
+        scorer = make_scorer(args.target).load(args.target, args.state_dir)
+        start = time.perf_counter()
+        summary = scorer.apply(read_delta(args.delta, args.target))
+        elapsed = time.perf_counter() - start
+        scorer.save(args.target, args.state_dir)
+        print(f"{summary['new']} new, {summary['changed']} changed of {summary['delta_rows']} delta rows; "
+              f"rescored {summary['rescored_rows']} of {scorer.n} rows in {elapsed * 1000:.1f} ms")
+        if summary["renormalized"]:
+            print(f"Bounds moved, fully re-normalized: {', '.join(summary['renormalized'])}")
+        if args.output:
+            scorer.ranked().to_csv(args.output, index=False)
+            print(f"Saved ranked table to: {args.output}")
+
+    else:
+        summary = check(args.target, args.rows, args.delta, args.seed)
+        print(f"{args.target}: {summary['new']} new + {summary['changed']} changed rows into {summary['rows']}; "
+              f"incremental {summary['incremental_s'] * 1000:.1f} ms "
+              f"(+{summary['merge_s'] * 1000:.1f} ms merging the table) vs full rebuild {summary['full_s'] * 1000:.1f} ms"
+              + (f" ({summary['full_recluster_s'] * 1000:.1f} ms re-clustering every site)" if "full_recluster_s" in summary else "")
+              + "; "
+              f"re-normalized: {', '.join(summary['renormalized']) or 'none'}")
+        print("Matches the full rebuild")
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(summary, f, indent=2)
+            print(f"Saved summary to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
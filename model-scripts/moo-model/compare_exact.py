@@ -0,0 +1,124 @@
+"""
+Compare the GA's Pareto front with the exact front at several problem sizes.
+
+For each size the candidate table is data-final.csv itself (its row count)
+or a synthetic table of that many rows (benchmarks/synthetic.py). The exact
+front comes from exact.exact_front (or exact.supported_front with
+--method supported); the GA runs NSGA-II with the default operators.
+Reported per size:
+
+  runtime of both, front sizes, share of GA points that lie on the exact
+  front, hypervolume ratio GA / exact (range-normalized objectives, same
+  reference point as the telemetry), and inverted generational distance.
+
+With the complete front a GA hypervolume ratio above 1 would mean the
+exact solver is wrong, and the script exits with an error.
+
+Usage:
+    python compare_exact.py --sizes 39 60 80 --generations 50 --output compare_exact.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "..", "clean-data"))
+sys.path.insert(0, os.path.join(HERE, "..", "..", "benchmarks"))
+import feature_store
+
+from evolution import evaluate_population, evolve, init_worker, make_toolbox
+from exact import exact_front, igd, match_rate, supported_front
+from fitness import FitnessEngine
+from pareto import fitness_matrix, first_front, hypervolume
+from telemetry import REFERENCE
+
+
+def candidate_table(n_rows, base, seed):
+    if n_rows == len(base):
+        return base
+    from synthetic import synthetic_sites
+    return synthetic_sites(n_rows, seed, base)
+
+
+def run_ga(df, engine, pop_size, generations, seed):
+    random.seed(seed)
+    toolbox = make_toolbox(len(df), engine)
+    init_worker(df, engine=engine)
+    pop = evolve(toolbox.population(n=pop_size), toolbox, generations,
+                 lambda population: evaluate_population(population))
+    front = first_front(pop)
+    return fitness_matrix(front)
+
+
+def compare(df, method, pop_size, generations, seed):
+    engine = FitnessEngine(df)
+    bounds = engine.objective_bounds()
+    span = np.where(bounds[1] > bounds[0], bounds[1] - bounds[0], 1.0)
+    ref = np.full(4, REFERENCE)
+
+    start = time.perf_counter()
+    _, exact_F = (exact_front if method == "front" else supported_front)(engine)
+    exact_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ga_F = run_ga(df, engine, pop_size, generations, seed)
+    ga_s = time.perf_counter() - start
+
+    exact_hv = hypervolume((exact_F - bounds[0]) / span, ref)
+    ga_hv = hypervolume((ga_F - bounds[0]) / span, ref)
+    return {
+        "rows": len(df),
+        "valid_sites": int(engine.valid.sum()),
+        "exact_s": exact_s,
+        "ga_s": ga_s,
+        "exact_points": len(exact_F),
+        "ga_points": len(np.unique(ga_F, axis=0)),
+        "ga_on_exact_front": match_rate(ga_F, exact_F),
+        "hypervolume_exact": exact_hv,
+        "hypervolume_ga": ga_hv,
+        "hypervolume_ratio": ga_hv / exact_hv if exact_hv else None,
+        "igd": igd(ga_F, exact_F, bounds),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GA front quality and runtime against the exact front")
+    parser.add_argument("--data", default="data-final.csv")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[39, 60, 80])
+    parser.add_argument("--method", choices=["front", "supported"], default="front")
+    parser.add_argument("--pop-size", type=int, default=50)
+    parser.add_argument("--generations", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    base = feature_store.load(args.data)
+    results = []
+    for n in args.sizes:
+        row = compare(candidate_table(n, base, args.seed), args.method,
+                      args.pop_size, args.generations, args.seed)
+        results.append(row)
+        print(f"{row['rows']:>6} rows ({row['valid_sites']:>3} valid)  "
+              f"exact {row['exact_s']:7.2f}s {row['exact_points']:>6} pts   "
+              f"GA {row['ga_s']:6.2f}s {row['ga_points']:>4} pts   "
+              f"on front {row['ga_on_exact_front']:6.1%}   "
+              f"HV ratio {row['hypervolume_ratio']:.3f}   IGD {row['igd']:.4f}")
+
+    # The GA can never beat the complete front
+    bad = [r for r in results if args.method == "front" and r["hypervolume_ratio"] > 1 + 1e-9]
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"method": args.method, "pop_size": args.pop_size,
+                       "generations": args.generations, "results": results}, f, indent=2)
+        print(f"Saved results to: {args.output}")
+    if bad:
+        raise SystemExit("GA front dominates more volume than the exact front")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+import math
+import random
+import multiprocessing
+
+import numpy as np
+from deap import base, creator, tools, algorithms
+
+from fitness import FitnessEngine, FitnessCache
+from pareto import sel_nsga2
+from telemetry import PhaseTimer
+
+# DEAP types are created once per process; worker processes import this
+# module before unpickling any individual, so the classes always exist.
+if not hasattr(creator, "FitnessMulti"):
+    creator.create("FitnessMulti", base.Fitness, weights=(-1.0, -1.0, -1.0, -1.0))
+if not hasattr(creator, "Individual"):
+    creator.create("Individual", list, fitness=creator.FitnessMulti)
+
+
+# NSGA-II survivor selection: DEAP's pure-Python operator or the NumPy
+# drop-in from pareto.py (same fronts and crowding, faster on large pops)
+SELECTORS = {
+    "deap": tools.selNSGA2,
+    "numpy": sel_nsga2,
+}
+
+
+# ------------------------------
+# DEAP configuration for NSGA-II
+# ------------------------------
+def make_toolbox(n_sites, engine=None, selection="deap"):
+    toolbox = base.Toolbox()
+    toolbox.register("attr_bool", random.randint, 0, 1)
+    toolbox.register("individual", tools.initRepeat, creator.Individual, toolbox.attr_bool, n_sites)
+    toolbox.register("population", tools.initRepeat, list, toolbox.individual)
+    if engine is not None:
+        toolbox.register("evaluate", engine.evaluate)
+    toolbox.register("mate", tools.cxTwoPoint)
+    toolbox.register("mutate", tools.mutFlipBit, indpb=0.05)
+    toolbox.register("select", SELECTORS[selection])
+    return toolbox
+
+
+# ------------------------------
+# Process pool workers
+# ------------------------------
+# Each worker builds its own FitnessEngine once from the dataset passed to
+# the pool initializer, so only selection bits travel between processes.
+# Island workers keep their own fitness cache when `cache_size` is set.
+_engine = None
+_toolbox = None
+
+
+def init_worker(df, cache_size=0, selection="deap", engine=None):
+    """
+    Set up this process's engine. Pool workers build their own; a serial run
+    passes its existing `engine` (or FitnessCache) so nothing is duplicated.
+    """
+    global _engine, _toolbox
+    if engine is None:
+        engine = FitnessEngine(df)
+        if cache_size:
+            engine = FitnessCache(engine, cache_size)
+    _engine = engine
+    _toolbox = make_toolbox(len(df), _engine, selection)
+
+
+def evaluate_chunk(bits):
+    return _engine.evaluate_batch(bits)
+
+
+def make_pool(df, processes=None, cache_size=0, selection="deap"):
+    """Process pool whose workers hold a ready FitnessEngine for `df`."""
+    return multiprocessing.Pool(processes, initializer=init_worker, initargs=(df, cache_size, selection))
+
+
+def evaluate_population(population, map_fn=map, n_chunks=1, cache=None):
+    """
+    Assign fitness values to a population through `map_fn` (usually
+    `toolbox.map`), splitting its bit matrix into `n_chunks` batches.
+    Evaluation is deterministic, so the result does not depend on how
+    the chunks are distributed. With a FitnessCache only the individuals
+    it has not seen are sent to the workers.
+    """
+    if not population:
+        return
+
+    def evaluate_bits(bits):
+        chunks = np.array_split(bits, min(n_chunks, len(bits)))
+        return np.concatenate(list(map_fn(evaluate_chunk, chunks)))
+
+    bits = np.asarray(population, dtype=bool)
+    if cache is not None:
+        values = cache.evaluate_batch(bits, evaluate_bits)
+    else:
+        values = evaluate_bits(bits)
+    for ind, fit in zip(population, values.tolist()):
+        ind.fitness.values = tuple(fit)
+
+
+# ------------------------------
+# NSGA-II loop
+# ------------------------------
+def evolve(pop, toolbox, ngen, evaluate, cxpb=0.7, mutpb=0.2, archive=None, telemetry=None):
+    """
+    Generational NSGA-II loop. With a pareto.ParetoArchive every evaluated
+    individual is offered to it, so non-dominated solutions survive even
+    after selection drops them from the population. A telemetry.Telemetry
+    records every generation (generation 0 is the initial population) and
+    may stop the loop early once the hypervolume stops improving.
+    """
+    timer = PhaseTimer()
+    with timer("evaluation_s"):
+        evaluate(pop)
+    if archive is not None:
+        with timer("archive_s"):
+            archive.update(pop)
+    if telemetry is not None and telemetry.record(0, pop, len(pop), timer.times, archive):
+        return pop
+    for gen in range(1, ngen + 1):
+        timer = PhaseTimer()
+        with timer("variation_s"):
+            offspring = algorithms.varAnd(pop, toolbox, cxpb=cxpb, mutpb=mutpb)
+        with timer("evaluation_s"):
+            evaluate(offspring)
+        if archive is not None:
+            with timer("archive_s"):
+                archive.update(offspring)
+        with timer("selection_s"):
+            pop = toolbox.select(pop + offspring, k=len(pop))
+        if telemetry is not None and telemetry.record(gen, pop, len(offspring), timer.times, archive):
+            break
+    return pop
+
+
+# ------------------------------
+# Island model
+# ------------------------------
+def _island_seed(seed, island, epoch):
+    # String seeds hash deterministically, independent of PYTHONHASHSEED
+    return f"{seed}:{island}:{epoch}"
+
+
+def _cache_counts():
+    return (getattr(_engine, "hits", 0), getattr(_engine, "misses", 0))
+
+
+def _restore(bits, fitnesses):
+    pop = []
+    for row, fit in zip(bits, fitnesses):
+        ind = creator.Individual(row)
+        if fit:
+            ind.fitness.values = fit
+        pop.append(ind)
+    return pop
+
+
+def run_island_epoch(task):
+    """
+    Evolve one island for one epoch inside a worker; returns its bits,
+    fitnesses, the (hits, misses) the worker's fitness cache recorded and
+    the number of individuals it evaluated. Individuals arrive with their
+    fitnesses, so only new ones are evaluated.
+    """
+    bits, fitnesses, seed, ngen = task
+    random.seed(seed)
+    hits, misses = _cache_counts()
+    evals = 0
+
+    def evaluate(population):
+        nonlocal evals
+        invalid = [ind for ind in population if not ind.fitness.valid]
+        evals += len(invalid)
+        _engine.evaluate_population(invalid)
+
+    pop = evolve(_restore(bits, fitnesses), _toolbox, ngen, evaluate)
+    end_hits, end_misses = _cache_counts()
+    return ([list(ind) for ind in pop], [ind.fitness.values for ind in pop],
+            (end_hits - hits, end_misses - misses), evals)
+
+
+def run_islands(toolbox, n_islands, island_size, ngen, seed,
+                migration_interval=10, n_migrants=2, map_fn=map, stats=None, archive=None,
+                telemetry=None):
+    """
+    Evolve `n_islands` sub-populations independently and migrate elites
+    around a ring every `migration_interval` generations.
+
+    Every island epoch is seeded from (seed, island, epoch) and migration
+    happens in the parent in island order, so the final population is the
+    same whether `map_fn` is the builtin map or a process pool's map.
+    Workers must have been set up with `init_worker`. Cache hits and
+    misses reported by the workers are added to the `stats` dict if given.
+    An `archive` is updated with every island's population after each epoch.
+    `telemetry` records one entry per epoch over all islands and can end
+    the run early.
+    """
+    random.seed(seed)
+    islands = [toolbox.population(n=island_size) for _ in range(n_islands)]
+    n_epochs = math.ceil(ngen / migration_interval)
+
+    for epoch in range(n_epochs):
+        epoch_gens = min(migration_interval, ngen - epoch * migration_interval)
+        tasks = [
+            ([list(ind) for ind in island], [ind.fitness.values for ind in island],
+             _island_seed(seed, i, epoch), epoch_gens)
+            for i, island in enumerate(islands)
+        ]
+        timer = PhaseTimer()
+        with timer("island_s"):
+            results = list(map_fn(run_island_epoch, tasks))
+        islands = [_restore(bits, fits) for bits, fits, _, _ in results]
+        if archive is not None:
+            with timer("archive_s"):
+                for island in islands:
+                    archive.update(island)
+        if stats is not None:
+            for _, _, (hits, misses), _ in results:
+                stats["hits"] = stats.get("hits", 0) + hits
+                stats["misses"] = stats.get("misses", 0) + misses
+
+        # Ring migration: island i receives the NSGA-II elites of island i-1
+        if n_islands > 1 and n_migrants > 0 and epoch < n_epochs - 1:
+            with timer("selection_s"):
+                elites = [toolbox.select(island, n_migrants) for island in islands]
+                islands = [
+                    toolbox.select(island + [toolbox.clone(ind) for ind in elites[i - 1]], k=island_size)
+                    for i, island in enumerate(islands)
+                ]
+
+        if telemetry is not None:
+            evals = sum(n for _, _, _, n in results)
+            population = [ind for island in islands for ind in island]
+            if telemetry.record(epoch * migration_interval + epoch_gens, population, evals,
+                                timer.times, archive):
+                break
+
+    return [ind for island in islands for ind in island]
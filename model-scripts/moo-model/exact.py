@@ -0,0 +1,157 @@
+"""
+Exact Pareto fronts for the NSGA-II site subset problem.
+
+Invalid sites never change an individual's fitness (their features are
+zeroed in FitnessEngine), so they are dropped before the search and every
+solution here selects valid sites only.
+
+Three of the four objectives are sums over the selected sites; the fourth,
+mean facility age, is a sum divided by the number of selected sites with an
+age. For a fixed count c it is linear as well, which gives two exact methods:
+
+  * exact_front - dominance-pruned dynamic program. Partial subsets are
+    grouped by c and described by their four column sums; within a group a
+    subset whose sums are dominated stays dominated whatever sites are added
+    later, so only each group's non-dominated sums are kept. The union of
+    the groups' final fitnesses, filtered once more, is the complete front.
+
+  * supported_front - weighted-sum scalarization. For a weight vector and a
+    fixed count c the problem is "pick the c sites with the smallest
+    weighted cost", solved exactly by a sort (the cardinality-constrained
+    MILP has an integral LP relaxation); the best c is the weighted-sum
+    optimum. Sweeping weights yields supported non-dominated points in
+    O(W * N^2 log N), for tables too large for the dynamic program.
+
+Usage:
+    python nsga_aggregator.py --exact                  # report the true front instead of the GA's
+    from exact import exact_front
+    bits, F = exact_front(FitnessEngine(df))
+"""
+import numpy as np
+
+from fitness import OBJECTIVE_SIGNS
+from pareto import nondominated_rank
+
+# Column sums are rounded to this many decimals before dominance checks, so
+# float noise from different summation orders does not create fake points
+_DECIMALS = 9
+
+
+def _nondominated(F):
+    """Indices of the distinct non-dominated rows of a minimization matrix F."""
+    _, first = np.unique(F.round(_DECIMALS), axis=0, return_index=True)
+    first = np.sort(first)
+    return first[nondominated_rank(F[first].round(_DECIMALS), 1) == 0]
+
+
+def _valid_items(engine):
+    valid = np.flatnonzero(engine.valid)
+    # Per-site contribution to the minimized sums, age left as a sum for now
+    signed = engine.features[valid] * OBJECTIVE_SIGNS
+    signed[:, 3] = engine.features[valid, 3]
+    return valid, signed, engine.present[valid, 3].astype(int)
+
+
+def _expand(engine, valid, chosen):
+    """(S x N) selection bits over all sites from (S x n_valid) bits over valid ones."""
+    bits = np.zeros((len(chosen), engine.n_sites), dtype=bool)
+    bits[:, valid] = chosen
+    return bits
+
+
+def _finish(engine, bits):
+    # Score with the engine itself so values match the GA's bit for bit
+    F = engine.evaluate_batch(bits)
+    keep = _nondominated(F)
+    order = np.lexsort(F[keep].T[::-1])
+    keep = keep[order]
+    return bits[keep], F[keep]
+
+
+def exact_front(engine, max_states=5_000):
+    """
+    Complete Pareto front: (S x N) selection bits and (S x 4) fitness values,
+    sorted by objective. The front grows quickly with the number of valid
+    sites (about 12k points in 12 s for 37 of them, 39k points in 3 min for
+    49), so this raises MemoryError once a count group keeps more than
+    `max_states` partial subsets.
+    """
+    valid, items, has_age = _valid_items(engine)
+    n = len(valid)
+    # count -> (sums (m x 4), chosen (m x n) bool)
+    groups = {0: (np.zeros((1, 4)), np.zeros((1, n), dtype=bool))}
+    for i in range(n):
+        updated = {}
+        for c, (sums, chosen) in groups.items():
+            new_chosen = chosen.copy()
+            new_chosen[:, i] = True
+            target = c + has_age[i]
+            base = updated.get(target, groups.get(target))
+            if base is None:
+                updated[target] = (sums + items[i], new_chosen)
+            else:
+                updated[target] = (np.vstack([base[0], sums + items[i]]),
+                                   np.vstack([base[1], new_chosen]))
+        for c, (sums, chosen) in updated.items():
+            keep = _nondominated(sums)
+            if len(keep) > max_states:
+                raise MemoryError(f"{len(keep)} non-dominated partial subsets with {c} sites "
+                                  f"(max_states={max_states}); use supported_front for this table")
+            groups[c] = (sums[keep], chosen[keep])
+
+    chosen = np.vstack([chosen[chosen.any(axis=1)] for c, (_, chosen) in groups.items() if c > 0])
+    return _finish(engine, _expand(engine, valid, chosen))
+
+
+def supported_front(engine, n_weights=1000, seed=0):
+    """
+    Supported non-dominated points: for each of `n_weights` strictly positive
+    Dirichlet weight vectors, the subset minimizing the weighted sum of the
+    range-scaled objectives (best count c over all counts).
+    """
+    valid, items, has_age = _valid_items(engine)
+    n = len(valid)
+    bounds = engine.objective_bounds()
+    span = np.where(bounds[1] > bounds[0], bounds[1] - bounds[0], 1.0)
+    scaled = items / span
+    W = np.random.default_rng(seed).dirichlet(np.ones(4), size=n_weights)
+    # Sites without an age cannot raise the count c, so only aged sites are ranked
+    aged = np.flatnonzero(has_age)
+
+    counts = np.arange(1, len(aged) + 1)
+    chosen = []
+    for w in W:
+        sums = scaled[:, :3] @ w[:3]
+        # Row c-1: every aged site's cost when c sites are picked (mean age is age_i / c)
+        cost = sums[aged][None, :] + w[3] * scaled[aged, 3][None, :] / counts[:, None]
+        totals = np.cumsum(np.sort(cost, axis=1), axis=1)[counts - 1, counts - 1]
+        c = int(np.argmin(totals)) + 1
+        pick = np.zeros(n, dtype=bool)
+        pick[aged[np.argsort(cost[c - 1], kind="stable")[:c]]] = True
+        # Age-less sites join whenever they lower the sum objectives
+        pick[(has_age == 0) & (sums < 0)] = True
+        chosen.append(pick)
+    chosen = np.unique(np.array(chosen), axis=0)
+    return _finish(engine, _expand(engine, valid, chosen))
+
+
+# ------------------------------
+# Front quality
+# ------------------------------
+def match_rate(F, reference):
+    """Share of the distinct rows of F that are points of the reference front."""
+    F = np.unique(np.asarray(F).round(_DECIMALS), axis=0)
+    ref = {tuple(row) for row in np.asarray(reference).round(_DECIMALS)}
+    return float(np.mean([tuple(row) in ref for row in F])) if len(F) else 0.0
+
+
+def igd(F, reference, bounds):
+    """Inverted generational distance in range-normalized objective space."""
+    low, high = bounds
+    span = np.where(high > low, high - low, 1.0)
+    A = (np.asarray(F) - low) / span
+    R = (np.asarray(reference) - low) / span
+    if len(A) == 0:
+        return np.inf
+    distances = np.sqrt(((R[:, None, :] - A[None, :, :]) ** 2).sum(axis=2))
+    return float(distances.min(axis=1).mean())
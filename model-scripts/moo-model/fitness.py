@@ -0,0 +1,199 @@
+from collections import OrderedDict
+
+import numpy as np
+
+# Columns summed into the service availability score
+SERVICE_COLUMNS = [
+    "FULL_CABINETS", "PARTIAL_CABINETS", "SHARED_RACKSPACE", "CAGES",
+    "SUITES", "BUILD_TO_SUIT", "FOOTPRINTS", "REMOTE_HANDS"
+]
+
+# Objective columns, in the order of the fitness tuple
+OBJECTIVE_COLUMNS = [
+    "State_Aggregated_PUE", "State_Aggregated_IXP_Count",
+    "SERVICE_AVAILABILITY_SCORE", "FACILITY_AGE"
+]
+
+# Fitness assigned when an individual selects no valid data center
+PENALTY = 99999.0
+
+# Sign applied to each column sum: f2 and f3 are maximized, so negated
+OBJECTIVE_SIGNS = np.array([1.0, -1.0, -1.0, 1.0])
+
+# Integer sums below this bound are exact in float64, whatever the order
+_EXACT_LIMIT = 2.0 ** 52
+
+
+# Constraint check for eligibility of data centers, over the whole table at once
+# Constraint: IT_POWER ≥ 1, AREA ≥ 10,000 sqft, SERVICE_SCORE ≥ 4
+def valid_mask(df):
+    return (
+        (df["IT EQUIPMENT POWER"].to_numpy(dtype=float, na_value=np.nan) >= 1) &
+        (df["AREA"].to_numpy(dtype=float, na_value=np.nan) >= 10000) &
+        (df["SERVICE_AVAILABILITY_SCORE"].to_numpy(dtype=float, na_value=np.nan) >= 4)
+    )
+
+
+class FitnessEngine:
+    """
+    Scores NSGA-II individuals against a precomputed feature matrix.
+
+    The DataFrame is read once: objective columns become an (N x 4) float
+    matrix with invalid sites zeroed out, so that for a (pop x N) selection
+    bit matrix S the objective sums are the single product S @ F and the
+    mean facility age is that sum divided by the count of selected sites.
+
+    Columns holding non-integer values (PUE) are summed in row order over
+    the compacted selection instead, because floating-point addition is not
+    associative and the fitness values must match the pandas path bit for bit.
+
+    `valid` overrides the eligibility mask (valid_mask) with any boolean
+    array over the sites, e.g. from a scenario's own constraint thresholds.
+    """
+
+    def __init__(self, df, valid=None):
+        features = df[OBJECTIVE_COLUMNS].to_numpy(dtype=float, na_value=np.nan)
+        self.valid = valid_mask(df) if valid is None else np.asarray(valid, dtype=bool)
+        # pandas skips NaN in sum/mean; mirror that by zero-filling the
+        # values and counting only the present ones for the mean
+        present = ~np.isnan(features) & self.valid[:, None]
+        self.features = np.where(present, features, 0.0)
+        self.present = present.astype(float)
+        self.n_sites = len(df)
+        self.exact = (
+            np.all(self.features == np.round(self.features), axis=0) &
+            (np.abs(self.features).sum(axis=0) < _EXACT_LIMIT)
+        )
+
+    def _ordered_sums(self, selected, col):
+        # Left-justify each row's selected values so every row sums the same
+        # sequence pandas would see, then reduce rows of equal length together
+        present = selected & self.present[:, col].astype(bool)
+        order = np.argsort(~present, axis=1, kind="stable")
+        values = self.features[order, col]
+        lengths = present.sum(axis=1)
+        sums = np.zeros(len(selected))
+        for n in np.unique(lengths):
+            rows = lengths == n
+            sums[rows] = values[rows, :n].sum(axis=1)
+        return sums
+
+    def evaluate_batch(self, bits):
+        """Return a (pop x 4) array of fitness values for a (pop x N) bit matrix."""
+        selected = np.asarray(bits, dtype=bool).reshape(-1, self.n_sites)
+        weights = selected.astype(float)
+        sums = weights @ self.features
+        counts = weights @ self.present
+        for col in np.flatnonzero(~self.exact):
+            sums[:, col] = self._ordered_sums(selected, col)
+
+        fitness = sums * OBJECTIVE_SIGNS
+        with np.errstate(invalid="ignore", divide="ignore"):
+            fitness[:, 3] = sums[:, 3] / counts[:, 3]
+        fitness[~(selected & self.valid).any(axis=1)] = PENALTY
+        # -0.0 would compare equal but print differently from the pandas path
+        return fitness + 0.0
+
+    def objective_bounds(self):
+        """
+        (2 x 4) lower/upper bounds every feasible fitness lies within: the
+        sums range from selecting only the sites that lower them to only the
+        ones that raise them, the mean age between the youngest and oldest site.
+        """
+        signed = self.features * OBJECTIVE_SIGNS
+        low = np.minimum(signed, 0.0).sum(axis=0)
+        high = np.maximum(signed, 0.0).sum(axis=0)
+        ages = self.features[self.present[:, 3] > 0, 3]
+        if len(ages):
+            low[3], high[3] = ages.min(), ages.max()
+        return np.vstack([low, high])
+
+    def evaluate(self, ind):
+        return tuple(self.evaluate_batch([ind])[0].tolist())
+
+    def evaluate_population(self, population):
+        """Assign fitness values to every individual of the population in one pass."""
+        if not population:
+            return
+        values = self.evaluate_batch(population)
+        for ind, fit in zip(population, values.tolist()):
+            ind.fitness.values = tuple(fit)
+
+
+class FitnessCache:
+    """
+    Bounded LRU memo of fitness values in front of a FitnessEngine.
+
+    Individuals are keyed by the bytes of their packed selection bitset
+    (np.packbits), so variation that recreates an already-seen individual
+    costs a dictionary lookup instead of an evaluation. Duplicates within
+    one batch are evaluated once and counted as hits.
+    """
+
+    def __init__(self, engine, maxsize=100_000):
+        self.engine = engine
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+
+    @property
+    def n_sites(self):
+        return self.engine.n_sites
+
+    def evaluate_batch(self, bits, evaluator=None):
+        """
+        Return a (pop x 4) fitness array, evaluating only unseen rows with
+        `evaluator` (defaults to the wrapped engine's batch evaluator).
+        """
+        evaluator = evaluator or self.engine.evaluate_batch
+        selected = np.asarray(bits, dtype=bool).reshape(-1, self.n_sites)
+        packed = np.packbits(selected, axis=1)
+        keys = [row.tobytes() for row in packed]
+
+        fitness = np.empty((len(keys), len(OBJECTIVE_COLUMNS)))
+        pending = {}
+        for i, key in enumerate(keys):
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                fitness[i] = cached
+                self.hits += 1
+            elif key in pending:
+                self.hits += 1
+            else:
+                pending[key] = i
+                self.misses += 1
+
+        if pending:
+            rows = list(pending.values())
+            values = np.asarray(evaluator(selected[rows]))
+            for key, value in zip(pending, values):
+                self._cache[key] = value
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+            # Fill misses and in-batch duplicates from the fresh values
+            fresh = dict(zip(pending, values))
+            for i, key in enumerate(keys):
+                if key in fresh:
+                    fitness[i] = fresh[key]
+        return fitness
+
+    def evaluate(self, ind):
+        return tuple(self.evaluate_batch([ind])[0].tolist())
+
+    def evaluate_population(self, population):
+        if not population:
+            return
+        values = self.evaluate_batch(population)
+        for ind, fit in zip(population, values.tolist()):
+            ind.fitness.values = tuple(fit)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._cache),
+        }
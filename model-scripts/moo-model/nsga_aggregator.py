@@ -1,118 +1,233 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 import random
-from deap import base, creator, tools, algorithms
+from deap import creator
 
-# Load dataset
-df = pd.read_csv("data-final.csv")
-df["SERVICE_AVAILABILITY_SCORE"] = df[[
-    "FULL_CABINETS", "PARTIAL_CABINETS", "SHARED_RACKSPACE", "CAGES",
-    "SUITES", "BUILD_TO_SUIT", "FOOTPRINTS", "REMOTE_HANDS"
-]].astype(int).sum(axis=1)
-df["FACILITY_AGE"] = 2025 - df["YEAR_OPERATIONAL"]
+# Typed, cached loader shared with the other models and the app
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "clean-data"))
+import feature_store
+
+# Min-max normalization and weighted-score kernel shared with the other models
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from scoring import score_matrix
+
+from fitness import FitnessEngine, FitnessCache
+from evolution import SELECTORS, make_toolbox, make_pool, init_worker, evaluate_population, evolve, run_islands
+from exact import exact_front, supported_front
+from pareto import ParetoArchive, first_front
+from postprocess import CompactFront, long_format, selection_matrix
+from telemetry import Telemetry
+
+# Load dataset: explicit dtypes, SERVICE_AVAILABILITY_SCORE and FACILITY_AGE
+# derived once, cached as Parquet until the CSV changes (see feature_store.py).
+# A path that does not exist here is looked up in clean-data/.
+def load_dataset(path="data-final.csv"):
+    return feature_store.load(path)
 
 # Constraint check for eligibility of data centers
 # Constraint: IT_POWER ≥ 1, AREA ≥ 10,000 sqft, SERVICE_SCORE ≥ 4
-def is_valid(row):
-    return (
-        row["IT EQUIPMENT POWER"] >= 1 and
-        row["AREA"] >= 10000 and
-        row["SERVICE_AVAILABILITY_SCORE"] >= 4
-    )
-
+# (precomputed once as a boolean mask, see fitness.valid_mask)
+#
 # Multi-objective fitness function
 # Let S be the set of selected, valid data centers:
 # f1 (minimize) = ∑ PUE_i
 # f2 (maximize) = -∑ IXP_Count_i  [negated to convert to minimization]
 # f3 (maximize) = -∑ Service_Score_i [negated to convert to minimization]
 # f4 (minimize) = mean(Facility_Age_i)
-def evaluate(ind):
-    selected = df[[bool(x) for x in ind]]
-    valid = selected[selected.apply(is_valid, axis=1)]
-    if valid.empty:
-        return (99999.0,) * 4
-    return (
-        valid["State_Aggregated_PUE"].sum(),
-        -valid["State_Aggregated_IXP_Count"].sum(),
-        -valid["SERVICE_AVAILABILITY_SCORE"].sum(),
-        valid["FACILITY_AGE"].mean()
-    )
-
-# DEAP configuration for NSGA-II
-N = len(df)
-random.seed(42)
-creator.create("FitnessMulti", base.Fitness, weights=(-1.0, -1.0, -1.0, -1.0))
-creator.create("Individual", list, fitness=creator.FitnessMulti)
-
-toolbox = base.Toolbox()
-toolbox.register("attr_bool", random.randint, 0, 1)
-toolbox.register("individual", tools.initRepeat, creator.Individual, toolbox.attr_bool, N)
-toolbox.register("population", tools.initRepeat, list, toolbox.individual)
-toolbox.register("evaluate", evaluate)
-toolbox.register("mate", tools.cxTwoPoint)
-toolbox.register("mutate", tools.mutFlipBit, indpb=0.05)
-toolbox.register("select", tools.selNSGA2)
-
-# Run NSGA-II optimization
-pop = toolbox.population(n=50)
-for ind in pop:
-    ind.fitness.values = toolbox.evaluate(ind)
-for gen in range(50):
-    offspring = algorithms.varAnd(pop, toolbox, cxpb=0.7, mutpb=0.2)
-    for ind in offspring:
-        ind.fitness.values = toolbox.evaluate(ind)
-    pop = toolbox.select(pop + offspring, k=50)
-
-# Extract Pareto-optimal solutions
-pareto_front = tools.sortNondominated(pop, len(pop), first_front_only=True)[0]
-
-# Collect Pareto-optimal data centers into a DataFrame
-rows = []
-for i, ind in enumerate(pareto_front):
-    selected = df[[bool(x) for x in ind]]
-    for _, row in selected.iterrows():
-        rows.append({
-            "Solution #": i + 1,
-            "Location": row["LOCATION"],
-            "City": row["CITY"],
-            "State": row["STATE"],
-            "PUE": row["State_Aggregated_PUE"],
-            "IXP Count": row["State_Aggregated_IXP_Count"],
-            "Service Score": row["SERVICE_AVAILABILITY_SCORE"],
-            "Facility Age": 2025 - row["YEAR_OPERATIONAL"]
-        })
-
-result_df = pd.DataFrame(rows)
-
-# Weights for final scoring (user-defined)
-weights = {
-    "PUE": 0.4,
-    "IXP Count": 0.3,
-    "Service Score": 0.2,
-    "Facility Age": 0.1
+# Evaluated for a whole population at once as a (pop x N) bit matrix
+# multiplied by the (N x 4) feature matrix of valid sites.
+
+# Normalization for weighted score (scoring.normalize):
+# norm(x) = (x - min(x)) / (max(x) - min(x)), 0 when max(x) == min(x),
+# optionally with min and max taken within each solution or state
+NORMALIZE_WITHIN = {
+    "solution": "Solution #",
+    "state": "State",
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="NSGA-II multi-objective data center selection")
+    parser.add_argument("--data", default="data-final.csv",
+                        help="Candidate data center CSV (bare names are looked up in clean-data/)")
+    parser.add_argument("--pop-size", type=int, default=50, help="Population size (per island in island mode)")
+    parser.add_argument("--generations", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--processes", type=int, default=1,
+                        help="Worker processes for evaluation / islands (0 = all cores)")
+    parser.add_argument("--islands", type=int, default=1, help="Number of islands; 1 disables the island model")
+    parser.add_argument("--migration-interval", type=int, default=10, help="Generations between migrations")
+    parser.add_argument("--migrants", type=int, default=2, help="Elites sent to the next island per migration")
+    parser.add_argument("--cache-size", type=int, default=100_000,
+                        help="Max individuals kept in the LRU fitness cache (0 disables it)")
+    parser.add_argument("--selection", choices=sorted(SELECTORS), default="deap",
+                        help="NSGA-II selection: DEAP's selNSGA2 or the vectorized NumPy sort "
+                             "(same fronts, crowding ties broken differently)")
+    parser.add_argument("--archive", action="store_true",
+                        help="Report the Pareto front of every evaluated solution, not just the final population")
+    parser.add_argument("--compact", metavar="PATH",
+                        help="Also save the front as packed bitsets + objective vectors (.npz)")
+    parser.add_argument("--log", metavar="PATH",
+                        help="Write per-generation telemetry (timings, cache, hypervolume) as JSONL")
+    parser.add_argument("--verbose", action="store_true", help="Print a telemetry line every generation")
+    parser.add_argument("--early-stop", type=int, default=0, metavar="K",
+                        help="Stop after K generations without hypervolume improvement (0 = off)")
+    parser.add_argument("--min-delta", type=float, default=1e-4,
+                        help="Smallest normalized hypervolume gain that counts as improvement")
+    parser.add_argument("--exact", nargs="?", const="front", choices=sorted(EXACT_METHODS),
+                        help="Skip the GA and report the exact front (dynamic program) "
+                             "or its supported points (weighted sums)")
+    parser.add_argument("--normalize-within", choices=sorted(NORMALIZE_WITHIN),
+                        help="Normalize the weighted-score columns within each solution or state "
+                             "instead of over all Pareto rows")
+    return parser.parse_args()
+
+
+# Exact alternatives to the GA (see exact.py)
+EXACT_METHODS = {
+    "front": exact_front,
+    "supported": supported_front,
 }
 
-# Normalization for weighted score:
-# norm(x) = (x - min(x)) / (max(x) - min(x))
-def normalize(series):
-    return (series - series.min()) / (series.max() - series.min())
-
-# Weighted score calculation:
-# Final_Score = -w1*norm(PUE) + w2*norm(IXP_Count) + w3*norm(Service_Score) - w4*norm(Facility_Age)
-norm_df = result_df.copy()
-for col in weights:
-    norm_df[col + "_norm"] = normalize(result_df[col])
-
-norm_df["Weighted Score"] = (
-    norm_df["PUE_norm"] * (-weights["PUE"]) +
-    norm_df["IXP Count_norm"] * weights["IXP Count"] +
-    norm_df["Service Score_norm"] * weights["Service Score"] +
-    norm_df["Facility Age_norm"] * (-weights["Facility Age"])
-)
-
-# Display the results
-print("\nWeighted Scores for All Data Centers:")
-print(norm_df[[
-    "Solution #", "Location", "City", "State", "PUE", "IXP Count",
-    "Service Score", "Facility Age", "Weighted Score"
-]].to_string(index=False))
\ No newline at end of file
+
+def solve_exact(engine, method):
+    """Exact Pareto solutions as DEAP individuals with their fitness set."""
+    start = time.perf_counter()
+    bits, F = EXACT_METHODS[method](engine)
+    front = []
+    for row, fit in zip(bits.astype(int).tolist(), F.tolist()):
+        ind = creator.Individual(row)
+        ind.fitness.values = tuple(fit)
+        front.append(ind)
+    print(f"Exact {method}: {len(front)} non-dominated solutions over {int(engine.valid.sum())} "
+          f"valid sites in {time.perf_counter() - start:.2f}s")
+    return front
+
+
+def main():
+    args = parse_args()
+    df = load_dataset(args.data)
+    processes = args.processes or os.cpu_count()
+
+    # DEAP configuration for NSGA-II
+    N = len(df)
+    random.seed(args.seed)
+    engine = FitnessEngine(df)
+    if args.exact:
+        report(df, solve_exact(engine, args.exact), args.compact, args.normalize_within)
+        return
+    toolbox = make_toolbox(N, engine, args.selection)
+    archive = ParetoArchive(toolbox.clone) if args.archive else None
+
+    # Individuals already seen are answered from a packed-bitset LRU cache
+    cache = FitnessCache(engine, args.cache_size) if args.cache_size else None
+    cache_stats = {}
+
+    # Evaluation runs through toolbox.map: the builtin map in-process, or a
+    # process pool whose workers each hold their own FitnessEngine
+    pool = None
+    if processes > 1:
+        pool = make_pool(df, processes, args.cache_size, args.selection)
+        toolbox.register("map", pool.map)
+    else:
+        # Serial runs evaluate through this process's engine and cache rather
+        # than a second pair built for the worker globals
+        init_worker(df, selection=args.selection, engine=cache if cache is not None else engine)
+    # With a pool the parent's cache answers repeats before bits are sent out;
+    # serially the worker engine already is that cache
+    front_cache = cache if pool is not None else None
+
+    # Per-generation telemetry: phase timings, cache hit rate, front size
+    # and normalized hypervolume, optionally ending the run once it plateaus
+    telemetry = None
+    if args.log or args.verbose or args.early_stop:
+        if args.islands > 1:
+            counts = lambda: (cache_stats.get("hits", 0), cache_stats.get("misses", 0))
+        else:
+            counts = (lambda: (cache.hits, cache.misses)) if cache is not None else None
+        telemetry = Telemetry(engine.objective_bounds(), counts, args.log, args.verbose,
+                              args.early_stop, args.min_delta)
+
+    # Run NSGA-II optimization
+    try:
+        if args.islands > 1:
+            pop = run_islands(toolbox, args.islands, args.pop_size, args.generations, args.seed,
+                              migration_interval=args.migration_interval,
+                              n_migrants=args.migrants, map_fn=toolbox.map, stats=cache_stats,
+                              archive=archive, telemetry=telemetry)
+        else:
+            pop = toolbox.population(n=args.pop_size)
+            pop = evolve(pop, toolbox, args.generations,
+                         lambda population: evaluate_population(population, toolbox.map, processes, front_cache),
+                         archive=archive, telemetry=telemetry)
+            if cache is not None:
+                cache_stats = cache.stats()
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        if telemetry is not None:
+            telemetry.close()
+
+    if telemetry is not None and telemetry.stopped_at is not None:
+        print(f"Early stop at generation {telemetry.stopped_at}: hypervolume gain below "
+              f"{args.min_delta} for {args.early_stop} generations")
+    if args.log:
+        print(f"Saved telemetry to: {args.log}")
+
+    if args.cache_size:
+        hits, misses = cache_stats.get("hits", 0), cache_stats.get("misses", 0)
+        total = hits + misses
+        print(f"Fitness cache: {hits} hits, {misses} misses "
+              f"({hits / total if total else 0:.1%} of evaluations avoided)")
+
+    # Extract Pareto-optimal solutions: the final population's first front,
+    # or everything non-dominated that was ever evaluated
+    if archive is not None:
+        pareto_front = first_front(list(archive))
+        print(f"Pareto archive: {len(archive)} non-dominated solutions across all generations")
+    else:
+        pareto_front = first_front(pop)
+    report(df, pareto_front, args.compact, args.normalize_within)
+
+
+def report(df, pareto_front, compact=None, within=None):
+    # Collect Pareto-optimal data centers into a long DataFrame in one pass
+    # over the stacked (solutions x sites) selection bit matrix
+    result_df = long_format(df, selection_matrix(pareto_front))
+    if compact:
+        CompactFront.from_individuals(pareto_front).save(compact)
+        print(f"Saved {len(pareto_front)} packed Pareto solutions to: {compact}")
+
+    # Weights for final scoring (user-defined)
+    weights = {
+        "PUE": 0.4,
+        "IXP Count": 0.3,
+        "Service Score": 0.2,
+        "Facility Age": 0.1
+    }
+
+    # Weighted score calculation:
+    # Final_Score = -w1*norm(PUE) + w2*norm(IXP_Count) + w3*norm(Service_Score) - w4*norm(Facility_Age)
+    # PUE and Facility Age are costs, so their weights are negated
+    groups = result_df[NORMALIZE_WITHIN[within]] if within else None
+    norm, score = score_matrix(result_df[list(weights)].to_numpy(dtype=float, na_value=np.nan), list(weights.values()),
+                               [col in ("PUE", "Facility Age") for col in weights], groups=groups)
+    norm_df = result_df.copy()
+    norm_df[[col + "_norm" for col in weights]] = norm
+    norm_df["Weighted Score"] = score
+
+    # Display the results
+    print("\nWeighted Scores for All Data Centers:")
+    print(norm_df[[
+        "Solution #", "Location", "City", "State", "PUE", "IXP Count",
+        "Service Score", "Facility Age", "Weighted Score"
+    ]].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
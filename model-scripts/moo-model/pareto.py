@@ -0,0 +1,252 @@
+"""
+NumPy non-dominated sorting, crowding distance and a global Pareto archive.
+
+DEAP's sortNondominated/selNSGA2 compare individuals pairwise in Python,
+which dominates the run time once populations reach the thousands. Here
+the fitnesses are turned into one (N x M) minimization matrix, duplicates
+are collapsed with np.unique, and dominance is computed with broadcasting:
+
+    D[i, j] = all(F[i] <= F[j]) and any(F[i] < F[j])
+
+Each front is found by a sweep over the distinct rows in lexicographic
+order, where a row can only be dominated by an earlier one: blocks of rows
+are compared against the front found so far and against each other, so no
+(N x N) matrix is ever built. Later fronts are peeled off by decrementing
+per-row domination counts, accumulated block by block.
+
+`sel_nsga2` is a drop-in replacement for tools.selNSGA2 (register it as the
+toolbox's "select"), `first_front` for sortNondominated(..., first_front_only=True),
+and `ParetoArchive` keeps the non-dominated set of everything evaluated so far.
+`hypervolume` measures a front against a reference point for convergence tracking.
+"""
+import numpy as np
+
+# Max elements of the (rows x N x M) comparison block built per chunk
+_CHUNK_ELEMENTS = 1 << 24
+
+
+def fitness_matrix(individuals):
+    """(N x M) matrix where every objective is minimized, from DEAP wvalues."""
+    return -np.array([ind.fitness.wvalues for ind in individuals], dtype=float)
+
+
+def dominates(A, B):
+    """Boolean (len(A) x len(B)) matrix: row i of A dominates row j of B."""
+    A, B = A[:, None, :], B[None, :, :]
+    return (A <= B).all(axis=2) & (A < B).any(axis=2)
+
+
+def _dominator_counts(A, B):
+    """Number of rows of A dominating each row of B, in bounded blocks of A."""
+    counts = np.zeros(len(B), dtype=int)
+    step = max(1, _CHUNK_ELEMENTS // max(1, len(B) * B.shape[1]))
+    for start in range(0, len(A), step):
+        counts += dominates(A[start:start + step], B).sum(axis=0)
+    return counts
+
+
+def _front_mask(F):
+    """Non-dominated rows of F, whose rows are distinct and in lexicographic order."""
+    n, m = F.shape
+    keep = np.zeros(n, dtype=bool)
+    front = np.empty(0, dtype=np.intp)
+    # Square blocks: (block x block x M) stays within the chunk budget
+    step = max(1, int(np.sqrt(_CHUNK_ELEMENTS // max(1, m))))
+    for start in range(0, n, step):
+        rows = np.arange(start, min(start + step, n))
+        # Dominance is transitive, so the front so far is all a row must survive
+        rows = rows[_dominator_counts(F[front], F[rows]) == 0]
+        rows = rows[~dominates(F[rows], F[rows]).any(axis=0)]
+        keep[rows] = True
+        front = np.concatenate([front, rows])
+    return keep
+
+
+def nondominated_rank(F, k=None):
+    """
+    Front index (0 = non-dominated) of every row of F. With `k`, sorting
+    stops once at least k rows are ranked; the rest get -1.
+    """
+    n = len(F)
+    ranks = np.full(n, -1, dtype=int)
+    if n == 0:
+        return ranks
+    # Identical fitnesses always share a front, so rank each distinct one once;
+    # np.unique also sorts them lexicographically, as the sweep needs
+    unique, inverse, counts = np.unique(F, axis=0, return_inverse=True, return_counts=True)
+    inverse = inverse.reshape(-1)
+    unique_rank = np.full(len(unique), -1, dtype=int)
+    limit = n if k is None else min(k, n)
+    front = _front_mask(unique)
+    unique_rank[front] = 0
+    ranked, front_no = counts[front].sum(), 1
+    if ranked < limit:
+        # Later fronts: peel by decrementing domination counts, each pass in blocks
+        remaining = np.flatnonzero(~front)
+        dominated_by = _dominator_counts(unique[remaining], unique[remaining])
+        while ranked < limit and len(remaining):
+            front = dominated_by == 0
+            unique_rank[remaining[front]] = front_no
+            ranked += counts[remaining[front]].sum()
+            remaining, rest = remaining[~front], unique[remaining[front]]
+            dominated_by = dominated_by[~front] - _dominator_counts(rest, unique[remaining])
+            front_no += 1
+    ranks[:] = unique_rank[inverse]
+    return ranks
+
+
+def crowding_distance(F):
+    """
+    NSGA-II crowding distance of the rows of one front, with the same
+    normalization as tools.assignCrowdingDist (gap / (M * objective range)).
+    """
+    n, m = F.shape
+    distances = np.zeros(n)
+    if n == 0:
+        return distances
+    for i in range(m):
+        order = np.argsort(F[:, i], kind="stable")
+        values = F[order, i]
+        distances[order[0]] = distances[order[-1]] = np.inf
+        if values[-1] == values[0]:
+            continue
+        gaps = (values[2:] - values[:-2]) / (m * (values[-1] - values[0]))
+        distances[order[1:-1]] += gaps
+    return distances
+
+
+def sel_nsga2(individuals, k):
+    """
+    NSGA-II environmental selection: whole fronts in rank order, then the
+    least crowded members of the front that does not fit. Like selNSGA2 it
+    returns references to the input individuals and sets
+    fitness.crowding_dist on every individual it ranked.
+    """
+    if k == 0 or not individuals:
+        return []
+    F = fitness_matrix(individuals)
+    ranks = nondominated_rank(F, k)
+
+    chosen = []
+    for front_no in range(ranks.max() + 1):
+        members = np.flatnonzero(ranks == front_no)
+        distances = crowding_distance(F[members])
+        for idx, dist in zip(members, distances.tolist()):
+            individuals[idx].fitness.crowding_dist = dist
+        if len(chosen) + len(members) <= k:
+            chosen.extend(members.tolist())
+        else:
+            by_crowding = members[np.argsort(-distances, kind="stable")]
+            chosen.extend(by_crowding[:k - len(chosen)].tolist())
+            break
+    return [individuals[i] for i in chosen]
+
+
+def first_front(individuals):
+    """
+    Non-dominated individuals, in the order sortNondominated(..., first_front_only=True)
+    returns them: grouped by identical fitness, groups in order of first appearance.
+    """
+    if not individuals:
+        return []
+    F = fitness_matrix(individuals)
+    ranks = nondominated_rank(F, 1)
+    _, first_seen, inverse = np.unique(F, axis=0, return_index=True, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    members = np.flatnonzero(ranks == 0)
+    # Stable sort on the first index of each member's fitness group
+    order = members[np.argsort(first_seen[inverse[members]], kind="stable")]
+    return [individuals[i] for i in order]
+
+
+# ------------------------------
+# Hypervolume
+# ------------------------------
+def _hv_slices(F, ref):
+    # Exact hypervolume by slicing along the last objective (HSO); fine for
+    # the front sizes NSGA-II keeps, exponential in the number of objectives
+    if F.shape[1] == 1:
+        return float(ref[0] - F[:, 0].min())
+    F = F[np.argsort(F[:, -1], kind="stable")]
+    volume = 0.0
+    for i in range(len(F)):
+        depth = (F[i + 1, -1] if i + 1 < len(F) else ref[-1]) - F[i, -1]
+        if depth > 0:
+            volume += depth * _hv_slices(F[:i + 1, :-1], ref[:-1])
+    return volume
+
+
+def hypervolume(F, ref):
+    """
+    Volume dominated by the rows of the minimization matrix F and bounded by
+    `ref`. Rows not strictly better than `ref` in every objective are ignored.
+    Uses moocore (installed with DEAP >= 1.4) when available.
+    """
+    F = np.asarray(F, dtype=float)
+    ref = np.asarray(ref, dtype=float)
+    F = F[(F < ref).all(axis=1)] if len(F) else F
+    if len(F) == 0:
+        return 0.0
+    try:
+        import moocore
+        return float(moocore.hypervolume(F, ref=ref))
+    except ImportError:
+        F = np.unique(F, axis=0)
+        return _hv_slices(F[nondominated_rank(F, 1) == 0], ref)
+
+
+# ------------------------------
+# Incremental global Pareto archive
+# ------------------------------
+class ParetoArchive:
+    """
+    Non-dominated set of every individual passed to `update`, across all
+    generations. Each update only compares the newcomers against the
+    archive and each other, and one copy is kept per distinct genome.
+    """
+
+    def __init__(self, clone=None):
+        self.clone = clone or (lambda ind: ind)
+        self.items = []
+        self.keys = []
+        self.F = np.empty((0, 0))
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def update(self, population):
+        """Merge `population` into the archive; returns how many were added."""
+        fresh, seen = [], set()
+        archived = set(self.keys)
+        for ind in population:
+            key = np.packbits(np.asarray(ind, dtype=bool)).tobytes()
+            if key not in archived and key not in seen:
+                seen.add(key)
+                fresh.append((key, ind))
+        if not fresh:
+            return 0
+
+        F_new = fitness_matrix([ind for _, ind in fresh])
+        F_all = np.vstack([self.F, F_new]) if len(self.items) else F_new
+        n_old = len(self.items)
+
+        # Newcomers must survive everyone; archive members only need to
+        # survive the newcomers, since they were already mutually non-dominated
+        keep_old = ~dominates(F_new, F_all[:n_old]).any(axis=0)
+        keep_new = ~dominates(F_all, F_new).any(axis=0)
+
+        self.items = [ind for ind, keep in zip(self.items, keep_old) if keep]
+        self.keys = [key for key, keep in zip(self.keys, keep_old) if keep]
+        for (key, ind), keep in zip(fresh, keep_new):
+            if keep:
+                self.items.append(self.clone(ind))
+                self.keys.append(key)
+        self.F = F_all[np.concatenate([keep_old, keep_new])]
+        return int(keep_new.sum())
+
+    def fitness_values(self):
+        """(n x M) array of the archived fitness values (original signs)."""
+        return np.array([ind.fitness.values for ind in self.items], dtype=float).reshape(len(self.items), -1)
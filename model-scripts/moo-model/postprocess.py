@@ -0,0 +1,102 @@
+"""
+Vectorized post-processing of Pareto solutions.
+
+The front is stacked into one (S x N) selection bit matrix; np.nonzero on
+it gives every (solution, site) pair in row-major order, which is exactly
+the order the old per-solution mask + iterrows loop produced, so the long
+result table is built with a single fancy-indexing pass.
+
+For large fronts the solutions can also be stored compactly: each one as a
+packed bitset (N/8 bytes) plus its objective vector, in a .npz file. Site
+details are only joined when `CompactFront.details` is called.
+
+Usage:
+    python nsga_aggregator.py --compact front.npz
+    front = CompactFront.load("front.npz")
+    front.details(load_dataset("data-final.csv"), solutions=[0, 3])
+"""
+import numpy as np
+import pandas as pd
+
+from fitness import OBJECTIVE_COLUMNS
+
+# Output column -> dataset column of the long result table
+DETAIL_COLUMNS = {
+    "Location": "LOCATION",
+    "City": "CITY",
+    "State": "STATE",
+    "PUE": "State_Aggregated_PUE",
+    "IXP Count": "State_Aggregated_IXP_Count",
+    "Service Score": "SERVICE_AVAILABILITY_SCORE",
+    "Facility Age": "FACILITY_AGE",
+}
+
+
+def selection_matrix(individuals):
+    """(S x N) boolean matrix of the selected sites of each individual."""
+    return np.asarray([list(ind) for ind in individuals], dtype=bool).reshape(len(individuals), -1)
+
+
+def long_format(df, bits, solution_ids=None):
+    """
+    One row per (solution, selected site), with "Solution #" starting at 1
+    (or taken from `solution_ids`) and the DETAIL_COLUMNS site attributes.
+    """
+    bits = np.asarray(bits, dtype=bool)
+    if bits.ndim != 2 or bits.shape[1] != len(df):
+        raise ValueError(f"Expected a (solutions x {len(df)}) bit matrix, got shape {bits.shape}")
+    sol_idx, site_idx = np.nonzero(bits)
+    ids = np.arange(1, len(bits) + 1) if solution_ids is None else np.asarray(solution_ids)
+    data = {"Solution #": ids[sol_idx]}
+    for out_col, col in DETAIL_COLUMNS.items():
+        # take() on the column's own array keeps nullable and categorical dtypes
+        data[out_col] = df[col].array.take(site_idx)
+    return pd.DataFrame(data)
+
+
+# ------------------------------
+# Compact packed-bitset storage
+# ------------------------------
+class CompactFront:
+    """Pareto solutions as packed selection bitsets plus objective vectors."""
+
+    def __init__(self, packed, n_sites, objectives, objective_names=OBJECTIVE_COLUMNS):
+        self.packed = np.asarray(packed, dtype=np.uint8)
+        self.n_sites = int(n_sites)
+        self.objectives = np.asarray(objectives, dtype=float)
+        self.objective_names = list(objective_names)
+
+    @classmethod
+    def from_individuals(cls, individuals):
+        bits = selection_matrix(individuals)
+        objectives = np.array([ind.fitness.values for ind in individuals], dtype=float)
+        return cls(np.packbits(bits, axis=1), bits.shape[1], objectives.reshape(len(bits), -1))
+
+    def __len__(self):
+        return len(self.packed)
+
+    def bits(self, solutions=None):
+        packed = self.packed if solutions is None else self.packed[np.asarray(solutions)]
+        return np.unpackbits(packed, axis=1, count=self.n_sites).astype(bool)
+
+    def objective_frame(self):
+        """One row per solution: "Solution #", site count and the objective vector."""
+        frame = pd.DataFrame(self.objectives, columns=self.objective_names)
+        counts = np.unpackbits(self.packed, axis=1, count=self.n_sites).sum(axis=1)
+        frame.insert(0, "Sites Selected", counts)
+        frame.insert(0, "Solution #", np.arange(1, len(self) + 1))
+        return frame
+
+    def details(self, df, solutions=None):
+        """Long-format site details, for all or only the given 0-based solutions."""
+        ids = np.arange(len(self)) if solutions is None else np.asarray(solutions)
+        return long_format(df, self.bits(ids), ids + 1)
+
+    def save(self, path):
+        np.savez_compressed(path, packed=self.packed, n_sites=self.n_sites,
+                            objectives=self.objectives, objective_names=np.array(self.objective_names))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["packed"], data["n_sites"], data["objectives"], data["objective_names"].tolist())
@@ -0,0 +1,145 @@
+"""
+Per-generation telemetry and hypervolume-based early stopping for NSGA-II.
+
+`evolve` (and `run_islands`, once per migration epoch) hands each
+generation's population, phase timings and evaluation count to
+`Telemetry.record`, which adds one entry to a DEAP tools.Logbook:
+
+    gen, evals, variation_s, evaluation_s, selection_s, archive_s, total_s,
+    cache_hits, cache_misses, cache_hit_rate, front_size, hypervolume,
+    archive_size, archive_hypervolume, stopped
+
+and appends the same entry as one JSON line to the log file, if any.
+Island epochs run variation, evaluation and selection inside the workers,
+so they report the epoch's wall time as island_s and migration as selection_s.
+
+Hypervolume is measured on the population's first front in normalized
+objective space: every objective is scaled to [0, 1] with the bounds from
+FitnessEngine.objective_bounds, and the reference point is 1.1 in every
+objective, so values are comparable across generations and runs on the
+same data (penalized individuals fall outside the reference box).
+
+With `patience` K, `record` returns True once the hypervolume has improved
+by less than `min_delta` over its best value for K consecutive generations
+(the archive's hypervolume when a ParetoArchive is kept, else the population's).
+
+Usage:
+    python nsga_aggregator.py --log telemetry.jsonl --verbose
+    python nsga_aggregator.py --generations 500 --early-stop 20 --min-delta 1e-4
+"""
+import json
+import time
+
+import numpy as np
+from deap import tools
+
+from pareto import fitness_matrix, hypervolume, nondominated_rank
+
+# Reference point in normalized objective space
+REFERENCE = 1.1
+
+PHASES = ["variation_s", "evaluation_s", "selection_s", "archive_s"]
+
+
+class PhaseTimer:
+    """Accumulates wall time per named phase: `with timer("evaluation_s"): ...`."""
+
+    def __init__(self):
+        self.times = dict.fromkeys(PHASES, 0.0)
+        self._phase = None
+        self._start = None
+
+    def __call__(self, phase):
+        self._phase = phase
+        return self
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.times[self._phase] = self.times.get(self._phase, 0.0) + time.perf_counter() - self._start
+        return False
+
+
+class Telemetry:
+    """
+    bounds:    (2 x M) lower/upper objective bounds for normalization
+    cache:     optional callable returning cumulative (hits, misses)
+    log_path:  JSONL file, truncated when the run starts
+    verbose:   print the logbook stream line for every record
+    """
+
+    def __init__(self, bounds, cache=None, log_path=None, verbose=False,
+                 patience=0, min_delta=1e-4):
+        bounds = np.asarray(bounds, dtype=float)
+        self.low = bounds[0]
+        self.span = np.where(bounds[1] > bounds[0], bounds[1] - bounds[0], 1.0)
+        self.ref = np.full(len(self.low), REFERENCE)
+        self.cache = cache
+        self.verbose = verbose
+        self.patience = patience
+        self.min_delta = min_delta
+        self.logbook = tools.Logbook()
+        self.logbook.header = ["gen", "evals", "front_size", "hypervolume", "cache_hit_rate", "total_s"]
+        self.best_hv = -np.inf
+        self.stale = 0
+        self.stopped_at = None
+        self._cache_seen = (0, 0)
+        self._log = open(log_path, "w", encoding="utf-8") if log_path else None
+
+    def normalized_hypervolume(self, individuals):
+        if not individuals:
+            return 0.0
+        F = (fitness_matrix(individuals) - self.low) / self.span
+        return hypervolume(F[nondominated_rank(F, 1) == 0], self.ref)
+
+    def record(self, gen, population, evals, times, archive=None):
+        """Log one generation; returns True when early stopping triggers."""
+        F = fitness_matrix(population)
+        front = nondominated_rank(F, 1) == 0
+        entry = {"gen": gen, "evals": evals}
+        entry.update(dict.fromkeys(PHASES, 0.0))
+        entry.update(times)
+        entry["total_s"] = sum(times.values())
+
+        if self.cache is not None:
+            hits, misses = self.cache()
+            gen_hits, gen_misses = hits - self._cache_seen[0], misses - self._cache_seen[1]
+            self._cache_seen = (hits, misses)
+            entry.update(cache_hits=gen_hits, cache_misses=gen_misses,
+                         cache_hit_rate=gen_hits / (gen_hits + gen_misses) if gen_hits + gen_misses else 0.0)
+
+        Fn = (F[front] - self.low) / self.span
+        entry["front_size"] = int(front.sum())
+        entry["hypervolume"] = hypervolume(Fn, self.ref)
+        if archive is not None:
+            entry["archive_size"] = len(archive)
+            entry["archive_hypervolume"] = self.normalized_hypervolume(list(archive))
+
+        # The archive's hypervolume never decreases, so it is the steadier signal
+        stop = self._check(entry.get("archive_hypervolume", entry["hypervolume"]), gen)
+        entry["stopped"] = stop
+        self.logbook.record(**entry)
+        if self._log is not None:
+            self._log.write(json.dumps(entry) + "\n")
+            self._log.flush()
+        if self.verbose:
+            print(self.logbook.stream)
+        return stop
+
+    def _check(self, hv, gen):
+        if hv > self.best_hv + self.min_delta:
+            self.stale = 0
+        else:
+            self.stale += 1
+        self.best_hv = max(self.best_hv, hv)
+        if self.patience and self.stale >= self.patience:
+            self.stopped_at = gen
+            return True
+        return False
+
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
@@ -1,53 +1,91 @@
 # Multi-objective Data Center Site Selection (simplified example)
-import pyomo.environ as pyo
+#
+# Usage:
+#   python moo.py                                      # one weighted-sum answer
+#   python moo.py --mode epsilon --points 20           # cost vs renewable Pareto table
+#   python moo.py --mode epsilon --processes 4 --output pareto.csv
+import argparse
+
+import pandas as pd
+
+from site_selection import SiteSelectionProblem, build_model, epsilon_sweep, load_config
 
 # Define candidate sites and example data (normally loaded from datasets)
-sites = ['Mumbai', 'Hyderabad', 'Chennai', 'Delhi']
-energy_cost = {'Mumbai': 0.10, 'Hyderabad': 0.08, 'Chennai': 0.09, 'Delhi': 0.07}    # Electricity $/kWh
-renew_pct   = {'Mumbai': 0.50, 'Hyderabad': 0.60, 'Chennai': 0.40, 'Delhi': 0.30}    # Grid renewable fraction
-land_cost   = {'Mumbai': 5.0, 'Hyderabad': 3.0, 'Chennai': 4.0, 'Delhi': 6.0}       # Land+build cost (relative)
-latency_to_users = {'Mumbai': 10, 'Hyderabad': 20, 'Chennai': 15, 'Delhi': 25}      # Latency (ms) to key user base
-power_capacity  = {'Mumbai': 100, 'Hyderabad': 120, 'Chennai': 90, 'Delhi': 110}    # Power capacity (MW) available
+sites = pd.DataFrame({
+    'Site':             ['Mumbai', 'Hyderabad', 'Chennai', 'Delhi'],
+    'energy_cost':      [0.10, 0.08, 0.09, 0.07],   # Electricity $/kWh
+    'renew_pct':        [0.50, 0.60, 0.40, 0.30],   # Grid renewable fraction
+    'land_cost':        [5.0, 3.0, 4.0, 6.0],       # Land+build cost (relative)
+    'latency_to_users': [10, 20, 15, 25],           # Latency (ms) to key user base
+    'power_capacity':   [100, 120, 90, 110],        # Power capacity (MW) available
+})
 required_capacity = 150   # Total required capacity (MW) for the project
 
-# Initialize Pyomo model
-model = pyo.ConcreteModel()
-model.SITES = pyo.Set(initialize=sites)
-model.select = pyo.Var(model.SITES, within=pyo.Binary)  # x_i variables
+# Define components of objectives
+# Assume each site uses 50 (arbitrary units) of energy load for illustration
+sites['infra_cost'] = sites['land_cost']
+sites['energy_use'] = 50.0 * sites['energy_cost']
+sites['renewable'] = sites['renew_pct'] * 50.0
 
 # Objective weights for weighted sum approach (tunable)
-w_cost = 1.0    # weight for cost
-w_energy = 0.1  # weight for energy (lower this if cost is more important)
-w_renew = 1.0   # weight for renewable (higher weight means model favors renewable use)
-
-# Define components of objectives
-total_infra_cost = sum(land_cost[s] * model.select[s] for s in model.SITES)
-total_energy_use = sum( (50.0 * energy_cost[s]) * model.select[s] for s in model.SITES)
-# ^ assume each site uses 50 (arbitrary units) of energy load for illustration
-total_renewable  = sum( renew_pct[s] * (50.0 * model.select[s]) for s in model.SITES )
-
-# Combined objective: minimize cost + energy - renewable (negative because we want to maximize renewable)
-model.objective = pyo.Objective(
-    expr = w_cost*total_infra_cost + w_energy*total_energy_use - w_renew*total_renewable,
-    sense = pyo.minimize
-)
+weights = {
+    'infra_cost': 1.0,   # weight for cost
+    'energy_use': 0.1,   # weight for energy (lower this if cost is more important)
+    'renewable': 1.0,    # weight for renewable (higher weight means model favors renewable use)
+}
 
+# Combined objective: minimize cost + energy - renewable (renewable is maximized)
 # Constraints:
 # 1) Capacity: ensure selected sites can supply at least the required capacity
-model.capacity_constr = pyo.Constraint(
-    expr = sum(power_capacity[s] * model.select[s] for s in model.SITES) >= required_capacity
-)
 # 2) Latency: at least one site with latency <= 20ms must be selected to serve nearby users
-model.latency_constr = pyo.Constraint(
-    expr = sum(model.select[s] for s in model.SITES if latency_to_users[s] <= 20) >= 1
-)
 # 3) Budget example: limit number of sites (for simplicity, at most 2 sites can be chosen)
-model.site_count_constr = pyo.Constraint(expr = sum(model.select[s] for s in model.SITES) <= 2)
+problem = SiteSelectionProblem(
+    sites,
+    objectives={'infra_cost': 'min', 'energy_use': 'min', 'renewable': 'max'},
+    capacity={'column': 'power_capacity', 'required': required_capacity},
+    latency={'column': 'latency_to_users', 'max': 20, 'min_sites': 1},
+    sites={'max': 2},
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Data center site selection MILP")
+    parser.add_argument("--mode", choices=["weighted", "epsilon"], default="weighted",
+                        help="Single weighted-sum solve, or an epsilon-constraint Pareto sweep")
+    parser.add_argument("--epsilon-column", default="renewable",
+                        help="Objective bounded by epsilon; the others form the weighted cost")
+    parser.add_argument("--points", type=int, default=10, help="Number of epsilon values in the sweep")
+    parser.add_argument("--processes", type=int, default=1, help="Sweep worker processes (0 = all cores)")
+    parser.add_argument("--no-warm-start", action="store_true", help="Solve every sweep point from scratch")
+    parser.add_argument("--output", help="Optional CSV file for the Pareto table")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    # Solve with the open-source MILP solver set in milp_config.json (GLPK or CBC)
+    solver_config = load_config()['solver']
+
+    if args.mode == "weighted":
+        model = build_model(problem, backend='pyomo', solver_config=solver_config)
+        result = model.solve(weights)
+        # Output selected sites
+        print("Selected site(s):", result['selected'])
+        return
+
+    table = epsilon_sweep(problem, args.epsilon_column, weights, n_points=args.points,
+                          solver_config=solver_config, processes=args.processes,
+                          warm_start=not args.no_warm_start)
+    pd.set_option("display.width", 200)
+    print(f"Epsilon-constraint sweep on '{args.epsilon_column}' ({len(table)} points):")
+    print(table.to_string(index=False))
+    print(f"\nPareto front ({int(table['pareto'].sum())} distinct points):")
+    print(table.loc[table['pareto'], ['selected', 'objective', args.epsilon_column]].to_string(index=False))
+    print(f"Total solve time: {table['solve_time_s'].sum():.2f}s")
+    if args.output:
+        table.to_csv(args.output, index=False)
+        print(f"Saved Pareto table to: {args.output}")
 
-# Solve the model (using an open-source MILP solver, e.g., GLPK or CBC)
-solver = pyo.SolverFactory('glpk')
-solution = solver.solve(model, tee=False)
 
-# Output selected sites
-selected_sites = [s for s in model.SITES if pyo.value(model.select[s]) == 1]
-print("Selected site(s):", selected_sites)
+if __name__ == "__main__":
+    main()
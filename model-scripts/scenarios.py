@@ -0,0 +1,296 @@
+"""
+Batch runner for optimization scenarios over one shared data plane.
+
+A scenario file (YAML or JSON) lists scenarios, each naming a target model,
+its weights, constraint thresholds and model parameters:
+
+    data: data-final.csv           # site table, resolved against clean-data/
+    processes: 4                   # 0 = all cores, 1 = run in this process
+    scenarios:
+      - name: nsga-default
+        model: nsga
+        constraints:
+          AREA: {min: 10000}
+          SERVICE_AVAILABILITY_SCORE: {min: 4}
+        params: {pop_size: 50, generations: 50, seed: 42}
+
+Models:
+
+  nsga      NSGA-II on the site table (moo-model); reports front size and
+            normalized hypervolume, and the best Pareto sites by weighted score
+  exact     exact Pareto front of the same problem (moo-model/exact.py)
+  milp      weighted-sum MILP over min-max normalized site columns
+            (site_selection.py); params: backend, sites ({"max": k} ...)
+  weighted  the nsga_aggregator weighted score over every eligible site
+  gravity   GravityModel over the city table; weights default to gravity_config.json
+
+Constraints are {column: {"min": ..., "max": ...}} site filters. Site models
+default to the NSGA-II eligibility rule (IT EQUIPMENT POWER >= 1,
+AREA >= 10000, SERVICE_AVAILABILITY_SCORE >= 4); a scenario's constraints
+replace it.
+
+The site and city tables are loaded once (feature_store's Parquet cache)
+and the model libraries imported once, in this process, before the pool
+starts. Workers receive the tables through the pool initializer, so with
+the fork start method they share the parent's memory and nothing is
+re-parsed or re-imported per scenario. One failing scenario is reported in
+its row instead of stopping the batch.
+
+Usage:
+    python scenarios.py scenarios.yaml --processes 4 --output results.csv
+"""
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "clean-data"))
+sys.path.insert(0, os.path.join(HERE, "moo-model"))
+sys.path.insert(0, os.path.join(HERE, "gravity-model"))
+import feature_store
+
+from incremental import SITE_COSTS, SITE_WEIGHTS, IncrementalScorer
+from scoring import normalize
+
+# NSGA-II eligibility rule (fitness.valid_mask), used when a scenario sets none
+DEFAULT_CONSTRAINTS = {
+    "IT EQUIPMENT POWER": {"min": 1},
+    "AREA": {"min": 10000},
+    "SERVICE_AVAILABILITY_SCORE": {"min": 4},
+}
+
+# Modules each model needs, imported before the pool forks
+MODEL_IMPORTS = {
+    "nsga": ["evolution", "pareto", "telemetry"],
+    "exact": ["exact", "pareto", "telemetry"],
+    "milp": ["site_selection", "pyomo.environ", "pulp"],
+    "weighted": [],
+    "gravity": ["gravity_engine"],
+}
+
+
+def load_scenarios(path):
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            import yaml
+            spec = yaml.safe_load(f)
+        else:
+            spec = json.load(f)
+    # A bare list is a list of scenarios with every default
+    spec = {"scenarios": spec} if isinstance(spec, list) else spec
+    for i, scenario in enumerate(spec["scenarios"]):
+        scenario.setdefault("name", f"scenario-{i + 1}")
+        if scenario.get("model") not in MODEL_IMPORTS:
+            raise ValueError(f"Scenario '{scenario['name']}': model must be one of {sorted(MODEL_IMPORTS)}")
+    return spec
+
+
+def eligible(df, constraints):
+    """Boolean mask of the rows meeting every {column: {min, max}} threshold."""
+    mask = np.ones(len(df), dtype=bool)
+    for column, bounds in constraints.items():
+        values = df[column].to_numpy(dtype=float, na_value=np.nan)
+        if "min" in bounds:
+            mask &= values >= bounds["min"]
+        if "max" in bounds:
+            mask &= values <= bounds["max"]
+    return mask
+
+
+def _site_weights(scenario):
+    weights = scenario.get("weights") or SITE_WEIGHTS
+    unknown = set(weights) - set(SITE_WEIGHTS)
+    if unknown:
+        raise ValueError(f"Unknown site weight columns: {sorted(unknown)}")
+    return weights
+
+
+def _top_sites(df, weights, k):
+    """Names and scores of the k best rows by the nsga_aggregator weighted score."""
+    scorer = IncrementalScorer("LOCATION", weights, SITE_COSTS, score_column="Weighted Score").build(df)
+    top = scorer.ranked().head(k)
+    return "; ".join(top["LOCATION"].astype(str)), float(top["Weighted Score"].iloc[0]) if len(top) else None
+
+
+# ------------------------------
+# Model runners: (data, scenario) -> result columns
+# ------------------------------
+def _front_metrics(engine, F):
+    from telemetry import REFERENCE
+    from pareto import hypervolume, nondominated_rank
+    bounds = engine.objective_bounds()
+    span = np.where(bounds[1] > bounds[0], bounds[1] - bounds[0], 1.0)
+    Fn = (F - bounds[0]) / span
+    return len(np.unique(F, axis=0)), hypervolume(Fn[nondominated_rank(Fn, 1) == 0], np.full(4, REFERENCE))
+
+
+def run_nsga(data, scenario, mask):
+    from evolution import evolve, make_toolbox
+    from fitness import FitnessEngine
+    from pareto import first_front, fitness_matrix
+    df, params = data["sites"], scenario.get("params", {})
+    engine = FitnessEngine(df, valid=mask)
+    random.seed(params.get("seed", 42))
+    toolbox = make_toolbox(len(df), engine, params.get("selection", "deap"))
+    pop = evolve(toolbox.population(n=params.get("pop_size", 50)), toolbox,
+                 params.get("generations", 50), engine.evaluate_population)
+    front = first_front(pop)
+    points, hv = _front_metrics(engine, fitness_matrix(front))
+    # Sites on any Pareto solution, best first by the weighted score
+    on_front = np.asarray([list(ind) for ind in front], dtype=bool).any(axis=0) & mask
+    selected, best = _top_sites(df[on_front], _site_weights(scenario), params.get("top", 5))
+    return {"status": "ok", "selected": selected, "score": hv, "front_points": points,
+            "hypervolume": hv, "best_weighted_score": best}
+
+
+def run_exact(data, scenario, mask):
+    from exact import exact_front, supported_front
+    from fitness import FitnessEngine
+    df, params = data["sites"], scenario.get("params", {})
+    engine = FitnessEngine(df, valid=mask)
+    solve = supported_front if params.get("method") == "supported" else exact_front
+    bits, F = solve(engine)
+    points, hv = _front_metrics(engine, F)
+    selected, best = _top_sites(df[bits.any(axis=0) & mask], _site_weights(scenario), params.get("top", 5))
+    return {"status": "ok", "selected": selected, "score": hv, "front_points": points,
+            "hypervolume": hv, "best_weighted_score": best}
+
+
+def run_milp(data, scenario, mask):
+    from site_selection import SiteSelectionProblem, build_model, load_config
+    params = scenario.get("params", {})
+    weights = _site_weights(scenario)
+    df = data["sites"][mask].reset_index(drop=True)
+    # Columns are min-max normalized so the weights mean the same as in the weighted score;
+    # a site without a value contributes nothing to that term
+    table = pd.DataFrame({"Site": df["LOCATION"].astype(str)})
+    table[list(weights)] = np.nan_to_num(normalize(df[list(weights)].to_numpy(dtype=float, na_value=np.nan)))
+    problem = SiteSelectionProblem(
+        table,
+        objectives={col: "min" if col in SITE_COSTS else "max" for col in weights},
+        sites=params.get("sites", {"exact": 1}),
+    )
+    model = build_model(problem, backend=params.get("backend", "pulp"), solver_config=load_config()["solver"])
+    result = model.solve(weights)
+    return {"status": result["status"], "selected": "; ".join(result["selected"]),
+            "score": result["objective"]}
+
+
+def run_weighted(data, scenario, mask):
+    params = scenario.get("params", {})
+    selected, best = _top_sites(data["sites"][mask], _site_weights(scenario), params.get("top", 5))
+    return {"status": "ok", "selected": selected, "score": best, "best_weighted_score": best}
+
+
+def run_gravity(data, scenario, mask):
+    from gravity_engine import GravityModel
+    config, params = data["gravity_config"], scenario.get("params", {})
+    model = GravityModel(data["cities"][mask], scenario.get("weights") or config["weights"],
+                         config["cost_params"], config["benefit_params"])
+    ranked = model.ranked().head(params.get("top", 3))
+    return {"status": "ok", "selected": "; ".join(ranked["City"]), "score": float(ranked["Score"].iloc[0])}
+
+
+RUNNERS = {
+    "nsga": run_nsga,
+    "exact": run_exact,
+    "milp": run_milp,
+    "weighted": run_weighted,
+    "gravity": run_gravity,
+}
+
+
+# ------------------------------
+# Shared data plane and process pool
+# ------------------------------
+_data = None
+
+
+def init_worker(data):
+    global _data
+    _data = data
+
+
+def load_data(spec, scenarios):
+    data = {}
+    if any(s["model"] != "gravity" for s in scenarios):
+        data["sites"] = feature_store.load(spec.get("data", feature_store.DEFAULT_SOURCE))
+    if any(s["model"] == "gravity" for s in scenarios):
+        import gravity_engine
+        config = gravity_engine.load_config(spec.get("gravity_config", gravity_engine.DEFAULT_CONFIG))
+        data["gravity_config"] = config
+        data["cities"] = gravity_engine.load_cities(config["source"], config.get("xlsx_columns"))
+    for model in {s["model"] for s in scenarios}:
+        for module in MODEL_IMPORTS[model]:
+            importlib.import_module(module)
+    return data
+
+
+def run_scenario(scenario):
+    """One row of the results table; errors are reported, not raised."""
+    start = time.perf_counter()
+    row = {"scenario": scenario["name"], "model": scenario["model"]}
+    try:
+        table = _data["cities"] if scenario["model"] == "gravity" else _data["sites"]
+        default = {} if scenario["model"] == "gravity" else DEFAULT_CONSTRAINTS
+        mask = eligible(table, scenario.get("constraints", default))
+        row["candidates"] = int(mask.sum())
+        row.update(RUNNERS[scenario["model"]](_data, scenario, mask))
+    except Exception as exc:
+        row["status"] = f"error: {type(exc).__name__}: {exc}"
+    row["runtime_s"] = time.perf_counter() - start
+    row["pid"] = os.getpid()
+    return row
+
+
+def run_all(spec, processes=None):
+    scenarios = spec["scenarios"]
+    processes = spec.get("processes", 1) if processes is None else processes
+    data = load_data(spec, scenarios)
+    if processes == 1:
+        init_worker(data)
+        rows = [run_scenario(s) for s in scenarios]
+    else:
+        with multiprocessing.Pool(processes or os.cpu_count(), initializer=init_worker,
+                                  initargs=(data,)) as pool:
+            # One scenario per task, results in file order
+            rows = pool.map(run_scenario, scenarios, chunksize=1)
+    columns = ["scenario", "model", "status", "candidates", "score", "selected", "runtime_s", "pid"]
+    table = pd.DataFrame(rows)
+    return table.reindex(columns=columns + [c for c in table.columns if c not in columns])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a batch of optimization scenarios on one shared dataset")
+    parser.add_argument("scenarios", help="YAML or JSON scenario file")
+    parser.add_argument("--processes", type=int, help="Worker processes (0 = all cores, 1 = in-process); "
+                                                      "overrides the file's setting")
+    parser.add_argument("--output", help="Optional CSV or JSON file for the results table")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    spec = load_scenarios(args.scenarios)
+    table = run_all(spec, args.processes)
+    pd.set_option("display.width", 200)
+    pd.set_option("display.max_colwidth", 60)
+    print(table.to_string(index=False))
+    print(f"\n{len(table)} scenarios in {time.perf_counter() - start:.2f}s "
+          f"(sum of scenario runtimes {table['runtime_s'].sum():.2f}s)")
+    if args.output:
+        if args.output.endswith(".json"):
+            table.to_json(args.output, orient="records", indent=2)
+        else:
+            table.to_csv(args.output, index=False)
+        print(f"Saved results to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
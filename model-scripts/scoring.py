@@ -0,0 +1,101 @@
+"""
+Shared min-max normalization and weighted-score kernel.
+
+Every model scores candidates the same way: each feature column is scaled
+to [0, 1] by its min and max, and the scaled columns are combined with
+weights, cost columns counting against the score. Two conventions exist:
+
+  invert=True    cost columns become (high - x) / span, all weights are added
+                 (GravityModel; scores stay in [0, 1])
+  invert=False   every column becomes (x - low) / span and cost weights are
+                 negated (nsga_aggregator's Weighted Score)
+
+Both work on an (N x P) feature matrix in a few NumPy passes. A column whose
+max equals its min normalizes to 0 instead of NaN, and missing values stay
+missing. With `groups` (one label per row, e.g. "Solution #" or STATE) the
+min and max are taken within each group, through ufunc.at on factorized
+labels rather than a loop over the groups.
+
+Usage:
+    norm = normalize(X, is_cost, invert=True)
+    score = weighted_score(norm, weights, is_cost, invert=True)
+    norm, score = score_matrix(X, weights, is_cost, groups=df["STATE"])
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+
+def group_codes(groups):
+    """Integer code per row and the number of groups; missing labels form their own group."""
+    codes, uniques = pd.factorize(np.asarray(groups, dtype=object), use_na_sentinel=False)
+    return codes, len(uniques)
+
+
+def bounds(X, groups=None):
+    """
+    Column min and max ignoring NaN: two (P,) arrays, or (G x P) arrays of
+    per-group bounds together with the row codes when `groups` is given.
+    All-missing columns get NaN bounds.
+    """
+    X = np.asarray(X, dtype=float)
+    if groups is None:
+        # All-NaN columns warn in nanmin/nanmax; their bounds are simply NaN
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            return np.nanmin(X, axis=0), np.nanmax(X, axis=0)
+    codes, n_groups = group_codes(groups)
+    low = np.full((n_groups, X.shape[1]), np.nan)
+    high = np.full((n_groups, X.shape[1]), np.nan)
+    # fmin/fmax skip NaN, so a group's bound is NaN only when all its values are
+    np.fmin.at(low, codes, X)
+    np.fmax.at(high, codes, X)
+    return low, high, codes
+
+
+def normalize(X, is_cost=None, invert=False, groups=None, low=None, high=None):
+    """
+    Min-max normalize the columns of X (N x P). Bounds come from X (within
+    each group if `groups` is given) unless `low`/`high` are passed, as
+    (P,) arrays. Zero-range columns give 0; NaN inputs stay NaN.
+    """
+    X = np.asarray(X, dtype=float)
+    if low is None or high is None:
+        if groups is None:
+            low, high = bounds(X)
+        else:
+            low, high, codes = bounds(X, groups)
+            low, high = low[codes], high[codes]
+    span = high - low
+    if invert and is_cost is not None:
+        diff = np.where(np.asarray(is_cost, dtype=bool), high - X, X - low)
+    else:
+        diff = X - low
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scaled = diff / np.where(span > 0, span, 1.0)
+    return np.where(span > 0, scaled, np.where(np.isnan(X), np.nan, 0.0))
+
+
+def signed_weights(weights, is_cost=None, invert=False):
+    """Weights as applied to normalized columns: cost weights negated unless inverted."""
+    weights = np.asarray(weights, dtype=float)
+    if invert or is_cost is None:
+        return weights
+    return np.where(np.asarray(is_cost, dtype=bool), -weights, weights)
+
+
+def weighted_score(norm, weights, is_cost=None, invert=False):
+    """
+    Row scores of a normalized (N x P) matrix. Summed row by row in column
+    order (not a BLAS product), so a row scores the same bits alone or
+    within any larger batch; a missing value makes the row's score NaN.
+    """
+    return (np.asarray(norm, dtype=float) * signed_weights(weights, is_cost, invert)).sum(axis=1)
+
+
+def score_matrix(X, weights, is_cost=None, invert=False, groups=None):
+    """Normalized matrix and weighted scores in one call."""
+    norm = normalize(X, is_cost, invert, groups)
+    return norm, weighted_score(norm, weights, is_cost, invert)
+
@@ -0,0 +1,449 @@
+"""
+Reusable MILP builder for weighted-sum data center site selection.
+
+Takes a candidate-site table (one row per site) and builds either a Pyomo or
+a PuLP model whose coefficients come straight from the table columns:
+
+  * objectives:  one linear term per column, minimized or maximized,
+  * capacity:    sum(capacity_i * x_i) >= required,
+  * latency:     at least `min_sites` selected sites within `max` latency,
+  * site count:  sum(x_i) <= max (or == exact),
+  * eligibility: sites failing a per-column min/max bound are fixed to 0.
+
+Every constraint is one linear expression built from a NumPy coefficient
+array, so the model is assembled in O(N) with no per-site DataFrame lookups.
+The weighted-sum objective can be re-solved with new weights without
+rebuilding: Pyomo weights are mutable Params, PuLP gets a fresh objective via
+setObjective. The solver (glpk or cbc) is chosen in milp_config.json; the
+default is glpk, as in the original moo.py. When glpsol is not installed and
+no executable is configured, both backends fall back to the CBC binary that
+ships with PuLP and say so with a warning.
+
+epsilon_sweep maps a two-objective trade-off on a single Pyomo model: one
+column is bounded by a mutable `epsilon` Param, each solve is warm-started
+from the previous solution (with CBC; GLPK takes no MIP start, so a
+warm-started sweep switches to CBC), and the points can be split over a
+process pool.
+
+Usage:
+    problem = SiteSelectionProblem(df, objectives={"Cost": "min", "Renewable": "max"},
+                                   sites={"exact": 1})
+    model = build_model(problem, backend="pulp", solver_config=load_config()["solver"])
+    model.solve({"Cost": 1.0, "Renewable": 5.0})
+    model.solve({"Cost": 0.2, "Renewable": 5.0})   # only the objective changes
+"""
+import json
+import os
+import shutil
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CONFIG = os.path.join(BASE_DIR, "milp_config.json")
+
+SOLVERS = ("cbc", "glpk")
+SENSES = {"min": 1.0, "max": -1.0}
+
+
+def load_config(path=DEFAULT_CONFIG):
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    if config["solver"]["name"] not in SOLVERS:
+        raise ValueError(f"Unsupported solver '{config['solver']['name']}', expected one of {SOLVERS}")
+    return config
+
+
+def _glpk_missing(config):
+    if config["name"] != "glpk" or config.get("executable") or shutil.which("glpsol"):
+        return False
+    warnings.warn("glpsol not found on PATH; solving with the CBC binary bundled with PuLP")
+    return True
+
+
+def _pulp_cbc_path():
+    # PuLP ships a CBC binary, which Pyomo can use when cbc is not on PATH
+    try:
+        from pulp import PULP_CBC_CMD
+        return PULP_CBC_CMD().path
+    except Exception:
+        return None
+
+
+# ------------------------------
+# Problem definition
+# ------------------------------
+class SiteSelectionProblem:
+    """
+    Coefficient arrays for one candidate-site table.
+
+    objectives:  {column: "min" | "max"}, the weighted-sum terms
+    capacity:    {"column": ..., "required": ...}
+    latency:     {"column": ..., "max": ..., "min_sites": 1}
+    sites:       {"max": ...} and/or {"min": ...} or {"exact": ...}
+    eligibility: {column: {"min": ..., "max": ...}}, applied per site
+    """
+
+    def __init__(self, df, objectives, capacity=None, latency=None, sites=None,
+                 eligibility=None, site_column="Site"):
+        self.df = df.reset_index(drop=True)
+        self.sites = self.df[site_column].astype(str).tolist()
+        self.objectives = list(objectives)
+        unknown = {s for s in objectives.values()} - set(SENSES)
+        if unknown:
+            raise ValueError(f"Objective senses must be 'min' or 'max', got {sorted(unknown)}")
+
+        # Raw column values (K x N) and the same with maximized terms negated
+        self.values = self.df[self.objectives].to_numpy(dtype=float).T
+        self.signs = np.array([SENSES[objectives[c]] for c in self.objectives])
+        self.coefs = self.values * self.signs[:, None]
+
+        self.capacity = None
+        if capacity:
+            self.capacity = (self.df[capacity["column"]].to_numpy(dtype=float), float(capacity["required"]))
+
+        self.latency = None
+        if latency:
+            within = self.df[latency["column"]].to_numpy(dtype=float) <= latency["max"]
+            self.latency = (within, float(latency.get("min_sites", 1)))
+
+        self.site_bounds = dict(sites or {})
+
+        eligible = np.ones(len(self.df), dtype=bool)
+        for column, bounds in (eligibility or {}).items():
+            col = self.df[column].to_numpy(dtype=float)
+            if "min" in bounds:
+                eligible &= col >= bounds["min"]
+            if "max" in bounds:
+                eligible &= col <= bounds["max"]
+        self.eligible = eligible
+
+    @property
+    def n_sites(self):
+        return len(self.sites)
+
+    def weight_vector(self, weights):
+        missing = set(self.objectives) - set(weights)
+        if missing:
+            raise ValueError(f"Missing weights for objectives: {sorted(missing)}")
+        return np.array([weights[c] for c in self.objectives], dtype=float)
+
+    def weighted_coefs(self, weights):
+        """Per-site objective coefficient: sum_k sign_k * w_k * value_k."""
+        return self.weight_vector(weights) @ self.coefs
+
+    def result(self, x, status, objective):
+        x = np.round(np.asarray(x, dtype=float)).astype(bool)
+        return {
+            "status": status,
+            "selected": [s for s, chosen in zip(self.sites, x) if chosen],
+            "objective": objective,
+            "totals": dict(zip(self.objectives, self.values @ x)),
+        }
+
+
+# ------------------------------
+# Pyomo backend
+# ------------------------------
+class PyomoSiteModel:
+    def __init__(self, problem, solver_config=None):
+        import pyomo.environ as pyo
+        from pyomo.core.expr import LinearExpression
+
+        self.pyo = pyo
+        self.problem = problem
+        self.solver_config = solver_config or {"name": "glpk"}
+        n = problem.n_sites
+
+        model = pyo.ConcreteModel()
+        model.SITES = pyo.RangeSet(0, n - 1)
+        model.OBJECTIVES = pyo.Set(initialize=problem.objectives, ordered=True)
+        model.select = pyo.Var(model.SITES, within=pyo.Binary)
+        x = list(model.select.values())
+
+        def linear(coefs, variables=x):
+            return LinearExpression(constant=0, linear_coefs=list(map(float, coefs)), linear_vars=list(variables))
+
+        # One signed linear term per objective, combined with mutable weights
+        model.weight = pyo.Param(model.OBJECTIVES, initialize=1.0, mutable=True)
+        model.term = pyo.Expression(
+            model.OBJECTIVES,
+            rule=lambda m, k: linear(problem.coefs[problem.objectives.index(k)])
+        )
+        model.objective = pyo.Objective(
+            expr=sum(model.weight[k] * model.term[k] for k in model.OBJECTIVES),
+            sense=pyo.minimize
+        )
+
+        if problem.capacity is not None:
+            capacity, required = problem.capacity
+            model.capacity_constr = pyo.Constraint(expr=linear(capacity) >= required)
+        if problem.latency is not None:
+            within, min_sites = problem.latency
+            close = [x[i] for i in np.flatnonzero(within)]
+            model.latency_constr = pyo.Constraint(expr=linear(np.ones(len(close)), close) >= min_sites)
+        bounds = problem.site_bounds
+        if bounds:
+            count = linear(np.ones(n))
+            if "exact" in bounds:
+                model.site_count_constr = pyo.Constraint(expr=count == bounds["exact"])
+            else:
+                if "max" in bounds:
+                    model.site_count_constr = pyo.Constraint(expr=count <= bounds["max"])
+                if "min" in bounds:
+                    model.site_min_constr = pyo.Constraint(expr=count >= bounds["min"])
+        for i in np.flatnonzero(~problem.eligible):
+            x[i].fix(0)
+
+        self.model = model
+        self.x = x
+        self.solver = self._make_solver()
+        self.warm_started = False
+
+    def _make_solver(self):
+        config = self.solver_config
+        name = "cbc" if _glpk_missing(config) else config["name"]
+        executable = config.get("executable")
+        if executable is None and name == "cbc" and shutil.which("cbc") is None:
+            executable = _pulp_cbc_path()
+        solver = self.pyo.SolverFactory(name, executable=executable) if executable else self.pyo.SolverFactory(name)
+        if config.get("time_limit"):
+            solver.options["sec" if name == "cbc" else "tmlim"] = config["time_limit"]
+        return solver
+
+    def set_weights(self, weights):
+        for k, w in zip(self.problem.objectives, self.problem.weight_vector(weights)):
+            self.model.weight[k] = w
+
+    def solve(self, weights=None, epsilon=None, warm_start=False):
+        if weights is not None:
+            self.set_weights(weights)
+        if epsilon is not None:
+            self.model.epsilon = epsilon
+        kwargs = {"tee": self.solver_config.get("msg", False)}
+        # The previous solution is still loaded in the variables and is
+        # handed to the solver as a MIP start
+        self.warm_started = (warm_start and self.solver.warm_start_capable()
+                             and all(v.value is not None for v in self.x))
+        if self.warm_started:
+            kwargs["warmstart"] = True
+        results = self.solver.solve(self.model, **kwargs)
+        status = str(results.solver.termination_condition)
+        if status != "optimal":
+            return {"status": status, "selected": [], "objective": None, "totals": {}}
+        x = [v.value or 0.0 for v in self.x]
+        return self.problem.result(x, status, self.pyo.value(self.model.objective))
+
+    # ------------------------------
+    # Epsilon-constraint mode
+    # ------------------------------
+    def add_epsilon_constraint(self, column):
+        """
+        Bound the total of one objective column by the mutable Param `epsilon`
+        (>= epsilon for maximized columns, <= epsilon for minimized ones), so a
+        sweep only changes a parameter value between solves.
+        """
+        pyo = self.pyo
+        model = self.model
+        sign = self.problem.signs[self.problem.objectives.index(column)]
+        model.epsilon = pyo.Param(initialize=0.0, mutable=True)
+        # term is sign * total, so sign * total <= sign * epsilon covers both senses
+        model.epsilon_constr = pyo.Constraint(expr=model.term[column] <= sign * model.epsilon)
+        self.epsilon_column = column
+
+    def epsilon_range(self, weights):
+        """
+        Totals of the epsilon column at the two ends of the trade-off: at the
+        optimum of the primary objective and at the column's own optimum.
+        """
+        column = self.epsilon_column
+        self.model.epsilon_constr.deactivate()
+        try:
+            at_primary = self.solve(weights)["totals"][column]
+            own = {k: float(k == column) for k in self.problem.objectives}
+            at_own = self.solve(own)["totals"][column]
+        finally:
+            self.model.epsilon_constr.activate()
+        return at_primary, at_own
+
+
+# ------------------------------
+# PuLP backend
+# ------------------------------
+class PulpSiteModel:
+    def __init__(self, problem, solver_config=None, name="DataCenterPlacement"):
+        import pulp
+
+        self.pulp = pulp
+        self.problem = problem
+        self.solver_config = solver_config or {"name": "glpk"}
+        n = problem.n_sites
+
+        self.model = pulp.LpProblem(name, pulp.LpMinimize)
+        self.x = [pulp.LpVariable(f"x_{i}", cat=pulp.LpBinary) for i in range(n)]
+        x = self.x
+
+        def linear(coefs, variables=x):
+            return pulp.LpAffineExpression(zip(variables, map(float, coefs)))
+
+        if problem.capacity is not None:
+            capacity, required = problem.capacity
+            self.model += linear(capacity) >= required, "Capacity"
+        if problem.latency is not None:
+            within, min_sites = problem.latency
+            close = [x[i] for i in np.flatnonzero(within)]
+            self.model += linear(np.ones(len(close)), close) >= min_sites, "Latency"
+        bounds = problem.site_bounds
+        if bounds:
+            if "exact" in bounds:
+                self.model += linear(np.ones(n)) == bounds["exact"], "SiteCount"
+            else:
+                if "max" in bounds:
+                    self.model += linear(np.ones(n)) <= bounds["max"], "SiteCount"
+                if "min" in bounds:
+                    self.model += linear(np.ones(n)) >= bounds["min"], "SiteMin"
+        for i in np.flatnonzero(~problem.eligible):
+            x[i].upBound = 0
+
+        # Unit weights until set_weights/solve is called, as in the Pyomo model
+        self.set_weights(dict.fromkeys(problem.objectives, 1.0))
+        self.solver = self._make_solver()
+
+    def _make_solver(self):
+        config = self.solver_config
+        kwargs = {"msg": config.get("msg", False)}
+        if config.get("time_limit"):
+            kwargs["timeLimit"] = config["time_limit"]
+        if config.get("executable"):
+            kwargs["path"] = config["executable"]
+        if config["name"] == "glpk" and not _glpk_missing(config):
+            return self.pulp.GLPK_CMD(**kwargs)
+        return self.pulp.COIN_CMD(**kwargs) if "path" in kwargs else self.pulp.PULP_CBC_CMD(**kwargs)
+
+    def set_weights(self, weights):
+        self.model.setObjective(self.pulp.LpAffineExpression(
+            zip(self.x, map(float, self.problem.weighted_coefs(weights)))
+        ))
+
+    def solve(self, weights=None):
+        if weights is not None:
+            self.set_weights(weights)
+        self.model.solve(self.solver)
+        status = self.pulp.LpStatus[self.model.status].lower()
+        if status != "optimal":
+            return {"status": status, "selected": [], "objective": None, "totals": {}}
+        x = [v.varValue or 0.0 for v in self.x]
+        return self.problem.result(x, status, self.pulp.value(self.model.objective))
+
+
+BACKENDS = {"pyomo": PyomoSiteModel, "pulp": PulpSiteModel}
+
+
+def build_model(problem, backend="pyomo", solver_config=None):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', expected one of {sorted(BACKENDS)}")
+    return BACKENDS[backend](problem, solver_config)
+
+
+def sweep_weights(model, weight_sets):
+    """Re-solve one built model for every weight dict; returns a DataFrame."""
+    rows = []
+    for weights in weight_sets:
+        result = model.solve(weights)
+        rows.append({
+            **{f"w_{k}": v for k, v in weights.items()},
+            "status": result["status"],
+            "selected": ", ".join(result["selected"]),
+            "objective": result["objective"],
+            **result["totals"],
+        })
+    return pd.DataFrame(rows)
+
+
+# ------------------------------
+# Epsilon-constraint Pareto sweep
+# ------------------------------
+# Each pool worker builds its own Pyomo model once in the initializer and
+# then solves a contiguous run of epsilon values, so warm starts still chain
+# from one point to the next inside a worker.
+_sweep_model = None
+
+
+def _init_sweep_worker(problem, column, solver_config):
+    global _sweep_model
+    _sweep_model = PyomoSiteModel(problem, solver_config)
+    _sweep_model.add_epsilon_constraint(column)
+
+
+def _solve_epsilons(model, weights, epsilons, warm_start):
+    rows = []
+    model.set_weights(weights)
+    for eps in epsilons:
+        start = time.perf_counter()
+        result = model.solve(epsilon=float(eps), warm_start=warm_start)
+        rows.append({
+            "epsilon": float(eps),
+            "status": result["status"],
+            "selected": ", ".join(result["selected"]),
+            "objective": result["objective"],
+            **result["totals"],
+            "solve_time_s": time.perf_counter() - start,
+            "warm_started": model.warm_started,
+        })
+    return rows
+
+
+def _solve_epsilon_chunk(task):
+    weights, epsilons, warm_start = task
+    return _solve_epsilons(_sweep_model, weights, epsilons, warm_start)
+
+
+def mark_pareto(table, column, sense):
+    """Flag optimal rows not dominated on (objective, column) and not repeats."""
+    table = table.copy()
+    optimal = (table["status"] == "optimal").to_numpy()
+    obj = table["objective"].to_numpy(dtype=float)
+    other = SENSES[sense] * table[column].to_numpy(dtype=float) if column in table else np.zeros(len(table))
+    no_worse = (obj[None, :] <= obj[:, None]) & (other[None, :] <= other[:, None])
+    better = (obj[None, :] < obj[:, None]) | (other[None, :] < other[:, None])
+    dominated = (no_worse & better & optimal[None, :]).any(axis=1)
+    first = ~table["selected"].duplicated()
+    table["pareto"] = optimal & ~dominated & first.to_numpy()
+    return table
+
+
+def epsilon_sweep(problem, column, weights, n_points=10, epsilons=None, solver_config=None,
+                  processes=1, warm_start=True):
+    """
+    Minimize the weighted sum of the other objectives while bounding `column`
+    at each epsilon (evenly spaced over its trade-off range unless given).
+    Returns a table with one row per epsilon, its solve time, whether it was
+    warm-started, and a `pareto` flag for the distinct non-dominated points.
+    Warm starts need a solver that takes a MIP start; GLPK does not, so the
+    sweep switches to CBC when one was requested.
+    """
+    weights = {**weights, column: 0.0}
+    model = PyomoSiteModel(problem, solver_config)
+    if warm_start and not model.solver.warm_start_capable():
+        warnings.warn(f"{model.solver_config['name']} cannot take a MIP start; "
+                      "solving the warm-started sweep with CBC")
+        solver_config = {**model.solver_config, "name": "cbc", "executable": None}
+        model = PyomoSiteModel(problem, solver_config)
+    model.add_epsilon_constraint(column)
+    if epsilons is None:
+        epsilons = np.linspace(*model.epsilon_range(weights), n_points)
+
+    if processes == 1:
+        rows = _solve_epsilons(model, weights, epsilons, warm_start)
+    else:
+        import multiprocessing
+        chunks = [c for c in np.array_split(np.asarray(epsilons), processes or os.cpu_count()) if len(c)]
+        with multiprocessing.Pool(len(chunks), initializer=_init_sweep_worker,
+                                  initargs=(problem, column, solver_config)) as pool:
+            parts = pool.map(_solve_epsilon_chunk, [(weights, c, warm_start) for c in chunks])
+        rows = [row for part in parts for row in part]
+
+    sense = "max" if problem.signs[problem.objectives.index(column)] < 0 else "min"
+    return mark_pareto(pd.DataFrame(rows), column, sense)
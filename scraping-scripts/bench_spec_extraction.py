@@ -0,0 +1,74 @@
+"""
+Benchmark spec-page extraction paths against the saved HTML fixtures.
+
+Loads every fixtures/**/specs/index.html page once, then times the
+locator-based path and the single page.evaluate path on it, checking that
+both return identical results.
+
+Usage:
+    python bench_spec_extraction.py --repeat 20 --output bench_spec_extraction.json
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import time
+
+from playwright.sync_api import sync_playwright
+
+from spec_extract import EXTRACTION_MODES
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def time_mode(page, extract, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = extract(page)
+        timings.append(time.perf_counter() - start)
+    return result, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark spec page extraction modes")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    files = sorted(glob.glob(os.path.join(args.fixtures, "**", "specs", "index.html"), recursive=True))
+    if not files:
+        raise SystemExit(f"No spec fixtures found under {args.fixtures}")
+
+    results = []
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        for path in files:
+            page.goto("file://" + os.path.abspath(path))
+            row = {"fixture": os.path.relpath(path, args.fixtures)}
+            outputs = {}
+            for mode, extract in EXTRACTION_MODES.items():
+                outputs[mode], timings = time_mode(page, extract, args.repeat)
+                row[f"{mode}_median_ms"] = statistics.median(timings) * 1000
+            row["identical"] = outputs["evaluate"] == outputs["locator"]
+            row["speedup"] = row["locator_median_ms"] / row["evaluate_median_ms"]
+            results.append(row)
+            print(f"{row['fixture']:<70} locator {row['locator_median_ms']:8.1f} ms   "
+                  f"evaluate {row['evaluate_median_ms']:6.1f} ms   "
+                  f"x{row['speedup']:.0f}   identical={row['identical']}")
+        browser.close()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"repeat": args.repeat, "results": results}, f, indent=2)
+        print(f"Saved results to: {args.output}")
+    if not all(r["identical"] for r in results):
+        raise SystemExit("Extraction modes disagree on at least one fixture")
+
+
+if __name__ == "__main__":
+    main()
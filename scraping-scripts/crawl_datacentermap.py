@@ -0,0 +1,328 @@
+"""
+Concurrent, resumable crawler for datacentermap.com state, city and spec pages.
+
+Replaces the one-page sync flow of scrape_datacentermap.py followed by
+scrape_datacenter_playwright_specs.py with a single asyncio crawl:
+
+  * a pool of browser contexts pulls state, city and spec URLs from one queue,
+  * requests are spaced per host by a rate limiter instead of fixed sleeps,
+  * every fetched URL is appended to a JSONL checkpoint journal, so a rerun
+    skips spec pages already fetched and only retries what failed; state and
+    city listings are reused for --listing-ttl hours (default 24) and then
+    fetched again, so newly listed sites are found (--refresh-listings
+    always refetches them),
+  * all requested states end up in one consolidated output file.
+
+Usage:
+    python crawl_datacentermap.py california idaho --contexts 4 --rate 1.0
+    python crawl_datacentermap.py california --refresh-listings   # pick up new sites
+    # against the saved HTML fixtures:
+    python -m http.server 8000 --directory fixtures
+    python crawl_datacentermap.py california idaho --base-url http://localhost:8000
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from urllib.parse import urljoin, urlparse
+
+import pandas as pd
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+
+from spec_extract import extract_specs_async
+
+BASE_URL = "https://www.datacentermap.com"
+
+# Listing pages change as sites are added; spec pages are kept for good
+LISTING_KINDS = {"state", "city"}
+CITIES_TABLE = ".ui.sortable.striped.very.basic.very.compact.table"
+CARDS = ".ui.centered.cards"
+
+
+# ------------------------------
+# Per-host rate limiting
+# ------------------------------
+class HostRateLimiter:
+    """Spaces requests to the same host at least 1/rate seconds apart."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = {}
+        self._lock = asyncio.Lock()
+
+    async def wait(self, url):
+        host = urlparse(url).netloc
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        await asyncio.sleep(slot - now)
+
+
+# ------------------------------
+# Checkpoint journal
+# ------------------------------
+class CrawlJournal:
+    """
+    Append-only JSONL record of fetched URLs and what was extracted from them.
+    Each line is flushed as soon as the page is parsed; a truncated last line
+    (e.g. after a kill) is ignored on reload.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self.entries[entry["url"]] = entry
+        self._file = open(path, "a", encoding="utf-8")
+
+    def get(self, url):
+        return self.entries.get(url)
+
+    def record(self, url, kind, meta, payload):
+        entry = {"url": url, "kind": kind, "meta": meta, "payload": payload, "fetched_at": time.time()}
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+        self.entries[url] = entry
+
+    def close(self):
+        self._file.close()
+
+
+# ------------------------------
+# Page extraction
+# ------------------------------
+async def extract_cities(page):
+    await page.wait_for_selector(CITIES_TABLE, timeout=30000)
+    cities = []
+    table = await page.query_selector(CITIES_TABLE)
+    rows = await table.query_selector_all("tr")
+    for row in rows[1:]:  # Skip header row
+        cols = await row.query_selector_all("td")
+        if len(cols) < 2:
+            continue
+        city_link = await cols[0].query_selector("a")
+        if city_link is None:
+            continue
+        cities.append({
+            "City": (await city_link.inner_text()).strip(),
+            "Count": (await cols[1].inner_text()).strip(),
+            "URL": await city_link.get_attribute("href")
+        })
+    return cities
+
+
+async def extract_datacenters(page):
+    await page.wait_for_selector(CARDS, timeout=30000)
+    datacenters = []
+    cards = await page.query_selector_all(f"{CARDS} .ui.card")
+    for card in cards:
+        header = await card.query_selector(".header")
+        description = await card.query_selector(".description")
+        datacenters.append({
+            "Datacenter Name": (await header.inner_text()).strip() if header else "N/A",
+            "Location": (await description.inner_text()).strip() if description else "N/A",
+            "Detail URL": await card.get_attribute("href") or "N/A"
+        })
+    return datacenters
+
+
+EXTRACTORS = {
+    "state": extract_cities,
+    "city": extract_datacenters,
+    "specs": extract_specs_async,
+}
+
+
+# ------------------------------
+# Crawl
+# ------------------------------
+class Crawler:
+    def __init__(self, journal, limiter, base_url=BASE_URL, retries=3, timeout=30000, listing_ttl=24 * 3600):
+        self.journal = journal
+        self.listing_ttl = listing_ttl
+        self.limiter = limiter
+        self.base_url = base_url
+        self.retries = retries
+        self.timeout = timeout
+        self.queue = asyncio.Queue()
+        self.seen = set()
+        self.fetched = 0
+        self.skipped = 0
+
+    def enqueue(self, kind, url, meta):
+        if url in self.seen:
+            return
+        self.seen.add(url)
+        self.queue.put_nowait((kind, url, meta))
+
+    async def fetch(self, page, kind, url):
+        for attempt in range(self.retries):
+            await self.limiter.wait(url)
+            try:
+                await page.goto(url, timeout=self.timeout)
+                return await EXTRACTORS[kind](page)
+            except PlaywrightTimeoutError:
+                print(f"Attempt {attempt + 1} timed out for {url}")
+            except Exception as e:
+                print(f"Attempt {attempt + 1} failed for {url}: {e}")
+            await asyncio.sleep(2 ** attempt)
+        print(f"Skipping {url} after {self.retries} failed attempts.")
+        return None
+
+    def reusable(self, kind, entry):
+        """Journal entries are reused, except listing pages older than `listing_ttl` seconds."""
+        if entry is None:
+            return False
+        return kind not in LISTING_KINDS or time.time() - entry["fetched_at"] < self.listing_ttl
+
+    def follow(self, kind, meta, payload):
+        if kind == "state":
+            for city in payload:
+                self.enqueue("city", urljoin(self.base_url, city["URL"]), {**meta, "City": city["City"]})
+        elif kind == "city":
+            state_prefix = f"/usa/{meta['State']}/"
+            for dc in payload:
+                href = dc["Detail URL"]
+                # Sponsor cards link outside the state tree and have no spec page
+                if not urlparse(href).path.startswith(state_prefix):
+                    continue
+                specs_url = urljoin(self.base_url, href.rstrip("/") + "/specs/")
+                self.enqueue("specs", specs_url, {**meta, **dc})
+
+    async def worker(self, context):
+        page = None
+        while True:
+            kind, url, meta = await self.queue.get()
+            try:
+                # Opened inside the guarded block so a failure here still marks
+                # the URL done; a closed page is replaced before the next URL
+                if page is None or page.is_closed():
+                    page = await context.new_page()
+                entry = self.journal.get(url)
+                if self.reusable(kind, entry):
+                    payload = entry["payload"]
+                    self.skipped += 1
+                else:
+                    payload = await self.fetch(page, kind, url)
+                    if payload is not None:
+                        self.journal.record(url, kind, meta, payload)
+                        self.fetched += 1
+                        print(f"Fetched {kind}: {url}")
+                if payload is not None:
+                    self.follow(kind, meta, payload)
+            except Exception as e:
+                print(f"Error processing {url}: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def run(self, states, n_contexts=4, headless=True):
+        for state in states:
+            self.enqueue("state", urljoin(self.base_url, f"/usa/{state}/"), {"State": state})
+
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=headless)
+            contexts = [await browser.new_context() for _ in range(n_contexts)]
+            workers = [asyncio.create_task(self.worker(context)) for context in contexts]
+            await self.queue.join()
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            await browser.close()
+
+
+# ------------------------------
+# Consolidated output
+# ------------------------------
+def collect_rows(journal, states):
+    rows = []
+    for entry in journal.entries.values():
+        if entry["kind"] != "specs" or entry["meta"].get("State") not in states:
+            continue
+        specs = entry["payload"]
+        # Skip pages missing key statistics, as the sync scraper did
+        if not specs["Energy"] or not specs["Area"]:
+            continue
+        meta = entry["meta"]
+        rows.append({
+            "State": meta["State"],
+            "City": meta.get("City"),
+            "Datacenter Name": meta.get("Datacenter Name"),
+            "Location": meta.get("Location"),
+            "Detail URL": meta.get("Detail URL"),
+            "Energy": specs["Energy"],
+            "Area": specs["Area"],
+            "Established": specs["Established"],
+            **specs["categories"]
+        })
+    return rows
+
+
+def write_output(rows, path):
+    if path.endswith(".jsonl"):
+        with open(path, "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+        return
+    # Tabular formats keep one column per category, serialized as JSON
+    df = pd.DataFrame([
+        {k: json.dumps(v) if isinstance(v, dict) else v for k, v in row.items()} for row in rows
+    ])
+    if path.endswith(".xlsx"):
+        df.to_excel(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+
+def normalize_state(state):
+    return state.strip().lower().replace(" ", "-")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Crawl datacentermap.com for one or more US states")
+    parser.add_argument("states", nargs="+", help="State slugs, e.g. california new-york")
+    parser.add_argument("--contexts", type=int, default=4, help="Number of concurrent browser contexts")
+    parser.add_argument("--rate", type=float, default=1.0, help="Max requests per second per host")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--timeout", type=int, default=30000, help="Page load timeout (ms)")
+    parser.add_argument("--journal", default="crawl_journal.jsonl", help="Checkpoint journal path")
+    parser.add_argument("--listing-ttl", type=float, default=24.0,
+                        help="Hours a journaled state/city listing is reused before it is fetched again")
+    parser.add_argument("--refresh-listings", action="store_true",
+                        help="Fetch every state/city listing again (spec pages stay journaled)")
+    parser.add_argument("--output", default="datacenters_specs.jsonl",
+                        help="Consolidated output (.jsonl, .csv or .xlsx)")
+    parser.add_argument("--base-url", default=BASE_URL, help="Site root, e.g. a local fixture server")
+    parser.add_argument("--headed", action="store_true", help="Show the browser windows")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    states = [normalize_state(s) for s in args.states]
+    journal = CrawlJournal(args.journal)
+    listing_ttl = 0 if args.refresh_listings else args.listing_ttl * 3600
+    crawler = Crawler(journal, HostRateLimiter(args.rate), args.base_url, args.retries, args.timeout, listing_ttl)
+    start = time.perf_counter()
+    try:
+        asyncio.run(crawler.run(states, args.contexts, headless=not args.headed))
+    finally:
+        journal.close()
+
+    rows = collect_rows(journal, set(states))
+    write_output(rows, args.output)
+    print(f"Fetched {crawler.fetched} pages, reused {crawler.skipped} from the journal "
+          f"in {time.perf_counter() - start:.1f}s.")
+    print(f"Saved {len(rows)} datacenters to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Spec page extraction for datacentermap.com.
+
+Two paths return the same structure,
+    {"Energy": ..., "Area": ..., "Established": ..., "categories": {category: {key: value}}}
+
+  * extract_specs_locator - walks sections, rows and cells with locators;
+    every count/nth/inner_text is a separate browser round-trip.
+  * extract_specs / extract_specs_async - one page.evaluate call that reads
+    the whole DOM in the page and returns the result as JSON.
+
+Cell values follow get_cell_value: a single checkmark icon is "Yes", a
+single close icon is "No", anything else is the cell's trimmed text.
+"""
+
+STATS_SELECTOR = ".ui.three.statistics .ui.statistic"
+SECTIONS_SELECTOR = ".ui.stackable.grid .eight.wide.column"
+HEADER_SELECTOR = ".ui.horizontal.divider"
+
+EXTRACT_SPECS_JS = """
+([statsSelector, sectionsSelector, headerSelector]) => {
+    const text = (el) => el ? el.innerText.trim() : null;
+    const cellValue = (cell) => {
+        const icons = cell.querySelectorAll("i");
+        if (icons.length === 1) {
+            const classes = icons[0].getAttribute("class") || "";
+            if (classes.includes("checkmark")) return "Yes";
+            if (classes.includes("close")) return "No";
+        }
+        return text(cell);
+    };
+
+    let energy = null, area = null, established = null;
+    const stats = document.querySelectorAll(statsSelector);
+    if (stats.length >= 3) {
+        [energy, area, established] = [0, 1, 2].map((i) => text(stats[i].querySelector(".label")));
+    }
+
+    const categories = {};
+    for (const section of document.querySelectorAll(sectionsSelector)) {
+        const category = text(section.querySelector(headerSelector)) || "";
+        const data = {};
+        for (const row of section.querySelectorAll("tr")) {
+            const cells = row.querySelectorAll("td");
+            if (cells.length === 2) {
+                data[text(cells[0])] = cellValue(cells[1]);
+            }
+        }
+        if (category) categories[category] = data;
+    }
+    return {Energy: energy, Area: area, Established: established, categories: categories};
+}
+"""
+
+_JS_ARGS = [STATS_SELECTOR, SECTIONS_SELECTOR, HEADER_SELECTOR]
+
+
+# ------------------------------
+# Single round-trip extraction
+# ------------------------------
+def extract_specs(page):
+    return page.evaluate(EXTRACT_SPECS_JS, _JS_ARGS)
+
+
+async def extract_specs_async(page):
+    return await page.evaluate(EXTRACT_SPECS_JS, _JS_ARGS)
+
+
+# ------------------------------
+# Locator-based extraction
+# ------------------------------
+def get_cell_value(cell):
+    """
+    Checks if the cell contains an <i> element with a checkmark or close icon.
+    Returns 'Yes' for checkmark, 'No' for close, or the cell's text otherwise.
+    """
+    try:
+        i_element = cell.locator("i")
+        # count() first: get_attribute on a missing element waits for the timeout
+        if i_element.count() == 1:
+            classes = i_element.get_attribute("class") or ""
+            if "checkmark" in classes:
+                return "Yes"
+            elif "close" in classes:
+                return "No"
+    except:
+        pass
+    return cell.inner_text().strip()
+
+
+def extract_specs_locator(page):
+    energy, area, established = None, None, None
+    try:
+        stats = page.locator(STATS_SELECTOR)
+        if stats.count() >= 3:
+            energy = stats.nth(0).locator(".label").inner_text().strip()
+            area = stats.nth(1).locator(".label").inner_text().strip()
+            established = stats.nth(2).locator(".label").inner_text().strip()
+    except:
+        print("Error extracting key statistics")
+
+    categories = {}
+    try:
+        sections = page.locator(SECTIONS_SELECTOR)
+        for i in range(sections.count()):
+            section = sections.nth(i)
+            header_elem = section.locator(HEADER_SELECTOR)
+            category = header_elem.inner_text().strip()
+            rows = section.locator("tr")
+            category_data = {}
+            for j in range(rows.count()):
+                row = rows.nth(j)
+                cells = row.locator("td")
+                if cells.count() == 2:
+                    key = cells.nth(0).inner_text().strip()
+                    value = get_cell_value(cells.nth(1))
+                    category_data[key] = value
+            if category:
+                categories[category] = category_data
+    except:
+        print("Error extracting category data")
+
+    return {"Energy": energy, "Area": area, "Established": established, "categories": categories}
+
+
+EXTRACTION_MODES = {
+    "evaluate": extract_specs,
+    "locator": extract_specs_locator,
+}
@@ -0,0 +1,123 @@
+"""
+Buffered, append-friendly sink for scraped datacenter spec records.
+
+Records are flattened so that every spec key gets its own column named
+"<CATEGORY>.<key>" (e.g. "SERVICES.Full Cabinets"), buffered in memory and
+flushed every `batch_size` records:
+
+  * ``.jsonl``   - one JSON object per line, appended to the file,
+  * ``.parquet`` - a directory of part files, one per flushed batch.
+
+Neither format rewrites earlier rows, so the cost of a flush does not grow
+with the size of the output. `export_xlsx` rebuilds the legacy workbook
+layout (one column per category holding the dict) once, at the end.
+"""
+import json
+import os
+
+import pandas as pd
+
+SEP = "."
+CATEGORIES_COLUMN = "_categories"
+
+
+def flatten_record(record):
+    """Turn {"CAPACITY": {"Total Building Size": ...}} entries into flat columns."""
+    flat = {}
+    categories = []
+    for key, value in record.items():
+        if isinstance(value, dict):
+            categories.append(key)
+            for spec_key, spec_value in value.items():
+                flat[f"{key}{SEP}{spec_key}"] = spec_value
+        else:
+            flat[key] = value
+    # Keep category order, including categories with no rows (e.g. DOWNLOADS)
+    flat[CATEGORIES_COLUMN] = json.dumps(categories)
+    return flat
+
+
+class SpecSink:
+    def __init__(self, path, batch_size=50):
+        if not path.endswith((".jsonl", ".parquet")):
+            raise ValueError(f"Unsupported sink format: {path} (use .jsonl or .parquet)")
+        self.path = path
+        self.batch_size = batch_size
+        self.buffer = []
+        self.rows_written = 0
+        self._part = 0
+        if path.endswith(".parquet"):
+            os.makedirs(path, exist_ok=True)
+            self._part = len([f for f in os.listdir(path) if f.endswith(".parquet")])
+
+    def add(self, record):
+        self.buffer.append(flatten_record(record))
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        if self.path.endswith(".jsonl"):
+            with open(self.path, "a", encoding="utf-8") as f:
+                for row in self.buffer:
+                    f.write(json.dumps(row) + "\n")
+        else:
+            part_file = os.path.join(self.path, f"part-{self._part:05d}.parquet")
+            pd.DataFrame(self.buffer).astype("string").to_parquet(part_file, index=False)
+            self._part += 1
+        self.rows_written += len(self.buffer)
+        self.buffer = []
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_sink(path):
+    """Load everything written to a sink as one DataFrame (columns in first-seen order)."""
+    if path.endswith(".jsonl"):
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        return pd.read_json(path, lines=True, dtype=False)
+    parts = sorted(f for f in os.listdir(path) if f.endswith(".parquet")) if os.path.isdir(path) else []
+    if not parts:
+        return pd.DataFrame()
+    return pd.concat([pd.read_parquet(os.path.join(path, f)) for f in parts], ignore_index=True)
+
+
+def export_xlsx(sink_path, xlsx_path):
+    """Write the legacy <state>_datacenters_specs.xlsx layout from a sink."""
+    df = read_sink(sink_path)
+    # Categories come from what flatten_record recorded, not from column names,
+    # so a plain field containing SEP stays a column of its own
+    record_categories = [json.loads(c) for c in df[CATEGORIES_COLUMN]] if CATEGORIES_COLUMN in df.columns else []
+    categories = list(dict.fromkeys(c for cats in record_categories for c in cats))
+    category_columns = {category: {} for category in categories}
+    base_columns = []
+    for col in df.columns:
+        if col == CATEGORIES_COLUMN:
+            continue
+        category = next((c for c in categories if col.startswith(f"{c}{SEP}")), None)
+        if category is None:
+            base_columns.append(col)
+        else:
+            category_columns[category][col] = col[len(category) + len(SEP):]
+
+    rows = []
+    for record, cats in zip(df.to_dict("records"), record_categories):
+        row = {c: record[c] for c in base_columns}
+        for category in cats:
+            row[category] = str({
+                key: record[col]
+                for col, key in category_columns[category].items()
+                if pd.notna(record[col])
+            })
+        rows.append(row)
+    pd.DataFrame(rows).to_excel(xlsx_path, index=False)
+    return len(rows)
@@ -0,0 +1,340 @@
+"""
+Local, streaming replacement for the *_unnest.sql Snowflake scripts.
+
+Every state script extracts the same spec keys from the scraped category
+JSON into a <STATE>_FLAT table. This module does that for any number of
+scrape batches in one pass, without Snowflake:
+
+  * inputs are read row by row: SpecSink .jsonl files ("CATEGORY.key"
+    columns), crawler .jsonl output (nested category dicts) or the legacy
+    <state>_datacenters_specs.xlsx/.csv workbooks (one dict per category),
+  * rows are mapped onto the flat schema of the SQL scripts plus STATE,
+    CITY and Source_File, typed, and written in chunks to one Parquet part
+    file per input batch,
+  * a manifest records the content hash of every batch, so a rerun only
+    processes new or changed batches,
+  * `export_combined` writes the unioned table behind
+    "transformed-objects /combined_with_State and City.csv".
+
+Usage:
+    python flatten_specs.py ../scraping-scripts/*_datacenters_specs.xlsx --out flat_specs \\
+        --combined combined_flat.csv
+    python flatten_specs.py ../scraping-scripts/crawl_output.jsonl --out flat_specs   # adds only new batches
+"""
+import argparse
+import ast
+import glob
+import hashlib
+import json
+import os
+import time
+
+import pandas as pd
+
+MANIFEST = "manifest.json"
+
+# (flat column, category, spec key) in the column order of the *_unnest.sql scripts
+FLAT_SPECS = [
+    ("FULLY_BUILT_OUT_POWER", "CAPACITY", "Fully Built-Out Power"),
+    ("FULLY_BUILT_OUT_WHITESPACE", "CAPACITY", "Fully Built-Out Whitespace"),
+    ("TOTAL_BUILDING_SIZE", "CAPACITY", "Total Building Size"),
+    ("FULL_CABINETS", "SERVICES", "Full Cabinets"),
+    ("PARTIAL_CABINETS", "SERVICES", "Partial Cabinets"),
+    ("SHARED_RACKSPACE", "SERVICES", "Shared Rackspace"),
+    ("CAGES", "SERVICES", "Cages"),
+    ("SUITES", "SERVICES", "Suites"),
+    ("BUILD_TO_SUIT", "SERVICES", "Build-to-Suit"),
+    ("FOOTPRINTS", "SERVICES", "Footprints"),
+    ("REMOTE_HANDS", "SERVICES", "Remote Hands"),
+    ("MAX_POWER_AREA", "POWER", "Max power/area"),
+    ("UPS_REDUNDANCY", "POWER", "UPS Redundancy"),
+    ("COOLING_REDUNDANCY", "POWER", "Cooling Redundancy"),
+    ("STANDBY_POWER_REDUNDANCY", "POWER", "Standby Power Redundancy"),
+    ("TIER_DESIGN", "COMPLIANCE", "Tier Design"),
+    ("DSS_PCI_CERTIFIED", "COMPLIANCE", "DSS PCI Certified"),
+    ("ISO27001_CERTIFIED", "COMPLIANCE", "ISO27001 Certified"),
+    ("HIPAA", "COMPLIANCE", "HIPAA"),
+    ("SOC_2_TYPE_II_CERTIFIED", "COMPLIANCE", "SOC 2 Type II Certified"),
+    ("SOC_3_TYPE2_CERTIFIED", "COMPLIANCE", "SOC 3 Type 2 Certified"),
+    ("NIST_800_53", "COMPLIANCE", "NIST 800-53"),
+    ("CCTV_SURVEILLANCE", "SECURITY", "CCTV surveillance"),
+    ("BIOMETRIC_ACCESS_CONTROL", "SECURITY", "Biometric Access Control"),
+    ("CARD_ACCESS_CONTROL", "SECURITY", "Card Access Control"),
+    ("ONSITE_SECURITY_STAFF", "SECURITY", "Onsite Security Staff"),
+    ("ONSITE_TECHNICAL_STAFF", "SECURITY", "Onsite Technical Staff"),
+    ("YEAR_OPERATIONAL", "BUILDING", "Year Operational"),
+    ("ROOF_ACCESS", "BUILDING", "Roof Access"),
+    ("BUILDING_FLOORS", "BUILDING", "Building Floors"),
+    ("MAX_FLOOR_LOAD", "BUILDING", "Max Floor Load"),
+    ("MEET_ME_ROOM_MMR", "AMENITIES", "Meet-Me-Room (MMR)"),
+    ("INTERNET_EXCHANGE_POINTS", "STATISTICS", "Internet Exchange Points"),
+    ("PEERING_NETWORKS", "STATISTICS", "Peering networks"),
+    ("NETWORK_PROVIDERS", "STATISTICS", "Network providers"),
+    ("TENANTS_OFFERING_COLOCATION", "STATISTICS", "Tenants offering colocation"),
+    ("CHILD_DATA_CENTER_LISTINGS", "STATISTICS", "Child-Data Center listings"),
+]
+
+# Key statistics scraped outside the categories: flat column -> record key
+BASE_COLUMNS = {
+    "LOCATION": "Datacenter Name",
+    "ENERGY": "Energy",
+    "AREA": "Area",
+    "ESTABLISHED": "Established",
+}
+
+COLUMNS = (
+    ["STATE", "CITY"] + list(BASE_COLUMNS) + ["DOWNLOADS"]
+    + [col for col, _, _ in FLAT_SPECS] + ["Source_File"]
+)
+
+# Snowflake kept everything as VARCHAR; counts and years are typed here
+INTEGER_COLUMNS = [
+    "YEAR_OPERATIONAL", "BUILDING_FLOORS", "INTERNET_EXCHANGE_POINTS", "PEERING_NETWORKS",
+    "NETWORK_PROVIDERS", "TENANTS_OFFERING_COLOCATION", "CHILD_DATA_CENTER_LISTINGS",
+]
+DTYPES = {col: ("Int64" if col in INTEGER_COLUMNS else "string") for col in COLUMNS}
+
+CATEGORIES = sorted({category for _, category, _ in FLAT_SPECS} | {"DOWNLOADS"})
+
+STATE_CODES = {
+    "alabama": "AL", "alaska": "AK", "arizona": "AZ", "arkansas": "AR", "california": "CA",
+    "colorado": "CO", "connecticut": "CT", "delaware": "DE", "district-of-columbia": "DC",
+    "florida": "FL", "georgia": "GA", "hawaii": "HI", "idaho": "ID", "illinois": "IL",
+    "indiana": "IN", "iowa": "IA", "kansas": "KS", "kentucky": "KY", "louisiana": "LA",
+    "maine": "ME", "maryland": "MD", "massachusetts": "MA", "michigan": "MI", "minnesota": "MN",
+    "mississippi": "MS", "missouri": "MO", "montana": "MT", "nebraska": "NE", "nevada": "NV",
+    "new-hampshire": "NH", "new-jersey": "NJ", "new-mexico": "NM", "new-york": "NY",
+    "north-carolina": "NC", "north-dakota": "ND", "ohio": "OH", "oklahoma": "OK", "oregon": "OR",
+    "pennsylvania": "PA", "rhode-island": "RI", "south-carolina": "SC", "south-dakota": "SD",
+    "tennessee": "TN", "texas": "TX", "utah": "UT", "vermont": "VT", "virginia": "VA",
+    "washington": "WA", "west-virginia": "WV", "wisconsin": "WI", "wyoming": "WY",
+}
+
+
+def state_code(state):
+    if state is None or pd.isna(state):
+        return None
+    slug = str(state).strip().lower().replace(" ", "-").replace("_", "-")
+    return STATE_CODES.get(slug, str(state).strip().upper())
+
+
+def state_from_filename(path):
+    """'california_datacenters_specs.jsonl' -> 'CA'."""
+    name = os.path.basename(path)
+    return state_code(name.split("_datacenters")[0]) if "_datacenters" in name else None
+
+
+# ------------------------------
+# Reading scrape batches row by row
+# ------------------------------
+def parse_category(value):
+    """A category cell may be a dict, JSON, or the Python repr the xlsx export wrote."""
+    if isinstance(value, dict):
+        return value
+    if value is None or (not isinstance(value, str) and pd.isna(value)) or value == "":
+        return None
+    try:
+        return json.loads(value)
+    except (TypeError, ValueError):
+        return ast.literal_eval(value)
+
+
+def split_record(record):
+    """Return (base fields, {category: {key: value}}) for any supported row layout."""
+    base, categories = {}, {}
+    flattened = "_categories" in record
+    for key, value in record.items():
+        if flattened and "." in key and key.split(".", 1)[0].isupper():
+            category, spec_key = key.split(".", 1)
+            if value is not None and not (isinstance(value, float) and pd.isna(value)):
+                categories.setdefault(category, {})[spec_key] = value
+        elif key in CATEGORIES:
+            parsed = parse_category(value)
+            if parsed is not None:
+                categories[key] = parsed
+        else:
+            base[key] = value
+    if flattened:
+        # Categories without any rows (e.g. DOWNLOADS) are only listed here
+        for category in json.loads(record["_categories"]):
+            categories.setdefault(category, {})
+    return base, categories
+
+
+def iter_records(path):
+    if path.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif path.endswith((".xlsx", ".xls")):
+        yield from pd.read_excel(path, dtype=str).to_dict("records")
+    else:
+        for chunk in pd.read_csv(path, dtype=str, chunksize=1000):
+            yield from chunk.to_dict("records")
+
+
+def load_city_lookup(path):
+    """Datacenter Name -> City from the <state>_datacenters_details.xlsx next to a batch."""
+    name = os.path.basename(path)
+    if "_datacenters" not in name:
+        return {}
+    details = os.path.join(os.path.dirname(path), name.split("_datacenters")[0] + "_datacenters_details.xlsx")
+    if not os.path.exists(details):
+        return {}
+    df = pd.read_excel(details).dropna(subset=["Datacenter Name"])
+    return dict(zip(df["Datacenter Name"], df["City"]))
+
+
+def flatten_row(record, default_state=None, cities=None, source_file=None):
+    base, categories = split_record(record)
+    row = {
+        "STATE": state_code(base.get("State")) or default_state,
+        "CITY": base.get("City") if base.get("City") is not None else (cities or {}).get(base.get("Datacenter Name")),
+    }
+    for column, key in BASE_COLUMNS.items():
+        row[column] = base.get(key)
+    row["DOWNLOADS"] = str(categories["DOWNLOADS"]) if "DOWNLOADS" in categories else None
+    for column, category, key in FLAT_SPECS:
+        row[column] = categories.get(category, {}).get(key)
+    row["Source_File"] = source_file
+    return row
+
+
+def to_frame(rows):
+    df = pd.DataFrame(rows, columns=COLUMNS)
+    for col in INTEGER_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df.astype(DTYPES)
+
+
+# ------------------------------
+# Incremental batch processing
+# ------------------------------
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(out_dir, manifest):
+    tmp = os.path.join(out_dir, MANIFEST + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(out_dir, MANIFEST))
+
+
+def flatten_batch(path, part_path, chunksize=500):
+    """Stream one scrape batch into a Parquet part file; returns the row count."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    default_state = state_from_filename(path)
+    cities = load_city_lookup(path)
+    source_file = os.path.basename(path)
+    writer, rows, total = None, [], 0
+    tmp = part_path + ".tmp"
+    try:
+        def write(rows):
+            nonlocal writer
+            table = pa.Table.from_pandas(to_frame(rows), preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(tmp, table.schema)
+            writer.write_table(table)
+
+        for record in iter_records(path):
+            rows.append(flatten_row(record, default_state, cities, source_file))
+            if len(rows) >= chunksize:
+                write(rows)
+                total += len(rows)
+                rows = []
+        if rows or writer is None:
+            write(rows)
+            total += len(rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(tmp, part_path)
+    return total
+
+
+def flatten_batches(paths, out_dir, chunksize=500, force=False):
+    """
+    Flatten every new or changed batch in `paths` into `out_dir`. Batches
+    whose content hash matches the manifest are skipped. Returns a list of
+    (path, status, rows).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = load_manifest(out_dir)
+    report = []
+    for path in paths:
+        key = os.path.abspath(path)
+        digest = file_hash(path)
+        entry = manifest.get(key)
+        if entry and entry["sha256"] == digest and not force and os.path.exists(os.path.join(out_dir, entry["part"])):
+            report.append((path, "unchanged", entry["rows"]))
+            continue
+        part = f"part-{hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]}.parquet"
+        rows = flatten_batch(path, os.path.join(out_dir, part), chunksize)
+        manifest[key] = {"sha256": digest, "part": part, "rows": rows, "processed_at": time.time()}
+        # Save after every batch so an interrupted run keeps its progress
+        save_manifest(out_dir, manifest)
+        report.append((path, "updated" if entry else "added", rows))
+    return report
+
+
+def read_flat(out_dir):
+    """The unioned, typed flat table of every batch in `out_dir`."""
+    manifest = load_manifest(out_dir)
+    parts = [os.path.join(out_dir, entry["part"]) for entry in manifest.values()]
+    if not parts:
+        return to_frame([])
+    return pd.concat([pd.read_parquet(p) for p in parts], ignore_index=True)
+
+
+def export_combined(out_dir, csv_path):
+    df = read_flat(out_dir)
+    df.to_csv(csv_path, index=False)
+    return len(df)
+
+
+def expand_inputs(inputs):
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for pattern in ("*_datacenters_specs.jsonl", "*_datacenters_specs.xlsx"):
+                paths.extend(sorted(glob.glob(os.path.join(item, pattern))))
+        else:
+            paths.extend(sorted(glob.glob(item)) or [item])
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flatten scraped datacenter specs into one typed table")
+    parser.add_argument("inputs", nargs="+", help="Scrape batches (.jsonl, .xlsx, .csv) or directories")
+    parser.add_argument("--out", default="flat_specs", help="Directory of Parquet parts + manifest")
+    parser.add_argument("--combined", help="Also write the unioned table to this CSV")
+    parser.add_argument("--chunksize", type=int, default=500, help="Rows per Parquet row group")
+    parser.add_argument("--force", action="store_true", help="Reprocess batches even if unchanged")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    for path, status, rows in flatten_batches(expand_inputs(args.inputs), args.out, args.chunksize, args.force):
+        print(f"{status:>9}  {rows:6d} rows  {path}")
+    print(f"Flattened in {time.perf_counter() - start:.2f}s -> {args.out}")
+    if args.combined:
+        print(f"Saved {export_combined(args.out, args.combined)} rows to: {args.combined}")
+
+
+if __name__ == "__main__":
+    main()
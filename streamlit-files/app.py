@@ -1,8 +1,16 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import joblib
 import os
+import sys
+from predictor import ClusterPredictor, FEATURES
+from compiled_model import CompiledClusterPredictor, DEFAULT_PATH as COMPILED_PATH
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Input rows get the same explicit dtypes as the clean-data tables
+sys.path.insert(0, os.path.join(current_dir, "..", "clean-data"))
+from feature_store import apply_schema
 
 
 # Set page config
@@ -10,13 +18,22 @@ st.set_page_config(page_title="Data Center Cluster Predictor", layout="centered"
 st.title("🏢 Data Center Cluster Predictor")
 st.markdown("Use the sliders below to define your new data center and predict its cluster group.")
 
+# Slider definitions, shared by the inputs and the what-if sweep:
+# label -> (column, min, max, default, step)
+SLIDERS = {
+    "Energy (MW)": ('ENERGY', 1.0, 150.0, 20.0, None),
+    "Area (sq.ft)": ('AREA', 1000, 500000, 120000, None),
+    "IT Equipment Power (MW)": ('IT EQUIPMENT POWER', 0.5, 100.0, 15.0, None),
+    "Power Usage Effectiveness (PUE)": ('State_Aggregated_PUE', 0.0, 5.0, 0.0, 1.0),
+    "Year Operational": ('YEAR_OPERATIONAL', 1920, 2025, 2023, None),
+    "Internet Exchange Points": ('State_Aggregated_IXP_Count', 0.0, 5.0, 0.0, 1.0),
+}
+
 # Define feature inputs via slider
-ENERGY = st.slider("Energy (MW)", 1.0, 150.0, 20.0)
-AREA = st.slider("Area (sq.ft)", 1000, 500000, 120000)
-IT_POWER = st.slider("IT Equipment Power (MW)", 0.5, 100.0, 15.0)
-PUE = st.slider("Power Usage Effectiveness (PUE)", 0.0, 5.0, 0.0,1.0)
-YEAR = st.slider("Year Operational", 1920, 2025, 2023)
-IXP = st.slider("Internet Exchange Points", 0.0, 5.0, 0.0,1.0)
+slider_values = {
+    column: st.slider(label, low, high, default, step)
+    for label, (column, low, high, default, step) in SLIDERS.items()
+}
 
 # Boolean service features
 st.subheader("🛠️ Service Features")
@@ -30,42 +47,67 @@ FOOTPRINTS = st.checkbox("Footprints")
 REMOTE_HANDS = st.checkbox("Remote Hands")
 
 
-current_dir = os.path.dirname(os.path.abspath(__file__))
-
-# Dynamically construct paths to the .pkl files
-rf_model_path = os.path.join(current_dir, "rf_model.pkl")
-scaler_path = os.path.join(current_dir, "scaler.pkl")
-
-# Load model and scaler (you need to export these from your training code)
+# Load the model once: the compiled cluster_model.dcm (pure NumPy, written by
+# `python compiled_model.py export`) when present, else rf_model.pkl and scaler.pkl
 @st.cache_resource
 def load_model():
-    rf = joblib.load(rf_model_path)
-    scaler = joblib.load(scaler_path)
-    return rf, scaler
+    if os.path.exists(COMPILED_PATH):
+        return CompiledClusterPredictor(COMPILED_PATH)
+    return ClusterPredictor(current_dir)
 
-rf_model, scaler = load_model()
+predictor = load_model()
 
 # Create input dataframe
-input_df = pd.DataFrame([{
-    'ENERGY': ENERGY,
-    'AREA': AREA,
-    'IT EQUIPMENT POWER': IT_POWER,
-    'State_Aggregated_PUE': PUE,
-    'FULL_CABINETS': int(FULL_CABINETS),
-    'PARTIAL_CABINETS': int(PARTIAL_CABINETS),
-    'SHARED_RACKSPACE': int(SHARED_RACKSPACE),
-    'CAGES': int(CAGES),
-    'SUITES': int(SUITES),
-    'BUILD_TO_SUIT': int(BUILD_TO_SUIT),
-    'FOOTPRINTS': int(FOOTPRINTS),
-    'REMOTE_HANDS': int(REMOTE_HANDS),
-    'YEAR_OPERATIONAL': YEAR,
-    'State_Aggregated_IXP_Count': IXP
-}])
+input_df = apply_schema(pd.DataFrame([{
+    **slider_values,
+    'FULL_CABINETS': FULL_CABINETS,
+    'PARTIAL_CABINETS': PARTIAL_CABINETS,
+    'SHARED_RACKSPACE': SHARED_RACKSPACE,
+    'CAGES': CAGES,
+    'SUITES': SUITES,
+    'BUILD_TO_SUIT': BUILD_TO_SUIT,
+    'FOOTPRINTS': FOOTPRINTS,
+    'REMOTE_HANDS': REMOTE_HANDS,
+}]))
+
+# Predictions are cached on the input vector rounded to the slider resolution,
+# so revisiting a slider position is a cache hit instead of a model call
+QUANT_DECIMALS = 2
+
+def quantize(values):
+    return tuple(round(float(v), QUANT_DECIMALS) for v in values)
+
+@st.cache_data(max_entries=4096, show_spinner=False)
+def predict_cluster(features):
+    return int(predictor.predict_array(np.array([features]))[0])
+
+# Sweep one feature over its slider range with a single vectorized predict call
+@st.cache_data(max_entries=256, show_spinner=False)
+def sweep_clusters(features, column, low, high, n_points):
+    grid = np.linspace(low, high, n_points)
+    X = np.tile(np.array(features, dtype=float), (n_points, 1))
+    X[:, FEATURES.index(column)] = grid
+    return pd.DataFrame({column: grid, "Cluster": predictor.predict_array(X)})
 
 # Scale and predict
-scaled_input = scaler.transform(input_df)
-prediction = rf_model.predict(scaled_input)
+features = quantize(input_df[FEATURES].iloc[0])
+prediction = predict_cluster(features)
 
 # Output
-st.success(f"📌 Predicted Cluster: {prediction[0]}")
+st.success(f"📌 Predicted Cluster: {prediction}")
+
+# What-if panel: how the predicted cluster changes along one slider
+st.subheader("🔍 What-if Analysis")
+SWEEPABLE = {label: (column, low, high) for label, (column, low, high, _, _) in SLIDERS.items()}
+sweep_label = st.selectbox("Feature to sweep", list(SWEEPABLE))
+n_points = st.slider("Sweep points", 10, 500, 100)
+sweep_column, sweep_low, sweep_high = SWEEPABLE[sweep_label]
+sweep_df = sweep_clusters(features, sweep_column, sweep_low, sweep_high, n_points)
+st.line_chart(sweep_df.set_index(sweep_column))
+
+# Summarize the sweep as contiguous ranges of the same cluster
+changes = sweep_df["Cluster"].ne(sweep_df["Cluster"].shift()).cumsum()
+ranges = sweep_df.groupby(changes).agg(
+    From=(sweep_column, "min"), To=(sweep_column, "max"), Cluster=("Cluster", "first")
+)
+st.dataframe(ranges, hide_index=True)
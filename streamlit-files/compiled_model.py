@@ -0,0 +1,196 @@
+"""
+Compiled, memory-mappable form of rf_model.pkl + scaler.pkl.
+
+`export` flattens the scaler parameters and every tree of the random forest
+into plain NumPy arrays and writes them to a single file:
+
+    b"DCMODEL1" | uint64 header length | JSON header | 64-byte aligned arrays
+
+`CompiledClusterPredictor` memory-maps those arrays and predicts with pure
+NumPy, so worker processes start without importing scikit-learn and share
+the model pages through the OS page cache.
+
+Usage:
+    python compiled_model.py export              # writes cluster_model.dcm
+    python compiled_model.py verify              # checks it against the pickles
+    python predictor.py --compiled cluster_model.dcm batch candidates.csv scored.csv
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from predictor import ClusterPredictor, FEATURES, MODEL_DIR
+
+MAGIC = b"DCMODEL1"
+ALIGN = 64
+DEFAULT_PATH = os.path.join(MODEL_DIR, "cluster_model.dcm")
+
+
+# ------------------------------
+# File format
+# ------------------------------
+def write_arrays(path, arrays, meta):
+    header = {"meta": meta, "arrays": {}}
+    offset = 0
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr)
+        offset = -(-offset // ALIGN) * ALIGN
+        header["arrays"][name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+        offset += arr.nbytes
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_start = -(-(len(MAGIC) + 8 + len(header_bytes)) // ALIGN) * ALIGN
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.uint64(len(header_bytes)).tobytes())
+        f.write(header_bytes)
+        for name, arr in arrays.items():
+            f.seek(data_start + header["arrays"][name]["offset"])
+            f.write(np.ascontiguousarray(arr).tobytes())
+
+
+def read_arrays(path):
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a compiled cluster model")
+        header_len = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+        header = json.loads(f.read(header_len))
+    data_start = -(-(len(MAGIC) + 8 + header_len) // ALIGN) * ALIGN
+    arrays = {
+        name: np.memmap(path, dtype=np.dtype(spec["dtype"]), mode="r",
+                        offset=data_start + spec["offset"], shape=tuple(spec["shape"]))
+        for name, spec in header["arrays"].items()
+    }
+    return arrays, header["meta"]
+
+
+# ------------------------------
+# Export
+# ------------------------------
+def export(model_dir=MODEL_DIR, path=DEFAULT_PATH):
+    predictor = ClusterPredictor(model_dir)
+    rf, scaler = predictor.rf_model, predictor.scaler
+    if rf.n_outputs_ != 1:
+        raise ValueError("Only single-output forests can be compiled")
+
+    left, right, feature, threshold, proba, roots = [], [], [], [], [], []
+    offset = 0
+    for estimator in rf.estimators_:
+        tree = estimator.tree_
+        n = tree.node_count
+        nodes = np.arange(n)
+        is_leaf = tree.children_left == -1
+        # Leaves loop back onto themselves, so a fixed number of descent
+        # steps leaves every sample parked on its leaf
+        left.append(np.where(is_leaf, nodes, tree.children_left) + offset)
+        right.append(np.where(is_leaf, nodes, tree.children_right) + offset)
+        feature.append(np.where(is_leaf, 0, tree.feature))
+        threshold.append(np.where(is_leaf, np.inf, tree.threshold))
+        # Same normalization DecisionTreeClassifier.predict_proba applies
+        value = tree.value[:, 0, :rf.n_classes_].copy()
+        normalizer = value.sum(axis=1)[:, np.newaxis]
+        normalizer[normalizer == 0.0] = 1.0
+        proba.append(value / normalizer)
+        roots.append(offset)
+        offset += n
+
+    arrays = {
+        "scaler_mean": np.asarray(scaler.mean_ if scaler.with_mean else np.zeros(len(FEATURES)), dtype=np.float64),
+        "scaler_scale": np.asarray(scaler.scale_ if scaler.with_std else np.ones(len(FEATURES)), dtype=np.float64),
+        "left": np.concatenate(left).astype(np.int64),
+        "right": np.concatenate(right).astype(np.int64),
+        "feature": np.concatenate(feature).astype(np.int64),
+        "threshold": np.concatenate(threshold).astype(np.float64),
+        "proba": np.concatenate(proba).astype(np.float64),
+        "roots": np.asarray(roots, dtype=np.int64),
+        "classes": np.asarray(rf.classes_),
+    }
+    meta = {
+        "features": FEATURES,
+        "max_depth": int(max(e.tree_.max_depth for e in rf.estimators_)),
+        "n_estimators": len(rf.estimators_),
+    }
+    write_arrays(path, arrays, meta)
+    return path
+
+
+# ------------------------------
+# Pure-NumPy inference
+# ------------------------------
+class CompiledClusterPredictor(ClusterPredictor):
+    """Drop-in ClusterPredictor that predicts from the compiled arrays only."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.arrays, self.meta = read_arrays(path)
+        if self.meta["features"] != FEATURES:
+            raise ValueError(f"{path} was compiled for a different feature order")
+
+    def predict_proba_array(self, X):
+        a = self.arrays
+        X = (np.asarray(X, dtype=np.float64) - a["scaler_mean"]) / a["scaler_scale"]
+        # Trees compare float32 inputs against float64 thresholds
+        X = X.astype(np.float32).astype(np.float64)
+
+        rows = np.arange(len(X))[:, np.newaxis]
+        node = np.broadcast_to(a["roots"], (len(X), len(a["roots"]))).copy()
+        for _ in range(self.meta["max_depth"]):
+            go_left = X[rows, a["feature"][node]] <= a["threshold"][node]
+            node = np.where(go_left, a["left"][node], a["right"][node])
+
+        # Accumulate tree by tree, in order, as RandomForestClassifier does
+        proba = np.zeros((len(X), a["proba"].shape[1]))
+        for t in range(node.shape[1]):
+            proba += a["proba"][node[:, t]]
+        proba /= self.meta["n_estimators"]
+        return proba
+
+    def predict_array(self, X):
+        return self.arrays["classes"].take(np.argmax(self.predict_proba_array(X), axis=1), axis=0)
+
+
+def verify(model_dir=MODEL_DIR, path=DEFAULT_PATH, data_path=None, n_random=100_000, seed=0):
+    """Compare compiled and pickled predictions on real rows plus random inputs."""
+    import pandas as pd
+    sys.path.insert(0, os.path.join(MODEL_DIR, "..", "clean-data"))
+    import feature_store
+
+    reference = ClusterPredictor(model_dir)
+    compiled = CompiledClusterPredictor(path)
+    X_real = reference.to_frame(feature_store.load(data_path or "data-final.csv")).dropna().to_numpy()
+
+    # Random inputs spread over the ranges of the training features
+    rng = np.random.default_rng(seed)
+    lo, hi = X_real.min(axis=0), X_real.max(axis=0)
+    span = np.where(hi > lo, hi - lo, 1.0)
+    X_rand = rng.uniform(lo - 0.5 * span, hi + 0.5 * span, size=(n_random, len(FEATURES)))
+    X_rand[:, 4:12] = rng.integers(0, 2, size=(n_random, 8))
+
+    X = np.vstack([X_real, X_rand])
+    expected = reference.predict_array(X)
+    expected_proba = reference.rf_model.predict_proba(reference.scaler.transform(pd.DataFrame(X, columns=FEATURES)))
+    mismatches = int((compiled.predict_array(X) != expected).sum())
+    proba_equal = bool(np.array_equal(compiled.predict_proba_array(X), expected_proba))
+    return len(X), mismatches, proba_equal
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile rf_model.pkl + scaler.pkl into flat NumPy arrays")
+    parser.add_argument("command", choices=["export", "verify"])
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--path", default=DEFAULT_PATH)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        print(f"Compiled model written to: {export(args.model_dir, args.path)}")
+    else:
+        n, mismatches, proba_equal = verify(args.model_dir, args.path)
+        print(f"Compared {n} rows: {mismatches} label mismatches, probabilities identical: {proba_equal}")
+        if mismatches or not proba_equal:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""
+Reusable cluster predictor for data center sites.
+
+Loads rf_model.pkl and scaler.pkl once and scores any number of sites with
+a fixed feature order, either:
+
+  * in-process:   ClusterPredictor().predict(df_or_records)
+  * in batch:     python predictor.py batch candidates.csv scored.csv --chunksize 50000
+  * over HTTP:    python predictor.py serve --port 8502
+                  curl -X POST localhost:8502/predict -d '{"instances": [{"ENERGY": 20, ...}]}'
+
+The HTTP server collects requests that arrive within a short window and
+scores them with a single predict call.
+"""
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Feature order the scaler and random forest were trained on
+FEATURES = [
+    "ENERGY",
+    "AREA",
+    "IT EQUIPMENT POWER",
+    "State_Aggregated_PUE",
+    "FULL_CABINETS",
+    "PARTIAL_CABINETS",
+    "SHARED_RACKSPACE",
+    "CAGES",
+    "SUITES",
+    "BUILD_TO_SUIT",
+    "FOOTPRINTS",
+    "REMOTE_HANDS",
+    "YEAR_OPERATIONAL",
+    "State_Aggregated_IXP_Count",
+]
+
+PREDICTION_COLUMN = "Cluster"
+
+
+class ClusterPredictor:
+    def __init__(self, model_dir=MODEL_DIR):
+        # Imported here so the compiled predictor never pulls in scikit-learn
+        import joblib
+        self.rf_model = joblib.load(os.path.join(model_dir, "rf_model.pkl"))
+        self.scaler = joblib.load(os.path.join(model_dir, "scaler.pkl"))
+
+    @staticmethod
+    def to_frame(data):
+        """Coerce records/DataFrame to the 14 model features, in order, as floats."""
+        df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+        missing = [c for c in FEATURES if c not in df.columns]
+        if missing:
+            raise ValueError(f"Missing feature columns: {missing}")
+        return df[FEATURES].astype(float)
+
+    def predict_array(self, X):
+        """Predict from an (n x 14) array already in FEATURES order."""
+        scaled = self.scaler.transform(pd.DataFrame(X, columns=FEATURES))
+        return self.rf_model.predict(scaled)
+
+    def predict(self, data):
+        """
+        Predict clusters for every row. Rows with a missing feature value get
+        <NA> instead of failing the whole batch.
+        """
+        X = self.to_frame(data)
+        complete = X.notna().all(axis=1).to_numpy()
+        clusters = pd.array([pd.NA] * len(X), dtype="Int64")
+        if complete.any():
+            clusters[complete] = self.predict_array(X.to_numpy()[complete])
+        return clusters
+
+
+# ------------------------------
+# Chunked batch scoring
+# ------------------------------
+def iter_chunks(path, chunksize):
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+def predict_file(predictor, input_path, output_path, chunksize=50_000):
+    """Score a CSV or Parquet file chunk by chunk; returns the number of rows scored."""
+    writer = None
+    total = 0
+    try:
+        for i, chunk in enumerate(iter_chunks(input_path, chunksize)):
+            chunk[PREDICTION_COLUMN] = predictor.predict(chunk)
+            if output_path.endswith(".parquet"):
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(output_path, table.schema)
+                writer.write_table(table)
+            else:
+                chunk.to_csv(output_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+            total += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return total
+
+
+# ------------------------------
+# Micro-batching HTTP endpoint
+# ------------------------------
+class MicroBatcher:
+    """
+    Collects prediction requests from concurrent handler threads and scores
+    them together: a batch is run once `max_batch` rows are waiting or
+    `max_wait` seconds have passed since the first one arrived.
+    """
+
+    def __init__(self, predictor, max_batch=1024, max_wait=0.01):
+        self.predictor = predictor
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.requests = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, records):
+        done = threading.Event()
+        request = {"records": records, "done": done, "result": None, "error": None}
+        self.requests.put(request)
+        done.wait()
+        if request["error"] is not None:
+            raise request["error"]
+        return request["result"]
+
+    def _run(self):
+        while True:
+            batch = [self.requests.get()]
+            n_rows = len(batch[0]["records"])
+            deadline = time.monotonic() + self.max_wait
+            while n_rows < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self.requests.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                batch.append(request)
+                n_rows += len(request["records"])
+            self._score(batch)
+
+    def _score(self, batch):
+        # Validate each request separately so one bad payload only fails itself
+        frames = []
+        for request in batch:
+            try:
+                frames.append(self.predictor.to_frame(request["records"]))
+            except Exception as e:
+                request["error"] = e
+                frames.append(None)
+        valid = [f for f in frames if f is not None]
+        if valid:
+            try:
+                clusters = self.predictor.predict(pd.concat(valid, ignore_index=True))
+            except Exception as e:
+                clusters = None
+                for request, frame in zip(batch, frames):
+                    if frame is not None:
+                        request["error"] = e
+            offset = 0
+            for request, frame in zip(batch, frames):
+                if frame is not None and clusters is not None:
+                    part = clusters[offset:offset + len(frame)]
+                    request["result"] = [None if pd.isna(c) else int(c) for c in part]
+                    offset += len(frame)
+        for request in batch:
+            request["done"].set()
+
+
+def make_handler(batcher):
+    class PredictHandler(BaseHTTPRequestHandler):
+        def _reply(self, status, body):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._reply(200, {"status": "ok", "features": FEATURES})
+            else:
+                self._reply(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/predict":
+                self._reply(404, {"error": "not found"})
+                return
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                records = body["instances"] if isinstance(body, dict) and "instances" in body else body
+                if isinstance(records, dict):
+                    records = [records]
+                self._reply(200, {"predictions": batcher.submit(records)})
+            except (ValueError, KeyError, TypeError) as e:
+                self._reply(400, {"error": str(e)})
+            except Exception as e:
+                # Anything else is a server-side failure; the client still gets JSON
+                self._reply(500, {"error": str(e)})
+
+        def log_message(self, format, *args):
+            pass
+
+    return PredictHandler
+
+
+def serve(predictor, host="127.0.0.1", port=8502, max_batch=1024, max_wait_ms=10):
+    batcher = MicroBatcher(predictor, max_batch, max_wait_ms / 1000)
+    server = ThreadingHTTPServer((host, port), make_handler(batcher))
+    print(f"Serving cluster predictions on http://{host}:{port}/predict")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Data center cluster prediction")
+    parser.add_argument("--model-dir", default=MODEL_DIR, help="Directory holding rf_model.pkl and scaler.pkl")
+    parser.add_argument("--compiled", metavar="PATH",
+                        help="Use a compiled model file (see compiled_model.py) instead of the pickles")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    batch = sub.add_parser("batch", help="Score a CSV or Parquet file in chunks")
+    batch.add_argument("input")
+    batch.add_argument("output")
+    batch.add_argument("--chunksize", type=int, default=50_000)
+
+    http = sub.add_parser("serve", help="Run a local HTTP prediction endpoint")
+    http.add_argument("--host", default="127.0.0.1")
+    http.add_argument("--port", type=int, default=8502)
+    http.add_argument("--max-batch", type=int, default=1024)
+    http.add_argument("--max-wait-ms", type=float, default=10)
+
+    args = parser.parse_args()
+    if args.compiled:
+        from compiled_model import CompiledClusterPredictor
+        predictor = CompiledClusterPredictor(args.compiled)
+    else:
+        predictor = ClusterPredictor(args.model_dir)
+    if args.command == "batch":
+        start = time.perf_counter()
+        n = predict_file(predictor, args.input, args.output, args.chunksize)
+        print(f"Scored {n} rows in {time.perf_counter() - start:.2f}s -> {args.output}")
+    else:
+        serve(predictor, args.host, args.port, args.max_batch, args.max_wait_ms)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The project modules are scripts in hyphenated folders, imported through
+# sys.path like the scripts themselves do
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+for folder in ("clean-data", "scraping-scripts", "streamlit-files", "model-scripts", os.path.join("model-scripts", "moo-model")):
+    sys.path.insert(0, os.path.join(REPO_DIR, folder))
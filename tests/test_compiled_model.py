@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from compiled_model import CompiledClusterPredictor, export, verify
+from predictor import ClusterPredictor
+
+
+@pytest.fixture(scope="module")
+def compiled_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("model") / "cluster_model.dcm")
+    export(path=path)
+    return path
+
+
+def test_compiled_model_matches_sklearn(compiled_path):
+    n_rows, mismatches, proba_equal = verify(path=compiled_path, n_random=5_000)
+    assert n_rows > 5_000
+    assert mismatches == 0
+    assert proba_equal
+
+
+def test_compiled_predict_keeps_missing_rows(compiled_path):
+    reference, compiled = ClusterPredictor(), CompiledClusterPredictor(compiled_path)
+    X = np.random.default_rng(0).uniform(0, 100, size=(50, len(compiled.meta["features"])))
+    X[3, 0] = np.nan
+    records = [dict(zip(compiled.meta["features"], row)) for row in X]
+    expected, got = reference.predict(records), compiled.predict(records)
+    assert got.isna().tolist() == expected.isna().tolist() == [i == 3 for i in range(50)]
+    assert (got[~got.isna()] == expected[~expected.isna()]).all()
@@ -0,0 +1,77 @@
+import asyncio
+import functools
+import json
+import os
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+playwright = pytest.importorskip("playwright.sync_api")
+
+from crawl_datacentermap import Crawler, CrawlJournal, HostRateLimiter, collect_rows, write_output
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping-scripts", "fixtures")
+STATES = ["california", "idaho"]
+
+
+def chromium_installed():
+    try:
+        with playwright.sync_playwright() as p:
+            return os.path.exists(p.chromium.executable_path)
+    except Exception:
+        return False
+
+
+pytestmark = pytest.mark.skipif(not chromium_installed(), reason="Playwright Chromium is not installed")
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fixture_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=FIXTURES))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def crawl(journal_path, base_url):
+    journal = CrawlJournal(journal_path)
+    crawler = Crawler(journal, HostRateLimiter(0), base_url, retries=2, timeout=10000)
+    try:
+        asyncio.run(crawler.run(STATES, n_contexts=2))
+    finally:
+        journal.close()
+    return crawler, journal
+
+
+def test_crawl_fixtures(fixture_server, tmp_path):
+    journal_path = str(tmp_path / "journal.jsonl")
+    crawler, journal = crawl(journal_path, fixture_server)
+
+    # 2 state listings, 3 city listings and 5 spec pages; the sponsor card is not followed
+    kinds = [entry["kind"] for entry in journal.entries.values()]
+    assert crawler.fetched == len(kinds) == 10
+    assert {k: kinds.count(k) for k in set(kinds)} == {"state": 2, "city": 3, "specs": 5}
+    with open(journal_path, encoding="utf-8") as f:
+        assert len(f.readlines()) == 10
+
+    output = str(tmp_path / "datacenters_specs.jsonl")
+    write_output(collect_rows(journal, set(STATES)), output)
+    with open(output, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    by_url = {row["Detail URL"].rstrip("/").rsplit("/", 1)[-1]: row for row in rows}
+    assert sorted(by_url) == ["2260-e-el-segundo", "600-west-7th-street", "ark-boise-1", "la2", "prime-sacramento"]
+    assert (by_url["la2"]["State"], by_url["la2"]["City"]) == ("california", "Los Angeles")
+    assert (by_url["la2"]["Energy"], by_url["la2"]["Area"]) == ("10 MW", "490,000 SQ.F.")
+    assert by_url["ark-boise-1"]["State"] == "idaho"
+
+    # A rerun reuses every journaled page
+    crawler, journal = crawl(journal_path, fixture_server)
+    assert (crawler.fetched, crawler.skipped) == (0, 10)
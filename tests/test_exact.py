@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+import feature_store
+from compare_exact import candidate_table, compare, run_ga
+from exact import exact_front, supported_front
+from fitness import FitnessEngine
+from pareto import nondominated_rank
+
+
+@pytest.fixture(scope="module")
+def engine():
+    # 16 sites of data-final.csv, a mix of valid and invalid ones: small
+    # enough to enumerate all 2^16 subsets
+    df = feature_store.load(feature_store.DEFAULT_SOURCE).iloc[:16].reset_index(drop=True)
+    engine = FitnessEngine(df)
+    assert 4 <= engine.valid.sum() < len(df)
+    return engine
+
+
+def brute_force_front(engine):
+    n = engine.n_sites
+    bits = ((np.arange(1, 2 ** n)[:, None] >> np.arange(n)) & 1).astype(bool)
+    F = np.unique(engine.evaluate_batch(bits).round(9), axis=0)
+    return F[nondominated_rank(F, 1) == 0]
+
+
+def as_set(F):
+    return {tuple(row) for row in np.asarray(F).round(9).tolist()}
+
+
+def test_exact_front_matches_brute_force(engine):
+    bits, F = exact_front(engine)
+    assert as_set(F) == as_set(brute_force_front(engine))
+    # Every reported solution selects valid sites only and scores as reported
+    assert not bits[:, ~engine.valid].any()
+    np.testing.assert_array_equal(engine.evaluate_batch(bits), F)
+
+
+def test_supported_front_is_on_the_exact_front(engine):
+    _, F = supported_front(engine, n_weights=200)
+    assert as_set(F) <= as_set(exact_front(engine)[1])
+
+
+@pytest.mark.parametrize("n_rows", [20, 30, 39])
+def test_ga_front_within_exact_front(n_rows):
+    # 39 is data-final.csv itself, the smaller sizes are synthetic tables
+    df = candidate_table(n_rows, feature_store.load(feature_store.DEFAULT_SOURCE), seed=42)
+    result = compare(df, "front", pop_size=30, generations=20, seed=42)
+    assert 0 < result["hypervolume_ratio"] <= 1 + 1e-9
+
+    engine = FitnessEngine(df)
+    _, exact_F = exact_front(engine)
+    ga_F = run_ga(df, engine, pop_size=30, generations=20, seed=42)
+    # Every GA point is weakly dominated by some point of the exact front
+    covered = (exact_F[:, None, :] <= ga_F[None, :, :] + 1e-9).all(axis=2).any(axis=0)
+    assert len(ga_F) and covered.all()